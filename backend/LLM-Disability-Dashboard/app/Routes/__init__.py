@@ -1,4 +1,5 @@
+from .export_routes import export_router
 from .langgraph_routes import langgraph_router
 from .openai_routes import openai_router
 
-__all__ = ["langgraph_router", "openai_router"]
+__all__ = ["export_router", "langgraph_router", "openai_router"]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.export_service import (
+    DEFAULT_CHUNK_SIZE,
+    ExportError,
+    ExportFilters,
+    export_stream,
+    parse_timestamp,
+)
+
+export_router = APIRouter()
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _check_token(token: Optional[str]) -> None:
+    expected = os.getenv("EXPORT_API_TOKEN", "").strip()
+    if not expected:
+        raise HTTPException(status_code=403, detail="Export is disabled; set EXPORT_API_TOKEN to enable it")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=401, detail="Invalid export token")
+
+
+@export_router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query(default="ndjson"),
+    start: Optional[str] = Query(default=None, description="Inclusive ISO date/datetime (UTC if naive)"),
+    end: Optional[str] = Query(default=None, description="Exclusive ISO date/datetime (UTC if naive)"),
+    disability: Optional[str] = None,
+    chunk_size: int = Query(default=DEFAULT_CHUNK_SIZE, ge=1, le=10_000),
+    x_export_token: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    _check_token(x_export_token)
+    try:
+        filters = ExportFilters(parse_timestamp(start), parse_timestamp(end), disability)
+        stream = export_stream(dataset, format, filters, chunk_size=chunk_size)
+    except ExportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
@@ -9,9 +9,15 @@ from pydantic import BaseModel, Field, field_validator
 from app.limiter import limiter
 from app.services.langgraph_service import (
     get_cache_stats,
+    get_checkpoint_stats,
+    get_llm_stats,
     get_prewarm_status,
+    get_student_aggregates,
+    get_workflow_progress,
     invalidate_workflow_cache,
     run_adaptive_difficulty,
+    run_adaptive_narrative,
+    run_roster_scoring,
     run_analysis_workflow,
     run_batch_simulate,
     run_full_workflow,
@@ -21,7 +27,12 @@ from app.services.langgraph_service import (
     run_workflow,
     schedule_prewarm,
 )
-from app.services.disability_assessment_service import start_assessment, evaluate_assessment
+from app.services.disability_assessment_service import (
+    evaluate_assessment,
+    get_prefetch_stats,
+    get_screening_bank_stats,
+    start_assessment,
+)
 from app.services.grade_registry import (
     DEFAULT_DIFFICULTY,
     DEFAULT_GRADE_LEVEL,
@@ -30,6 +41,7 @@ from app.services.grade_registry import (
     validate_difficulty,
     validate_grade_level,
 )
+from app.services.llm_dispatcher import Priority, llm_priority
 
 
 def _coerce_grade(value: str) -> str:
@@ -128,11 +140,13 @@ class CacheInvalidateRequest(BaseModel):
 class AssessmentRound(BaseModel):
     question: str
     answer: str
+    focus_area: Optional[str] = None
 
 
 class DisabilityAssessmentStartRequest(BaseModel):
     grade_level: str = Field(default=DEFAULT_GRADE_LEVEL)
     difficulty: str = Field(default=DEFAULT_DIFFICULTY)
+    user_id: Optional[str] = None
 
     @field_validator("grade_level", mode="before")
     @classmethod
@@ -166,6 +180,7 @@ class AdaptiveDifficultyRequest(BaseModel):
     grade_level: str = Field(default=DEFAULT_GRADE_LEVEL)
     difficulty: str = Field(default=DEFAULT_DIFFICULTY)
     student_history: List[Dict[str, Any]] = Field(default_factory=list)
+    student_id: Optional[str] = None
 
     @field_validator("grade_level", mode="before")
     @classmethod
@@ -178,6 +193,27 @@ class AdaptiveDifficultyRequest(BaseModel):
         return _coerce_difficulty(value)
 
 
+class RosterStudent(BaseModel):
+    student_id: Optional[str] = None
+    grade_level: str = Field(default=DEFAULT_GRADE_LEVEL)
+    difficulty: str = Field(default=DEFAULT_DIFFICULTY)
+    student_history: List[Dict[str, Any]] = Field(default_factory=list)
+
+    @field_validator("grade_level", mode="before")
+    @classmethod
+    def normalize_grade(cls, value: str) -> str:
+        return _coerce_grade(value)
+
+    @field_validator("difficulty", mode="before")
+    @classmethod
+    def normalize_difficulty_field(cls, value: str) -> str:
+        return _coerce_difficulty(value)
+
+
+class RosterScoringRequest(BaseModel):
+    students: List[RosterStudent] = Field(default_factory=list)
+
+
 langgraph_router = APIRouter()
 
 
@@ -198,7 +234,8 @@ async def healthcheck() -> Dict[str, Any]:
 @langgraph_router.post("/disability-assessment/start")
 async def disability_assessment_start(payload: DisabilityAssessmentStartRequest) -> Dict[str, Any]:
     try:
-        return await start_assessment(payload.grade_level, payload.difficulty)
+        with llm_priority(Priority.INTERACTIVE):
+            return await start_assessment(payload.grade_level, payload.difficulty, payload.user_id)
     except HTTPException:
         raise
     except Exception as exc:
@@ -208,13 +245,14 @@ async def disability_assessment_start(payload: DisabilityAssessmentStartRequest)
 @langgraph_router.post("/disability-assessment/evaluate")
 async def disability_assessment_evaluate(payload: DisabilityAssessmentEvaluateRequest) -> Dict[str, Any]:
     try:
-        rounds = [r.model_dump() for r in payload.rounds]
-        return await evaluate_assessment(
-            payload.grade_level,
-            payload.difficulty,
-            rounds,
-            payload.round_number,
-        )
+        rounds = [r.model_dump(exclude_none=True) for r in payload.rounds]
+        with llm_priority(Priority.INTERACTIVE):
+            return await evaluate_assessment(
+                payload.grade_level,
+                payload.difficulty,
+                rounds,
+                payload.round_number,
+            )
     except HTTPException:
         raise
     except Exception as exc:
@@ -231,11 +269,56 @@ async def adaptive_difficulty(payload: AdaptiveDifficultyRequest) -> Dict[str, A
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@langgraph_router.post("/adaptive-roster")
+async def adaptive_roster(payload: RosterScoringRequest) -> Dict[str, Any]:
+    try:
+        return await run_roster_scoring(payload.model_dump())
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@langgraph_router.post("/adaptive-narrative")
+async def adaptive_narrative(payload: AdaptiveDifficultyRequest) -> Dict[str, Any]:
+    try:
+        return await run_adaptive_narrative(payload.model_dump())
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 @langgraph_router.get("/cache-stats")
 async def cache_stats() -> Dict[str, Any]:
     return await get_cache_stats()
 
 
+@langgraph_router.get("/checkpoint-stats")
+async def checkpoint_stats() -> Dict[str, Any]:
+    return get_checkpoint_stats()
+
+
+@langgraph_router.get("/llm-stats")
+async def llm_stats() -> Dict[str, Any]:
+    return get_llm_stats()
+
+
+@langgraph_router.get("/assessment-stats")
+async def assessment_stats() -> Dict[str, Any]:
+    return {"screening_bank": get_screening_bank_stats(), "prefetch": get_prefetch_stats()}
+
+
+@langgraph_router.get("/student-aggregates/{student_id}")
+async def student_aggregates(student_id: str) -> Dict[str, Any]:
+    try:
+        return await get_student_aggregates(student_id)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 @langgraph_router.post("/cache-invalidate")
 async def cache_invalidate(payload: CacheInvalidateRequest) -> Dict[str, Any]:
     try:
@@ -249,6 +332,14 @@ async def prewarm_status(session_key: str) -> Dict[str, Any]:
     return get_prewarm_status(session_key)
 
 
+@langgraph_router.get("/workflow-progress/{session_id}")
+async def workflow_progress(session_id: str) -> Dict[str, Any]:
+    try:
+        return await get_workflow_progress(session_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 @langgraph_router.post("/prewarm")
 async def prewarm_workflow(payload: PrewarmRequest) -> Dict[str, Any]:
     try:
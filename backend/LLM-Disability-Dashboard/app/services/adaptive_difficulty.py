@@ -1,15 +1,51 @@
 import json
-from typing import Dict, List, Any
+import os
+from typing import Dict, List, Any, Optional, Sequence
 from fastapi import HTTPException, Response
 
+from .difficulty_policy import DifficultyPolicy, create_policy
+from .grade_registry import DEFAULT_GRADE_LEVEL
+
+# Sessions considered for current metrics and trend; older ones only count toward confidence.
+RECENT_WINDOW = 5
+
 class AdaptiveDifficultyManager:
-    def __init__(self):
+    def __init__(self, policy: Optional[DifficultyPolicy] = None):
         self.difficulty_levels = ["easy", "medium", "hard"]
         self.performance_thresholds = {
             "easy": {"min_consistency": 0.8, "min_accuracy": 0.9},
             "medium": {"min_consistency": 0.6, "min_accuracy": 0.7},
             "hard": {"min_consistency": 0.4, "min_accuracy": 0.5}
         }
+        self.policy = policy or create_policy(os.getenv("ADAPTIVE_POLICY", "rule"), self)
+
+    def set_policy(self, policy: DifficultyPolicy) -> None:
+        self.policy = policy
+
+    def recommend(
+        self,
+        student_history: List[Dict[str, Any]],
+        current_difficulty: str,
+        *,
+        grade_level: str = DEFAULT_GRADE_LEVEL,
+        student_id: Optional[str] = None,
+        aggregate: Any = None,
+    ) -> Dict[str, Any]:
+        """Next-difficulty plan from the configured policy (rule-based unless ADAPTIVE_POLICY says otherwise)."""
+        return self.policy.recommend(
+            student_history,
+            current_difficulty,
+            grade_level=grade_level,
+            student_id=student_id,
+            aggregate=aggregate,
+        )
+
+    def recommend_roster(self, students: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score a whole class roster in one policy call."""
+        return self.policy.recommend_batch(students)
+
+    def observe(self, student_id: str, *, grade_level: str, difficulty: str, success: float) -> None:
+        self.policy.observe(student_id, grade_level=grade_level, difficulty=difficulty, success=success)
     
     def calculate_next_difficulty(self, student_history: List[Dict], current_difficulty: str) -> Dict[str, Any]:
         """
@@ -38,7 +74,35 @@ class AdaptiveDifficultyManager:
                 ],
             }
 
-        recent_sessions = student_history[-5:]
+        return self._build_plan(student_history[-RECENT_WINDOW:], len(student_history), current_difficulty)
+
+    def calculate_from_aggregate(self, aggregate: Any, current_difficulty: str) -> Dict[str, Any]:
+        """
+        Same decision as ``calculate_next_difficulty`` from a stored running aggregate.
+
+        ``aggregate`` is a ``StudentAggregate``: its recent window replaces the
+        history tail and its session count drives confidence, so the cost does not
+        grow with the number of sessions.
+        """
+        if not aggregate or not aggregate.sessions:
+            return self.calculate_next_difficulty([], current_difficulty)
+
+        plan = self._build_plan(aggregate.recent[-RECENT_WINDOW:], aggregate.sessions, current_difficulty)
+        plan["current_performance"].update(
+            {
+                "session_count": aggregate.sessions,
+                "mean_consistency": round(aggregate.mean_consistency, 4),
+                "ewma_consistency": round(aggregate.consistency_ewma, 4),
+            }
+        )
+        return plan
+
+    def _build_plan(
+        self,
+        recent_sessions: List[Dict[str, Any]],
+        session_count: int,
+        current_difficulty: str,
+    ) -> Dict[str, Any]:
         metrics = self._extract_metrics(recent_sessions)
         trend = self._compute_trend(recent_sessions)
         adjustment = self._choose_difficulty(current_difficulty, metrics, trend)
@@ -46,7 +110,7 @@ class AdaptiveDifficultyManager:
         return {
             "recommended_difficulty": adjustment["new_difficulty"],
             "reasoning": adjustment["reasoning"],
-            "confidence": self._confidence_score(student_history, metrics),
+            "confidence": self._confidence_score(session_count, metrics),
             "current_performance": {
                 "consistency_score": metrics["avg_consistency"],
                 "accuracy_rate": metrics["accuracy"],
@@ -140,8 +204,7 @@ class AdaptiveDifficultyManager:
             "reasoning": "Keep practicing at the current level to gather more data before adjusting.",
         }
 
-    def _confidence_score(self, history: List[Dict[str, Any]], metrics: Dict[str, float]) -> float:
-        session_count = len(history)
+    def _confidence_score(self, session_count: int, metrics: Dict[str, float]) -> float:
         base = 0.3 + min(session_count, 10) * 0.05  # up to 0.8 from count
         if metrics["explicit_accuracy_used"]:
             base += 0.1
@@ -1,10 +1,14 @@
 """Multi-tier cache: L1 in-memory, L2 Redis, L3 SQLite fallback."""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import mmap
 import os
 import sqlite3
+import struct
+import tempfile
 import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
@@ -17,6 +21,13 @@ logger = logging.getLogger(__name__)
 DEFAULT_L1_TTL = 300
 DEFAULT_L2_TTL = 86400
 DEFAULT_L1_SIZE = 256
+DEFAULT_SHM_BUCKETS = 2048
+DEFAULT_SHM_SLOT_SIZE = 16384
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no POSIX byte-range locks
+    fcntl = None  # type: ignore[assignment]
 
 
 @dataclass
@@ -83,6 +94,169 @@ class InMemoryBackend(BaseCacheBackend):
         return {"entries": len(self._store), "max_entries": self.max_entries}
 
 
+class SharedMemoryBackend(BaseCacheBackend):
+    """mmap-backed hash table shared by every worker process on the host.
+
+    The file is split into fixed-size slots (one per bucket, direct mapped).
+    Readers never lock: each slot carries a sequence counter that writers bump
+    to an odd value before touching the slot and to the next even value when
+    done, so a reader retries whenever the counter changed under it. Writers
+    serialize per bucket with a POSIX byte-range lock on the slot.
+    """
+
+    _MAGIC = b"LDSHM001"
+    _FILE_HEADER = struct.Struct("<8sII")  # magic, buckets, slot_size
+    _SLOT_HEADER = struct.Struct("<QdQHI")  # seq, expires_at, key_hash, key_len, value_len
+    _READ_RETRIES = 8
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        buckets: int = DEFAULT_SHM_BUCKETS,
+        slot_size: int = DEFAULT_SHM_SLOT_SIZE,
+        ttl_seconds: int = DEFAULT_L1_TTL,
+    ) -> None:
+        self.path = path
+        self.buckets = max(1, buckets)
+        self.slot_size = max(self._SLOT_HEADER.size + 64, slot_size)
+        self.ttl_seconds = max(0, ttl_seconds)
+        self._data_offset = self._FILE_HEADER.size
+        self._size = self._data_offset + self.buckets * self.slot_size
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init_file()
+            self._mm = mmap.mmap(self._fd, self._size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _init_file(self) -> None:
+        self._lock_range(0, self._data_offset)
+        try:
+            current = os.fstat(self._fd).st_size
+            header = os.pread(self._fd, self._FILE_HEADER.size, 0) if current else b""
+            expected = self._FILE_HEADER.pack(self._MAGIC, self.buckets, self.slot_size)
+            if current == self._size and header == expected:
+                return
+            if header.strip(b"\0"):
+                # Other workers may have this file mapped; resizing it under them raises SIGBUS.
+                raise OSError(
+                    f"{self.path} already holds a cache with a different layout; use the same "
+                    "CACHE_SHM_BUCKETS/CACHE_SHM_SLOT_SIZE in every worker or a separate CACHE_SHM_PATH"
+                )
+            # Empty, or created by a worker that died before writing the header.
+            os.ftruncate(self._fd, self._size)
+            os.pwrite(self._fd, expected, 0)
+        finally:
+            self._unlock_range(0, self._data_offset)
+
+    def _lock_range(self, start: int, length: int) -> None:
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+
+    def _unlock_range(self, start: int, length: int) -> None:
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    @staticmethod
+    def _hash_key(key_bytes: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+
+    def _slot_offset(self, key_hash: int) -> int:
+        return self._data_offset + (key_hash % self.buckets) * self.slot_size
+
+    def _read_slot(self, offset: int) -> Optional[tuple[float, int, bytes, bytes]]:
+        header_size = self._SLOT_HEADER.size
+        for _ in range(self._READ_RETRIES):
+            seq, expires_at, key_hash, key_len, value_len = self._SLOT_HEADER.unpack_from(self._mm, offset)
+            if seq & 1:
+                continue
+            if expires_at == 0.0:
+                return None
+            body_end = offset + header_size + key_len + value_len
+            if body_end > offset + self.slot_size:
+                continue
+            body = self._mm[offset + header_size : body_end]
+            if struct.unpack_from("<Q", self._mm, offset)[0] != seq:
+                continue
+            return expires_at, key_hash, body[:key_len], body[key_len:]
+        return None
+
+    def _write_slot(self, offset: int, expires_at: float, key_hash: int, key_bytes: bytes, value_bytes: bytes) -> None:
+        self._lock_range(offset, self.slot_size)
+        try:
+            seq = struct.unpack_from("<Q", self._mm, offset)[0]
+            struct.pack_into("<Q", self._mm, offset, seq + 1)
+            header_size = self._SLOT_HEADER.size
+            body = key_bytes + value_bytes
+            self._mm[offset + header_size : offset + header_size + len(body)] = body
+            self._SLOT_HEADER.pack_into(
+                self._mm, offset, seq + 1, expires_at, key_hash, len(key_bytes), len(value_bytes)
+            )
+            struct.pack_into("<Q", self._mm, offset, seq + 2)
+        finally:
+            self._unlock_range(offset, self.slot_size)
+
+    async def get(self, key: str) -> Optional[str]:
+        key_bytes = key.encode("utf-8")
+        key_hash = self._hash_key(key_bytes)
+        entry = self._read_slot(self._slot_offset(key_hash))
+        if entry is None:
+            return None
+        expires_at, stored_hash, stored_key, value = entry
+        if stored_hash != key_hash or stored_key != key_bytes or expires_at < time.time():
+            return None
+        return value.decode("utf-8")
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        key_bytes = key.encode("utf-8")
+        value_bytes = value.encode("utf-8")
+        if self._SLOT_HEADER.size + len(key_bytes) + len(value_bytes) > self.slot_size:
+            logger.debug("Shared L1 skip: %s exceeds slot size %s", key[:24], self.slot_size)
+            return
+        ttl = min(ttl, self.ttl_seconds) if self.ttl_seconds else ttl
+        key_hash = self._hash_key(key_bytes)
+        self._write_slot(
+            self._slot_offset(key_hash),
+            time.time() + max(1, ttl),
+            key_hash,
+            key_bytes,
+            value_bytes,
+        )
+
+    async def delete_pattern(self, pattern: str) -> int:
+        prefix = pattern.rstrip("*").encode("utf-8")
+        count = 0
+        for bucket in range(self.buckets):
+            offset = self._data_offset + bucket * self.slot_size
+            entry = self._read_slot(offset)
+            if entry is None or not entry[2].startswith(prefix):
+                continue
+            self._write_slot(offset, 0.0, 0, b"", b"")
+            count += 1
+        return count
+
+    async def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        entries = 0
+        for bucket in range(self.buckets):
+            entry = self._read_slot(self._data_offset + bucket * self.slot_size)
+            if entry is not None and entry[0] >= now:
+                entries += 1
+        return {
+            "entries": entries,
+            "buckets": self.buckets,
+            "slot_size": self.slot_size,
+            "shm_path": self.path,
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
 class SQLiteBackend(BaseCacheBackend):
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
@@ -181,7 +355,7 @@ class TieredCacheStore:
     def __init__(
         self,
         *,
-        l1: Optional[InMemoryBackend] = None,
+        l1: Optional[BaseCacheBackend] = None,
         l2: Optional[BaseCacheBackend] = None,
         l3: Optional[SQLiteBackend] = None,
     ) -> None:
@@ -258,7 +432,21 @@ _store: Optional[TieredCacheStore] = None
 def create_cache_store() -> TieredCacheStore:
     l1_ttl = int(os.getenv("CACHE_L1_TTL", str(DEFAULT_L1_TTL)))
     l1_size = int(os.getenv("LANGGRAPH_CACHE_SIZE", str(DEFAULT_L1_SIZE)))
-    l1 = InMemoryBackend(max_entries=l1_size, ttl_seconds=l1_ttl)
+    l1: BaseCacheBackend = InMemoryBackend(max_entries=l1_size, ttl_seconds=l1_ttl)
+
+    if os.getenv("CACHE_L1_BACKEND", "memory").strip().lower() == "shm":
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        shm_path = os.getenv("CACHE_SHM_PATH", os.path.join(shm_dir, "llm-dashboard-l1.cache"))
+        try:
+            l1 = SharedMemoryBackend(
+                shm_path,
+                buckets=int(os.getenv("CACHE_SHM_BUCKETS", str(DEFAULT_SHM_BUCKETS))),
+                slot_size=int(os.getenv("CACHE_SHM_SLOT_SIZE", str(DEFAULT_SHM_SLOT_SIZE))),
+                ttl_seconds=l1_ttl,
+            )
+            logger.info("Cache L1: shared memory at %s", shm_path)
+        except OSError as exc:
+            logger.warning("Shared memory L1 unavailable, using in-process L1: %s", exc)
 
     l2: Optional[BaseCacheBackend] = None
     redis_url = os.getenv("REDIS_URL", "").strip()
@@ -286,4 +474,4 @@ def get_cache_store() -> TieredCacheStore:
     return _store
 
 
-__all__ = ["TieredCacheStore", "get_cache_store", "create_cache_store"]
+__all__ = ["TieredCacheStore", "SharedMemoryBackend", "get_cache_store", "create_cache_store"]
@@ -0,0 +1,224 @@
+"""Async SQLite checkpoint store for LangGraph workflow runs.
+
+The orchestrator snapshots state after selected nodes only (not every
+transition) on a single long-lived aiosqlite connection in WAL mode. Old
+checkpoints are pruned per thread by count and globally by age.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_NODES = ("generate_problem_step", "simulate_attempt_step", "analyze_attempt_step")
+DEFAULT_MAX_PER_THREAD = 20
+DEFAULT_MAX_AGE_SECONDS = 7 * 86400
+AGE_PRUNE_INTERVAL = 100
+
+
+@dataclass
+class CheckpointStats:
+    writes: int = 0
+    errors: int = 0
+    pruned: int = 0
+    write_ms_total: float = 0.0
+    write_ms_max: float = 0.0
+
+
+class CheckpointStore:
+    """Persist workflow state snapshots keyed by thread id."""
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        nodes: Iterable[str] = DEFAULT_CHECKPOINT_NODES,
+        max_per_thread: int = DEFAULT_MAX_PER_THREAD,
+        max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS,
+    ) -> None:
+        self.db_path = db_path
+        self.nodes = frozenset(nodes)
+        self.max_per_thread = max(1, max_per_thread)
+        self.max_age_seconds = max(0, max_age_seconds)
+        self.stats = CheckpointStats()
+        self._conn: Optional[aiosqlite.Connection] = None
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            await conn.execute("PRAGMA busy_timeout=5000")
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS workflow_checkpoints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    thread_id TEXT NOT NULL,
+                    node TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_checkpoints_thread ON workflow_checkpoints(thread_id, id)"
+            )
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON workflow_checkpoints(created_at)"
+            )
+            if self._conn is None:
+                self._conn = conn
+            else:  # pragma: no cover - lost a concurrent open race
+                await conn.close()
+        return self._conn
+
+    def should_checkpoint(self, node: str) -> bool:
+        return node in self.nodes
+
+    async def save(
+        self,
+        thread_id: str,
+        node: str,
+        state: Dict[str, Any],
+        *,
+        status: str = "running",
+    ) -> None:
+        """Write one snapshot; failures are logged and never break the workflow."""
+        started = time.perf_counter()
+        try:
+            conn = await self._connection()
+            payload = json.dumps(state, ensure_ascii=False, separators=(",", ":"), default=str)
+            await conn.execute(
+                "INSERT INTO workflow_checkpoints (thread_id, node, status, state, created_at) VALUES (?, ?, ?, ?, ?)",
+                (thread_id, node, status, payload, time.time()),
+            )
+            await self._prune_thread(conn, thread_id)
+        except Exception as exc:
+            self.stats.errors += 1
+            logger.warning("Checkpoint write failed for %s/%s: %s", thread_id, node, exc)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.writes += 1
+        self.stats.write_ms_total += elapsed_ms
+        self.stats.write_ms_max = max(self.stats.write_ms_max, elapsed_ms)
+        if self.stats.writes % AGE_PRUNE_INTERVAL == 0:
+            await self.prune_expired()
+
+    async def latest(self, thread_id: str, *, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        conn = await self._connection()
+        if status is None:
+            cursor = await conn.execute(
+                "SELECT node, status, state, created_at FROM workflow_checkpoints "
+                "WHERE thread_id = ? ORDER BY id DESC LIMIT 1",
+                (thread_id,),
+            )
+        else:
+            cursor = await conn.execute(
+                "SELECT node, status, state, created_at FROM workflow_checkpoints "
+                "WHERE thread_id = ? AND status = ? ORDER BY id DESC LIMIT 1",
+                (thread_id, status),
+            )
+        row = await cursor.fetchone()
+        await cursor.close()
+        if row is None:
+            return None
+        node, status, state, created_at = row
+        return {"node": node, "status": status, "state": json.loads(state), "created_at": created_at}
+
+    async def history(self, thread_id: str) -> List[Dict[str, Any]]:
+        conn = await self._connection()
+        cursor = await conn.execute(
+            "SELECT node, status, created_at FROM workflow_checkpoints WHERE thread_id = ? ORDER BY id",
+            (thread_id,),
+        )
+        rows = await cursor.fetchall()
+        await cursor.close()
+        return [{"node": node, "status": status, "created_at": created_at} for node, status, created_at in rows]
+
+    async def _prune_thread(self, conn: aiosqlite.Connection, thread_id: str) -> None:
+        cursor = await conn.execute(
+            """
+            DELETE FROM workflow_checkpoints
+            WHERE thread_id = ? AND id <= (
+                SELECT id FROM workflow_checkpoints WHERE thread_id = ?
+                ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (thread_id, thread_id, self.max_per_thread),
+        )
+        self.stats.pruned += max(cursor.rowcount, 0)
+        await cursor.close()
+
+    async def prune_expired(self) -> int:
+        if not self.max_age_seconds:
+            return 0
+        conn = await self._connection()
+        cursor = await conn.execute(
+            "DELETE FROM workflow_checkpoints WHERE created_at < ?",
+            (time.time() - self.max_age_seconds,),
+        )
+        deleted = max(cursor.rowcount, 0)
+        await cursor.close()
+        self.stats.pruned += deleted
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        writes = self.stats.writes
+        return {
+            "db_path": self.db_path,
+            "nodes": sorted(self.nodes),
+            "writes": writes,
+            "errors": self.stats.errors,
+            "pruned": self.stats.pruned,
+            "avg_write_ms": round(self.stats.write_ms_total / writes, 3) if writes else 0.0,
+            "max_write_ms": round(self.stats.write_ms_max, 3),
+        }
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+def checkpoint_db_path() -> str:
+    return os.getenv(
+        "CHECKPOINT_DB_PATH",
+        str(Path(__file__).resolve().parents[2] / "data" / "checkpoints.db"),
+    )
+
+
+def create_checkpoint_store() -> Optional[CheckpointStore]:
+    """Build the store from environment settings, or None when disabled."""
+    flag = os.getenv("CHECKPOINT_ENABLED", "true").strip().lower()
+    if flag in {"0", "false", "no", "off"}:
+        return None
+
+    db_path = checkpoint_db_path()
+    nodes_raw = os.getenv("CHECKPOINT_NODES", "")
+    nodes = [n.strip() for n in nodes_raw.split(",") if n.strip()] or list(DEFAULT_CHECKPOINT_NODES)
+    try:
+        max_per_thread = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", str(DEFAULT_MAX_PER_THREAD)))
+        max_age = int(os.getenv("CHECKPOINT_MAX_AGE", str(DEFAULT_MAX_AGE_SECONDS)))
+    except ValueError:
+        max_per_thread, max_age = DEFAULT_MAX_PER_THREAD, DEFAULT_MAX_AGE_SECONDS
+    return CheckpointStore(db_path, nodes=nodes, max_per_thread=max_per_thread, max_age_seconds=max_age)
+
+
+__all__ = [
+    "CheckpointStore",
+    "CheckpointStats",
+    "checkpoint_db_path",
+    "create_checkpoint_store",
+    "DEFAULT_CHECKPOINT_NODES",
+]
@@ -1,17 +1,73 @@
 import os
 import json
 import sqlite3
+import asyncio
 import aiosqlite
-from typing import Dict, Any, List
+from contextlib import asynccontextmanager
+from itertools import groupby
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from pathlib import Path
 
 # Database path
 DB_PATH = Path(__file__).parent.parent / "database.sqlite"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_WRITE_BATCH_SIZE = 200
+DEFAULT_WRITE_FLUSH_MS = 5.0
+DEFAULT_WRITE_QUEUE_SIZE = 2000
+DEFAULT_WRITE_QUEUE_TIMEOUT = 5.0
+# off: one autocommit INSERT per call; commit: batched, caller waits for its batch to commit;
+# enqueue: batched, caller returns once the row is queued (lost if the process dies before flushing).
+WRITE_DURABILITY_MODES = ("off", "commit", "enqueue")
 
-async def init_database():
-    """Initialize the database and create tables if they don't exist"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
+DEFAULT_HISTORY_LIMIT = 5
+MAX_HISTORY_LIMIT = 100
+TOP_TAGS_PER_KIND = 10
+
+
+def _progress_tags_select(student_expr: str, analysis_expr: str, source: str = "") -> str:
+    """SELECT producing (student_id, kind, tag, count) tallies from ai_analysis JSON values."""
+    doc = f"CASE WHEN json_valid({analysis_expr}) THEN {analysis_expr} ELSE '{{}}' END"
+    tables = f"{source}, " if source else ""
+    return f'''
+        SELECT student_id, kind, tag, COUNT(*) FROM (
+            SELECT {student_expr} AS student_id, 'strength' AS kind, j.value AS tag
+            FROM {tables}json_each({doc}, '$.strengths') AS j WHERE j.type = 'text'
+            UNION ALL
+            SELECT {student_expr}, 'weakness', j.value
+            FROM {tables}json_each({doc}, '$.weaknesses') AS j WHERE j.type = 'text'
+            UNION ALL
+            SELECT {student_expr}, 'approach', CASE WHEN j.type = 'object' THEN json_extract(j.value, '$.area') END
+            FROM {tables}json_each({doc}, '$.suggestedApproaches') AS j
+        ) WHERE tag IS NOT NULL AND student_id IS NOT NULL
+        GROUP BY student_id, kind, tag
+    '''
+
+
+def _analysis_items_select(response_expr: str, student_expr: str, analysis_expr: str, source: str = "") -> str:
+    """SELECT producing one response_analysis_items row per list entry of an ai_analysis JSON value."""
+    doc = f"CASE WHEN json_valid({analysis_expr}) THEN {analysis_expr} ELSE '{{}}' END"
+    tables = f"{source}, " if source else ""
+    # Only array entries count (integer keys); a scalar or object in place of a list is ignored.
+    return f'''
+        SELECT {response_expr}, {student_expr}, 'strength', j.key, j.value
+        FROM {tables}json_each({doc}, '$.strengths') AS j WHERE typeof(j.key) = 'integer'
+        UNION ALL
+        SELECT {response_expr}, {student_expr}, 'weakness', j.key, j.value
+        FROM {tables}json_each({doc}, '$.weaknesses') AS j WHERE typeof(j.key) = 'integer'
+        UNION ALL
+        SELECT {response_expr}, {student_expr}, 'approach', j.key,
+               CASE WHEN j.type = 'object' THEN json_extract(j.value, '$.area') END
+        FROM {tables}json_each({doc}, '$.suggestedApproaches') AS j WHERE typeof(j.key) = 'integer'
+    '''
+
+
+# Ordered schema migrations: (version, name, statements). Applied once by init_database().
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...]]] = [
+    (
+        1,
+        "initial_schema",
+        (
+            '''
             CREATE TABLE IF NOT EXISTS students (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT,
@@ -19,9 +75,8 @@ async def init_database():
                 age INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        ''')
-        
-        await db.execute('''
+            ''',
+            '''
             CREATE TABLE IF NOT EXISTS sessions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 student_id INTEGER,
@@ -31,9 +86,8 @@ async def init_database():
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (student_id) REFERENCES students (id)
             )
-        ''')
-        
-        await db.execute('''
+            ''',
+            '''
             CREATE TABLE IF NOT EXISTS responses (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 student_id INTEGER,
@@ -43,42 +97,473 @@ async def init_database():
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (student_id) REFERENCES students (id)
             )
-        ''')
-        
-        await db.commit()
+            ''',
+        ),
+    ),
+    (
+        2,
+        "history_indexes_and_progress_summary",
+        (
+            'CREATE INDEX IF NOT EXISTS idx_sessions_student_ts ON sessions (student_id, timestamp DESC, id DESC)',
+            'CREATE INDEX IF NOT EXISTS idx_responses_student_ts ON responses (student_id, timestamp DESC, id DESC)',
+            '''
+            CREATE TABLE IF NOT EXISTS student_progress (
+                student_id INTEGER PRIMARY KEY,
+                session_count INTEGER NOT NULL DEFAULT 0,
+                response_count INTEGER NOT NULL DEFAULT 0,
+                last_session_at TIMESTAMP,
+                last_response_at TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS student_progress_tags (
+                student_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (student_id, kind, tag)
+            )
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_sessions_progress AFTER INSERT ON sessions
+            WHEN NEW.student_id IS NOT NULL
+            BEGIN
+                INSERT INTO student_progress (student_id, session_count, last_session_at)
+                VALUES (NEW.student_id, 1, NEW.timestamp)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    session_count = session_count + 1,
+                    last_session_at = MAX(COALESCE(last_session_at, ''), excluded.last_session_at);
+            END
+            ''',
+            f'''
+            CREATE TRIGGER IF NOT EXISTS trg_responses_progress AFTER INSERT ON responses
+            WHEN NEW.student_id IS NOT NULL
+            BEGIN
+                INSERT INTO student_progress (student_id, response_count, last_response_at)
+                VALUES (NEW.student_id, 1, NEW.timestamp)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    response_count = response_count + 1,
+                    last_response_at = MAX(COALESCE(last_response_at, ''), excluded.last_response_at);
+                INSERT INTO student_progress_tags (student_id, kind, tag, count)
+                {_progress_tags_select("NEW.student_id", "NEW.ai_analysis")}
+                ON CONFLICT (student_id, kind, tag) DO UPDATE SET count = count + excluded.count;
+            END
+            ''',
+            # Backfill the summary from rows written before this migration.
+            '''
+            INSERT INTO student_progress (student_id, session_count, last_session_at)
+            SELECT student_id, COUNT(*), MAX(timestamp) FROM sessions
+            WHERE student_id IS NOT NULL GROUP BY student_id
+            ''',
+            '''
+            INSERT INTO student_progress (student_id, response_count, last_response_at)
+            SELECT student_id, COUNT(*), MAX(timestamp) FROM responses
+            WHERE student_id IS NOT NULL GROUP BY student_id
+            ON CONFLICT (student_id) DO UPDATE SET
+                response_count = excluded.response_count,
+                last_response_at = excluded.last_response_at
+            ''',
+            f'''
+            INSERT INTO student_progress_tags (student_id, kind, tag, count)
+            {_progress_tags_select("r.student_id", "r.ai_analysis", source="responses AS r")}
+            ''',
+        ),
+    ),
+    (
+        3,
+        "structured_payload_columns",
+        (
+            # Generated columns are VIRTUAL (ALTER TABLE cannot add STORED ones); the indexes store them.
+            # json_extract rather than ->>, which needs SQLite 3.38.
+            '''
+            ALTER TABLE sessions ADD COLUMN disability TEXT GENERATED ALWAYS AS (
+                CASE WHEN json_valid(student_info) THEN json_extract(student_info, '$.disability') END
+            ) VIRTUAL
+            ''',
+            '''
+            ALTER TABLE responses ADD COLUMN answer_count INTEGER GENERATED ALWAYS AS (
+                CASE WHEN json_valid(responses) THEN json_array_length(responses) END
+            ) VIRTUAL
+            ''',
+            'CREATE INDEX IF NOT EXISTS idx_sessions_disability ON sessions (disability, timestamp)',
+            '''
+            CREATE TABLE IF NOT EXISTS response_analysis_items (
+                response_id INTEGER NOT NULL,
+                student_id INTEGER,
+                kind TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                value TEXT,
+                PRIMARY KEY (response_id, kind, position)
+            ) WITHOUT ROWID
+            ''',
+            'CREATE INDEX IF NOT EXISTS idx_analysis_items_student ON response_analysis_items (student_id, kind, value)',
+            f'''
+            CREATE TRIGGER IF NOT EXISTS trg_responses_analysis_items AFTER INSERT ON responses
+            BEGIN
+                INSERT INTO response_analysis_items (response_id, student_id, kind, position, value)
+                {_analysis_items_select("NEW.id", "NEW.student_id", "NEW.ai_analysis")};
+            END
+            ''',
+            f'''
+            INSERT INTO response_analysis_items (response_id, student_id, kind, position, value)
+            {_analysis_items_select("r.id", "r.student_id", "r.ai_analysis", source="responses AS r")}
+            ''',
+        ),
+    ),
+]
+
+# Statements are module constants so every pooled connection reuses its prepared-statement cache.
+INSERT_SESSION_SQL = '''INSERT INTO sessions
+                   (student_id, student_info, generated_questions, session_type)
+                   VALUES (?, ?, ?, ?)'''
+INSERT_RESPONSE_SQL = '''INSERT INTO responses
+                   (student_id, responses, teacher_feedback, ai_analysis)
+                   VALUES (?, ?, ?, ?)'''
+INSERT_STUDENT_SQL = 'INSERT INTO students (name, grade, age) VALUES (?, ?, ?)'
+SELECT_STUDENT_SQL = 'SELECT * FROM students WHERE id = ?'
+# Keyset pages: newest first, resuming strictly before the (timestamp, id) cursor.
+SELECT_SESSIONS_SQL = '''SELECT * FROM sessions WHERE student_id = ?
+                   AND (timestamp, id) < (?, ?)
+                   ORDER BY timestamp DESC, id DESC LIMIT ?'''
+SELECT_RESPONSES_SQL = '''SELECT * FROM responses WHERE student_id = ?
+                   AND (timestamp, id) < (?, ?)
+                   ORDER BY timestamp DESC, id DESC LIMIT ?'''
+# Scalar columns only, for history pages that skip the JSON payloads.
+SELECT_SESSION_COLUMNS_SQL = '''SELECT id, student_id, session_type, disability, timestamp FROM sessions
+                   WHERE student_id = ? AND (timestamp, id) < (?, ?)
+                   ORDER BY timestamp DESC, id DESC LIMIT ?'''
+SELECT_RESPONSE_COLUMNS_SQL = '''SELECT id, student_id, teacher_feedback, answer_count, timestamp FROM responses
+                   WHERE student_id = ? AND (timestamp, id) < (?, ?)
+                   ORDER BY timestamp DESC, id DESC LIMIT ?'''
+# The page's response ids are bound as one JSON array so the statement text never changes.
+SELECT_ANALYSIS_ITEMS_SQL = '''SELECT response_id, kind, value FROM response_analysis_items
+                   WHERE response_id IN (SELECT value FROM json_each(?))
+                   ORDER BY response_id, kind, position'''
+SELECT_PROGRESS_SQL = '''SELECT session_count, response_count, last_session_at, last_response_at
+                   FROM student_progress WHERE student_id = ?'''
+SELECT_PROGRESS_TAGS_SQL = '''SELECT kind, tag, count FROM (
+                       SELECT kind, tag, count,
+                              ROW_NUMBER() OVER (PARTITION BY kind ORDER BY count DESC, tag) AS rank
+                       FROM student_progress_tags WHERE student_id = ?
+                   ) WHERE rank <= ? ORDER BY kind, rank'''
+# Sorts after any stored timestamp, so a missing cursor starts at the newest row.
+_CURSOR_START = ("\uffff", 0)
+
+
+def database_path() -> str:
+    return os.getenv("DATABASE_PATH", str(DB_PATH))
+
+
+class ConnectionPool:
+    """A fixed set of long-lived aiosqlite connections in WAL mode."""
+
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._idle: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+
+    async def _open(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path, isolation_level=None, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self._idle.empty() and len(self._connections) < self.size:
+            async with self._open_lock:
+                if len(self._connections) < self.size:
+                    conn = await self._open()
+                    self._connections.append(conn)
+                    self._idle.put_nowait(conn)
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in connections:
+            await conn.close()
+
+
+class WriteBehindQueue:
+    """Groups queued INSERTs into one transaction per batch on a pooled connection.
+
+    A batch closes when it reaches ``batch_size`` rows, ``flush_ms`` after its
+    first row, or as soon as no other producer is queuing. The queue is bounded: producers wait up to ``put_timeout`` seconds
+    for room, then fail, so a stalled disk pushes back on callers instead of
+    growing memory.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        *,
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        flush_ms: float = DEFAULT_WRITE_FLUSH_MS,
+        max_queue: int = DEFAULT_WRITE_QUEUE_SIZE,
+        put_timeout: float = DEFAULT_WRITE_QUEUE_TIMEOUT,
+    ):
+        self.pool = pool
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = max(0.0, flush_ms) / 1000
+        self.put_timeout = put_timeout
+        self._queue: "asyncio.Queue[Tuple[str, tuple, Optional[asyncio.Future]]]" = asyncio.Queue(max(1, max_queue))
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {"rows": 0, "batches": 0, "failed": 0, "rejected": 0, "max_batch": 0}
+
+    async def submit(self, sql: str, params: tuple, *, wait: bool = True) -> Optional[int]:
+        """Queue one statement; with ``wait`` return its lastrowid once the batch commits."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future() if wait else None
+        try:
+            await asyncio.wait_for(self._queue.put((sql, params, future)), self.put_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise Exception("Database write queue is full")
+        return await future if future is not None else None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                # Let concurrent producers run once; a lone writer is flushed without waiting.
+                size = len(batch)
+                await asyncio.sleep(0)
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                remaining = deadline - loop.time()
+                if len(batch) == size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            except Exception as exc:
+                # No usable connection (acquire or rollback failed): fail this batch, keep the worker.
+                self.stats["failed"] += len(batch)
+                if any(future is None for _, _, future in batch):
+                    print(f"Error in queued database write: {str(exc)}")
+                for _, _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(exc)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[str, tuple, Optional[asyncio.Future]]]) -> None:
+        async with self.pool.acquire() as db:
+            try:
+                await db.execute('BEGIN IMMEDIATE')
+                row_ids = []
+                for sql, group in groupby(batch, key=lambda item: item[0]):
+                    rows = [params for _, params, _ in group]
+                    await db.executemany(sql, rows)
+                    # The write lock is held, so the run's AUTOINCREMENT ids are consecutive.
+                    cursor = await db.execute('SELECT last_insert_rowid()')
+                    last_id = (await cursor.fetchone())[0]
+                    row_ids.extend(range(last_id - len(rows) + 1, last_id + 1))
+                await db.commit()
+            except Exception:
+                if db.in_transaction:
+                    await db.rollback()
+                # Retry row by row so one bad row does not fail the whole batch.
+                row_ids = []
+                for sql, params, future in batch:
+                    try:
+                        cursor = await db.execute(sql, params)
+                        row_ids.append(cursor.lastrowid)
+                    except Exception as error:
+                        self.stats["failed"] += 1
+                        row_ids.append(error)
+        self.stats["rows"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for (_, params, future), result in zip(batch, row_ids):
+            if future is None:
+                if isinstance(result, Exception):
+                    print(f"Error in queued database write: {str(result)}")
+                continue
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Flush everything still queued, then stop the worker."""
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+
+_pool: Optional[ConnectionPool] = None
+_writer: Optional[WriteBehindQueue] = None
+_schema_ready = False
+_init_lock: Optional[asyncio.Lock] = None
+
+
+def _write_durability() -> str:
+    mode = os.getenv("DATABASE_WRITE_DURABILITY", "commit").strip().lower()
+    return mode if mode in WRITE_DURABILITY_MODES else "commit"
+
+
+def _get_writer() -> WriteBehindQueue:
+    global _writer
+    if _writer is None:
+        try:
+            batch_size = int(os.getenv("DATABASE_WRITE_BATCH_SIZE", str(DEFAULT_WRITE_BATCH_SIZE)))
+            flush_ms = float(os.getenv("DATABASE_WRITE_FLUSH_MS", str(DEFAULT_WRITE_FLUSH_MS)))
+            max_queue = int(os.getenv("DATABASE_WRITE_QUEUE_SIZE", str(DEFAULT_WRITE_QUEUE_SIZE)))
+        except ValueError:
+            batch_size, flush_ms, max_queue = DEFAULT_WRITE_BATCH_SIZE, DEFAULT_WRITE_FLUSH_MS, DEFAULT_WRITE_QUEUE_SIZE
+        _writer = WriteBehindQueue(_get_pool(), batch_size=batch_size, flush_ms=flush_ms, max_queue=max_queue)
+    return _writer
+
+
+async def _insert(sql: str, params: tuple) -> Dict[str, Any]:
+    """Run one INSERT according to DATABASE_WRITE_DURABILITY."""
+    mode = _write_durability()
+    if mode == "off":
+        async with _connection() as db:
+            cursor = await db.execute(sql, params)
+            return {"id": cursor.lastrowid}
+    if not _schema_ready:
+        await init_database()
+    if mode == "enqueue":
+        await _get_writer().submit(sql, params, wait=False)
+        return {"id": None, "queued": True}
+    return {"id": await _get_writer().submit(sql, params)}
+
+
+def get_write_queue_stats() -> Dict[str, Any]:
+    stats = dict(_writer.stats) if _writer is not None else {}
+    return {"durability": _write_durability(), **stats}
+
+
+def _get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        try:
+            size = int(os.getenv("DATABASE_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+        except ValueError:
+            size = DEFAULT_POOL_SIZE
+        Path(database_path()).parent.mkdir(parents=True, exist_ok=True)
+        _pool = ConnectionPool(database_path(), size)
+    return _pool
+
+
+async def init_database():
+    """Apply pending schema migrations. Called once at application startup."""
+    global _schema_ready, _init_lock
+    if _schema_ready:
+        return
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        if _schema_ready:
+            return
+        async with _get_pool().acquire() as db:
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor = await db.execute('SELECT version FROM schema_migrations')
+            applied = {row[0] for row in await cursor.fetchall()}
+            for version, name, statements in MIGRATIONS:
+                if version in applied:
+                    continue
+                await db.execute('BEGIN IMMEDIATE')
+                try:
+                    for statement in statements:
+                        await db.execute(statement)
+                    await db.execute(
+                        'INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                        (version, name),
+                    )
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+        _schema_ready = True
+
+
+async def close_database():
+    """Flush queued writes and close pooled connections (application shutdown)."""
+    global _pool, _writer, _schema_ready
+    if _writer is not None:
+        await _writer.close()
+    _writer = None
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+    _schema_ready = False
+
+
+@asynccontextmanager
+async def _connection() -> AsyncIterator[aiosqlite.Connection]:
+    if not _schema_ready:
+        # Outside the app lifespan (scripts, tests) the first call migrates.
+        await init_database()
+    async with _get_pool().acquire() as db:
+        yield db
+
 
 async def save_user_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Save user data to the database
-    
+
     Args:
         data: Dictionary containing studentInfo, generatedQuestions, sessionType
-        
+
     Returns:
         Dict with inserted record ID
     """
     try:
-        await init_database()
-        
         student_info = data.get("studentInfo", {})
         generated_questions = data.get("generatedQuestions", {})
         session_type = data.get("sessionType", "")
-        
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                '''INSERT INTO sessions 
-                   (student_id, student_info, generated_questions, session_type) 
-                   VALUES (?, ?, ?, ?)''',
-                (
-                    student_info.get("studentId"),
-                    json.dumps(student_info),
-                    json.dumps(generated_questions),
-                    session_type
-                )
+
+        return await _insert(
+            INSERT_SESSION_SQL,
+            (
+                student_info.get("studentId"),
+                json.dumps(student_info),
+                json.dumps(generated_questions),
+                session_type
             )
-            await db.commit()
-            
-            return {"id": cursor.lastrowid}
+        )
     except Exception as error:
         print(f"Error saving user data: {str(error)}")
         raise Exception(f"Failed to save user data: {str(error)}")
@@ -86,112 +571,151 @@ async def save_user_data(data: Dict[str, Any]) -> Dict[str, Any]:
 async def save_feedback(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Save feedback data to the database
-    
+
     Args:
         data: Dictionary containing studentId, responses, teacherFeedback, aiAnalysis
-        
+
     Returns:
         Dict with inserted record ID
     """
     try:
-        await init_database()
-        
         student_id = data.get("studentId")
         responses = data.get("responses", [])
         teacher_feedback = data.get("teacherFeedback", "")
         ai_analysis = data.get("aiAnalysis", {})
-        
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                '''INSERT INTO responses 
-                   (student_id, responses, teacher_feedback, ai_analysis) 
-                   VALUES (?, ?, ?, ?)''',
-                (
-                    student_id,
-                    json.dumps(responses),
-                    teacher_feedback,
-                    json.dumps(ai_analysis)
-                )
+
+        return await _insert(
+            INSERT_RESPONSE_SQL,
+            (
+                student_id,
+                json.dumps(responses),
+                teacher_feedback,
+                json.dumps(ai_analysis)
             )
-            await db.commit()
-            
-            return {"id": cursor.lastrowid}
+        )
     except Exception as error:
         print(f"Error saving feedback: {str(error)}")
         raise Exception(f"Failed to save feedback: {str(error)}")
 
-async def get_student_history(student_id: str) -> Dict[str, Any]:
+def _parse_cursor(cursor: Optional[str]) -> Tuple[str, int]:
+    if not cursor:
+        return _CURSOR_START
+    timestamp, _, row_id = str(cursor).rpartition("|")
+    try:
+        return timestamp, int(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid history cursor: {cursor}")
+
+
+def _next_cursor(rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    if len(rows) < limit:
+        return None
+    return f"{rows[-1]['timestamp']}|{rows[-1]['id']}"
+
+
+async def get_progress_summary(db: aiosqlite.Connection, student_id: str) -> Dict[str, Any]:
+    """Materialized per-student totals and most frequent analysis tags."""
+    cursor = await db.execute(SELECT_PROGRESS_SQL, (student_id,))
+    row = await cursor.fetchone()
+    summary: Dict[str, Any] = dict(row) if row else {
+        "session_count": 0,
+        "response_count": 0,
+        "last_session_at": None,
+        "last_response_at": None,
+    }
+    tags: Dict[str, List[Dict[str, Any]]] = {"strength": [], "weakness": [], "approach": []}
+    cursor = await db.execute(SELECT_PROGRESS_TAGS_SQL, (student_id, TOP_TAGS_PER_KIND))
+    for kind, tag, count in await cursor.fetchall():
+        tags.setdefault(kind, []).append({"tag": tag, "count": count})
+    summary["topStrengths"] = tags["strength"]
+    summary["topWeaknesses"] = tags["weakness"]
+    summary["topApproaches"] = tags["approach"]
+    return summary
+
+
+async def get_learning_progress(db: aiosqlite.Connection, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Strengths, weaknesses and approach areas per response, read from response_analysis_items."""
+    items: Dict[int, Dict[str, List[Any]]] = {
+        r["id"]: {"strength": [], "weakness": [], "approach": []} for r in responses
+    }
+    cursor = await db.execute(SELECT_ANALYSIS_ITEMS_SQL, (json.dumps(list(items)),))
+    for response_id, kind, value in await cursor.fetchall():
+        items[response_id][kind].append(value)
+    return [
+        {
+            "date": r["timestamp"],
+            "strengths": items[r["id"]]["strength"],
+            "weaknesses": items[r["id"]]["weakness"],
+            "approaches": items[r["id"]]["approach"],
+        }
+        for r in responses
+    ]
+
+
+async def get_student_history(
+    student_id: str,
+    limit: int = DEFAULT_HISTORY_LIMIT,
+    sessions_cursor: Optional[str] = None,
+    responses_cursor: Optional[str] = None,
+    include_payloads: bool = True,
+) -> Dict[str, Any]:
     """
-    Get student history from the database
-    
+    Get one page of student history from the database
+
     Args:
         student_id: ID of the student
-        
+        limit: Maximum sessions and responses to return (newest first)
+        sessions_cursor: ``nextCursor["sessions"]`` from a previous page
+        responses_cursor: ``nextCursor["responses"]`` from a previous page
+        include_payloads: Decode the JSON columns into recentSessions/recentResponses;
+            when False only scalar columns are read
+
     Returns:
         Dict containing student history data
     """
     try:
-        await init_database()
-        
-        async with aiosqlite.connect(DB_PATH) as db:
-            db.row_factory = sqlite3.Row
-            
+        limit = max(1, min(int(limit), MAX_HISTORY_LIMIT))
+        async with _connection() as db:
             # Get student info
-            cursor = await db.execute('SELECT * FROM students WHERE id = ?', (student_id,))
+            cursor = await db.execute(SELECT_STUDENT_SQL, (student_id,))
             student = await cursor.fetchone()
             student = dict(student) if student else None
-            
-            # Get sessions
-            cursor = await db.execute(
-                'SELECT * FROM sessions WHERE student_id = ? ORDER BY timestamp DESC', 
-                (student_id,)
-            )
-            sessions = await cursor.fetchall()
-            sessions = [dict(row) for row in sessions]
-            
-            # Get responses
-            cursor = await db.execute(
-                'SELECT * FROM responses WHERE student_id = ? ORDER BY timestamp DESC', 
-                (student_id,)
-            )
-            responses = await cursor.fetchall()
-            responses = [dict(row) for row in responses]
-            
-            # Parse JSON data
-            parsed_sessions = []
-            for s in sessions:
-                session_dict = dict(s)
+
+            # Get one page of sessions and responses; JSON is decoded only for these rows
+            sessions_sql = SELECT_SESSIONS_SQL if include_payloads else SELECT_SESSION_COLUMNS_SQL
+            cursor = await db.execute(sessions_sql, (student_id, *_parse_cursor(sessions_cursor), limit))
+            sessions = [dict(row) for row in await cursor.fetchall()]
+
+            responses_sql = SELECT_RESPONSES_SQL if include_payloads else SELECT_RESPONSE_COLUMNS_SQL
+            cursor = await db.execute(responses_sql, (student_id, *_parse_cursor(responses_cursor), limit))
+            responses = [dict(row) for row in await cursor.fetchall()]
+
+            # Learning progress for the returned page; all-time tallies are in progressSummary
+            learning_progress = await get_learning_progress(db, responses)
+            summary = await get_progress_summary(db, student_id)
+
+        if include_payloads:
+            for session_dict in sessions:
                 session_dict["student_info"] = json.loads(session_dict["student_info"])
                 session_dict["generated_questions"] = json.loads(session_dict["generated_questions"])
-                parsed_sessions.append(session_dict)
-            
-            parsed_responses = []
-            for r in responses:
-                response_dict = dict(r)
+
+            for response_dict in responses:
                 response_dict["responses"] = json.loads(response_dict["responses"])
                 response_dict["ai_analysis"] = json.loads(response_dict["ai_analysis"])
-                parsed_responses.append(response_dict)
-            
-            # Compile learning progress
-            learning_progress = []
-            for r in parsed_responses:
-                analysis = r["ai_analysis"]
-                progress_item = {
-                    "date": r["timestamp"],
-                    "strengths": analysis.get("strengths", []),
-                    "weaknesses": analysis.get("weaknesses", []),
-                    "approaches": [a.get("area") for a in analysis.get("suggestedApproaches", [])]
-                }
-                learning_progress.append(progress_item)
-            
-            return {
-                "studentInfo": student,
-                "sessions": len(sessions),
-                "responses": len(responses),
-                "learningProgress": learning_progress,
-                "recentSessions": parsed_sessions[:5],
-                "recentResponses": parsed_responses[:5]
-            }
+
+        return {
+            "studentInfo": student,
+            "sessions": summary["session_count"],
+            "responses": summary["response_count"],
+            "learningProgress": learning_progress,
+            "recentSessions": sessions,
+            "recentResponses": responses,
+            "progressSummary": summary,
+            "nextCursor": {
+                "sessions": _next_cursor(sessions, limit),
+                "responses": _next_cursor(responses, limit),
+            },
+        }
     except Exception as error:
         print(f"Error getting student history: {str(error)}")
         raise Exception(f"Failed to retrieve student history: {str(error)}")
@@ -199,23 +723,20 @@ async def get_student_history(student_id: str) -> Dict[str, Any]:
 async def create_student(student_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create a new student in the database
-    
+
     Args:
         student_data: Dictionary containing name, grade, age
-        
+
     Returns:
         Dict with created student info including ID
     """
     try:
-        await init_database()
-        
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with _connection() as db:
             cursor = await db.execute(
-                'INSERT INTO students (name, grade, age) VALUES (?, ?, ?)',
+                INSERT_STUDENT_SQL,
                 (student_data.get("name"), student_data.get("grade"), student_data.get("age"))
             )
-            await db.commit()
-            
+
             return {"id": cursor.lastrowid, **student_data}
     except Exception as error:
         print(f"Error creating student: {str(error)}")
@@ -0,0 +1,356 @@
+"""Pluggable difficulty-selection policies for ``AdaptiveDifficultyManager``.
+
+``RuleBasedPolicy`` is the original threshold logic. ``BanditPolicy`` treats
+every (grade, difficulty) cell as an arm with a Beta posterior over the chance
+the student succeeds there, and picks the arm whose success rate is closest to
+a target (challenging but achievable), via Thompson sampling or UCB. Posteriors
+for all students live in one ``(students, 2, grades, difficulties)`` float32
+array, so a whole roster is scored with a single vectorized call.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .grade_registry import (
+    DEFAULT_DIFFICULTY,
+    DEFAULT_GRADE_LEVEL,
+    DIFFICULTY_LEVELS,
+    GRADE_LEVELS,
+    normalize_difficulty,
+    normalize_grade_level,
+)
+
+POLICY_NAMES = ("rule", "thompson", "ucb")
+DEFAULT_TARGET_SUCCESS = 0.7
+SUCCESS_CONSISTENCY = 0.7
+
+# Prior success rate per difficulty at the student's own grade, and the drop per grade above it.
+PRIOR_SUCCESS = (0.8, 0.55, 0.3)
+PRIOR_GRADE_STEP = 0.1
+# Share of each outcome credited to dominated arms: a success also counts toward every
+# easier cell (same or lower grade and difficulty), a failure toward every harder one.
+SPILLOVER = 0.5
+DEFAULT_MAX_STUDENTS = 10000
+
+
+def session_success(session: Dict[str, Any]) -> float:
+    """1.0 for a successful session: explicit correctness, else a consistent attempt."""
+    if "is_correct" in session:
+        return 1.0 if session.get("is_correct") else 0.0
+    score = session.get("consistency_score", 0.0) or 0.0
+    return 1.0 if float(score) >= SUCCESS_CONSISTENCY else 0.0
+
+
+class DifficultyPolicy(ABC):
+    """Chooses the next difficulty from a student's history or stored state."""
+
+    name = "base"
+    # Same inputs give the same plan, so incremental workflow re-runs may reuse it.
+    deterministic = True
+
+    @abstractmethod
+    def recommend(
+        self,
+        history: List[Dict[str, Any]],
+        current_difficulty: str,
+        *,
+        grade_level: str = DEFAULT_GRADE_LEVEL,
+        student_id: Optional[str] = None,
+        aggregate: Any = None,
+    ) -> Dict[str, Any]:
+        """Return a plan dict with at least ``recommended_difficulty`` and ``confidence``."""
+
+    def recommend_batch(self, students: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score a roster; each entry has student_id, grade_level, difficulty and optional student_history."""
+        return [
+            self.recommend(
+                list(student.get("student_history") or []),
+                normalize_difficulty(student.get("difficulty", DEFAULT_DIFFICULTY)),
+                grade_level=normalize_grade_level(student.get("grade_level", DEFAULT_GRADE_LEVEL)),
+                student_id=student.get("student_id"),
+                aggregate=student.get("aggregate"),
+            )
+            for student in students
+        ]
+
+    def observe(self, student_id: str, *, grade_level: str, difficulty: str, success: float) -> None:
+        """Feed back the outcome of a finished session. Stateless policies ignore it."""
+
+
+class RuleBasedPolicy(DifficultyPolicy):
+    """The threshold rules in ``AdaptiveDifficultyManager`` (one level per step)."""
+
+    name = "rule"
+
+    def __init__(self, manager: Any) -> None:
+        self.manager = manager
+
+    def recommend(
+        self,
+        history: List[Dict[str, Any]],
+        current_difficulty: str,
+        *,
+        grade_level: str = DEFAULT_GRADE_LEVEL,
+        student_id: Optional[str] = None,
+        aggregate: Any = None,
+    ) -> Dict[str, Any]:
+        if not history and aggregate is not None:
+            plan = self.manager.calculate_from_aggregate(aggregate, current_difficulty)
+        else:
+            plan = self.manager.calculate_next_difficulty(history, current_difficulty)
+        plan["policy"] = self.name
+        return plan
+
+
+class BanditPolicy(DifficultyPolicy):
+    """Beta-Bernoulli bandit over the grade x difficulty grid.
+
+    Only arms within ``grade_window`` grades of the student's enrolled grade are
+    eligible, and outcomes spill over to easier/harder arms (see ``SPILLOVER``)
+    so evidence at one level informs its neighbours. Posteriors are kept in
+    memory per process for at most ``max_students`` students (least recently
+    used first out). A student without stored state is fitted from the uploaded
+    history, or else from the stored aggregate's recent window. Sessions that
+    history or aggregate report beyond those already counted (for example ones
+    observed by another worker) are folded into the existing row.
+    """
+
+    # Plans depend on in-process posteriors (and, for Thompson, on sampling).
+    deterministic = False
+
+    def __init__(
+        self,
+        strategy: str = "thompson",
+        *,
+        target: float = DEFAULT_TARGET_SUCCESS,
+        prior_strength: float = 2.0,
+        grade_window: int = 1,
+        exploration: float = 0.15,
+        max_students: int = DEFAULT_MAX_STUDENTS,
+        seed: Optional[int] = None,
+    ) -> None:
+        if strategy not in {"thompson", "ucb"}:
+            raise ValueError(f"Unknown bandit strategy: {strategy}")
+        self.name = strategy
+        self.strategy = strategy
+        self.target = target
+        self.prior_strength = prior_strength
+        self.grade_window = max(0, grade_window)
+        self.exploration = exploration
+        self.max_students = max(1, max_students)
+        self.grades = [value for value, _ in GRADE_LEVELS]
+        self.difficulties = [value for value, _ in DIFFICULTY_LEVELS]
+        self._grade_index = {value: i for i, value in enumerate(self.grades)}
+        self._difficulty_index = {value: i for i, value in enumerate(self.difficulties)}
+        self._rng = np.random.default_rng(seed)
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._counted: Dict[str, int] = {}
+        self._posteriors = np.zeros((0, 2, len(self.grades), len(self.difficulties)), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def _prior(self, grade_idx: int) -> np.ndarray:
+        offsets = np.arange(len(self.grades), dtype=np.float32)[:, None] - grade_idx
+        mean = np.clip(np.asarray(PRIOR_SUCCESS, dtype=np.float32)[None, :] - PRIOR_GRADE_STEP * offsets, 0.05, 0.95)
+        return np.stack([mean * self.prior_strength, (1.0 - mean) * self.prior_strength])
+
+    def _fit(self, history: List[Dict[str, Any]], grade_idx: int, current_difficulty: str) -> np.ndarray:
+        return self._prior(grade_idx) + self._evidence(history, grade_idx, current_difficulty)
+
+    def _evidence(self, history: List[Dict[str, Any]], grade_idx: int, current_difficulty: str) -> np.ndarray:
+        posterior = np.zeros((2, len(self.grades), len(self.difficulties)), dtype=np.float32)
+        if history:
+            g = np.fromiter(
+                (self._grade_index.get(normalize_grade_level(s.get("grade_level", self.grades[grade_idx])), grade_idx)
+                 for s in history),
+                dtype=np.intp,
+                count=len(history),
+            )
+            d = np.fromiter(
+                (self._difficulty_index[normalize_difficulty(s.get("difficulty", current_difficulty))] for s in history),
+                dtype=np.intp,
+                count=len(history),
+            )
+            wins = np.fromiter((session_success(s) for s in history), dtype=np.float32, count=len(history))
+            w = np.zeros(posterior.shape[1:], dtype=np.float32)
+            losses = np.zeros_like(w)
+            np.add.at(w, (g, d), wins)
+            np.add.at(losses, (g, d), 1.0 - wins)
+            # Suffix sums credit successes to easier arms, prefix sums failures to harder ones.
+            easier = w[::-1, ::-1].cumsum(0).cumsum(1)[::-1, ::-1] - w
+            harder = losses.cumsum(0).cumsum(1) - losses
+            posterior[0] += w + SPILLOVER * easier
+            posterior[1] += losses + SPILLOVER * harder
+        return posterior
+
+    def _row_for(self, student_id: str, grade_idx: int, seed: Optional[np.ndarray] = None) -> int:
+        row = self._rows.get(student_id)
+        if row is not None:
+            self._rows.move_to_end(student_id)
+            return row
+        if len(self._rows) >= self.max_students:
+            evicted, row = self._rows.popitem(last=False)
+            self._counted.pop(evicted, None)
+        else:
+            row = len(self._rows)
+            if row >= self._posteriors.shape[0]:
+                size = min(max(16, row * 2), self.max_students)
+                grown = np.zeros((size, *self._posteriors.shape[1:]), dtype=np.float32)
+                grown[:row] = self._posteriors[:row]
+                self._posteriors = grown
+        self._posteriors[row] = self._prior(grade_idx) if seed is None else seed
+        self._rows[student_id] = row
+        return row
+
+    def _sessions(self, student: Dict[str, Any], difficulty: str) -> Tuple[List[Dict[str, Any]], int]:
+        """The most recent known sessions and the total count they end at."""
+        history = list(student.get("student_history") or [])
+        if history:
+            return history, len(history)
+        aggregate = student.get("aggregate")
+        if aggregate is None or not getattr(aggregate, "sessions", 0):
+            return [], 0
+        bucket = getattr(aggregate, "difficulty", difficulty)
+        bucket = bucket if bucket in self._difficulty_index else difficulty
+        return [{**entry, "difficulty": bucket} for entry in aggregate.recent], int(aggregate.sessions)
+
+    def observe(self, student_id: str, *, grade_level: str, difficulty: str, success: float) -> None:
+        g = self._grade_index.get(normalize_grade_level(grade_level), self._grade_index[DEFAULT_GRADE_LEVEL])
+        d = self._difficulty_index[normalize_difficulty(difficulty)]
+        with self._lock:
+            row = self._row_for(str(student_id), g)
+            self._counted[str(student_id)] = self._counted.get(str(student_id), 0) + 1
+            posterior = self._posteriors[row]
+            posterior[0, : g + 1, : d + 1] += SPILLOVER * success
+            posterior[0, g, d] += (1.0 - SPILLOVER) * success
+            posterior[1, g:, d:] += SPILLOVER * (1.0 - success)
+            posterior[1, g, d] += (1.0 - SPILLOVER) * (1.0 - success)
+
+    def posterior(self, student_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(str(student_id))
+        return None if row is None else self._posteriors[row].copy()
+
+    def _choose(self, posteriors: np.ndarray, grade_idx: np.ndarray) -> Dict[str, np.ndarray]:
+        """Pick one arm per student. ``posteriors`` is (N, 2, G, D); ``grade_idx`` is (N,)."""
+        alpha, beta = posteriors[:, 0], posteriors[:, 1]
+        pulls = alpha + beta
+        mean = alpha / pulls
+        if self.strategy == "thompson":
+            score = -np.abs(self._rng.beta(alpha, beta) - self.target)
+        else:
+            total = pulls.sum(axis=(1, 2), keepdims=True)
+            bonus = self.exploration * np.sqrt(np.log(total) / pulls)
+            score = bonus - np.abs(mean - self.target)
+
+        grades = np.arange(len(self.grades))[None, :, None]
+        eligible = np.abs(grades - grade_idx[:, None, None]) <= self.grade_window
+        score = np.where(eligible, score, -np.inf)
+
+        flat = score.reshape(score.shape[0], -1).argmax(axis=1)
+        g, d = np.unravel_index(flat, score.shape[1:])
+        rows = np.arange(score.shape[0])
+        observed = pulls[rows, g, d] - self.prior_strength
+        return {"grade": g, "difficulty": d, "mean": mean[rows, g, d], "observed": observed}
+
+    def _plan(self, grade_idx: int, chosen: Dict[str, np.ndarray], i: int, current_difficulty: str) -> Dict[str, Any]:
+        grade = self.grades[int(chosen["grade"][i])]
+        difficulty = self.difficulties[int(chosen["difficulty"][i])]
+        expected = float(chosen["mean"][i])
+        observed = max(0.0, float(chosen["observed"][i]))
+        if difficulty == current_difficulty and int(chosen["grade"][i]) == grade_idx:
+            reasoning = "Current level remains closest to the target success rate."
+        else:
+            reasoning = (
+                f"Estimated success at {grade} {difficulty} is {expected:.0%}, "
+                f"closest to the {self.target:.0%} target."
+            )
+        return {
+            "recommended_difficulty": difficulty,
+            "recommended_grade_level": grade,
+            "reasoning": reasoning,
+            "confidence": round(min(0.9, 0.3 + observed * 0.05), 2),
+            "expected_success": round(expected, 4),
+            "recommendations": [
+                "Practice at the recommended level and record the outcome to refine the estimate."
+            ],
+            "policy": self.name,
+        }
+
+    def recommend(
+        self,
+        history: List[Dict[str, Any]],
+        current_difficulty: str,
+        *,
+        grade_level: str = DEFAULT_GRADE_LEVEL,
+        student_id: Optional[str] = None,
+        aggregate: Any = None,
+    ) -> Dict[str, Any]:
+        return self.recommend_batch(
+            [
+                {
+                    "student_id": student_id,
+                    "grade_level": grade_level,
+                    "difficulty": current_difficulty,
+                    "student_history": history,
+                    "aggregate": aggregate,
+                }
+            ]
+        )[0]
+
+    def recommend_batch(self, students: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not students:
+            return []
+        grade_idx = np.empty(len(students), dtype=np.intp)
+        current: List[str] = []
+        stacked = np.empty((len(students), *self._posteriors.shape[1:]), dtype=np.float32)
+        with self._lock:
+            for i, student in enumerate(students):
+                grade = normalize_grade_level(student.get("grade_level", DEFAULT_GRADE_LEVEL))
+                difficulty = normalize_difficulty(student.get("difficulty", DEFAULT_DIFFICULTY))
+                grade_idx[i] = self._grade_index[grade]
+                current.append(difficulty)
+                sessions, total = self._sessions(student, difficulty)
+                student_id = student.get("student_id")
+                if student_id is None:
+                    stacked[i] = self._fit(sessions, int(grade_idx[i]), difficulty)
+                    continue
+                key = str(student_id)
+                if key not in self._rows:
+                    row = self._row_for(key, int(grade_idx[i]), seed=self._fit(sessions, int(grade_idx[i]), difficulty))
+                    self._counted[key] = total
+                else:
+                    row = self._row_for(key, int(grade_idx[i]))
+                    unseen = total - self._counted.get(key, 0)
+                    if unseen > 0:
+                        self._posteriors[row] += self._evidence(sessions[-unseen:], int(grade_idx[i]), difficulty)
+                        self._counted[key] = total
+                stacked[i] = self._posteriors[row]
+            chosen = self._choose(stacked, grade_idx)
+        return [self._plan(int(grade_idx[i]), chosen, i, current[i]) for i in range(len(students))]
+
+
+def create_policy(name: str, manager: Any, *, seed: Optional[int] = None) -> DifficultyPolicy:
+    """Build a policy by name: ``rule`` (default), ``thompson`` or ``ucb``."""
+    name = (name or "rule").strip().lower()
+    if name in {"thompson", "ucb"}:
+        try:
+            max_students = int(os.getenv("ADAPTIVE_POLICY_MAX_STUDENTS", str(DEFAULT_MAX_STUDENTS)))
+        except ValueError:
+            max_students = DEFAULT_MAX_STUDENTS
+        return BanditPolicy(name, max_students=max_students, seed=seed)
+    return RuleBasedPolicy(manager)
+
+
+__all__ = [
+    "BanditPolicy",
+    "DifficultyPolicy",
+    "POLICY_NAMES",
+    "RuleBasedPolicy",
+    "create_policy",
+    "session_success",
+]
@@ -1,13 +1,23 @@
 """Guided disability assessment with confidence-gated verdicts."""
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
 from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException
 
 from .disability_registry import CANONICAL_NAMES, normalize_disability
+from .grade_registry import DIFFICULTY_LEVELS, GRADE_LEVELS
 from .llm_client import LLMClient
+from .llm_dispatcher import Priority, llm_priority
+from .problem_validator import validate_problem_consistency
 from .prompts import get_workflow_prompts
+from .question_bank import QuestionBank
+from .semantic_cache import normalize_free_text
+
+logger = logging.getLogger(__name__)
 
 CONFIDENCE_THRESHOLD = 0.80
 MAX_ROUNDS = 3
@@ -26,6 +36,17 @@ PROFESSIONAL_DISCLAIMER = (
     "before any decisions are made."
 )
 
+# Speculative next-round questions generated while the evaluation runs. Opt-in: each round pays
+# for up to PREFETCH_MAX_FOCI extra generations, discarded when the evaluator reaches a verdict.
+PREFETCH_ENABLED = os.getenv("ASSESSMENT_PREFETCH", "false").strip().lower() in {"1", "true", "yes", "on"}
+PREFETCH_MAX_FOCI = max(1, int(os.getenv("ASSESSMENT_PREFETCH_FOCI", "2")))
+FOCUS_MATCH_THRESHOLD = 0.5
+
+# Round 1 depends only on grade and difficulty, so it is served from a pre-generated bank.
+BANK_ENABLED = os.getenv("ASSESSMENT_BANK", "true").strip().lower() not in {"0", "false", "no", "off"}
+BANK_WARM_ON_STARTUP = os.getenv("ASSESSMENT_BANK_WARM", "false").strip().lower() in {"1", "true", "yes", "on"}
+BANK_TEMPERATURE = float(os.getenv("ASSESSMENT_BANK_TEMPERATURE", "0.9"))
+
 _llm_client = LLMClient()
 _prompts = get_workflow_prompts()
 
@@ -81,6 +102,7 @@ async def _generate_screening_problem(
     round_number: int,
     prior_rounds: Optional[List[Dict[str, str]]] = None,
     focus_area: Optional[str] = None,
+    temperature: float = 0.3,
 ) -> Dict[str, Any]:
     prompt = _prompts.get_disability_screening_problem_prompt(
         grade_level=grade_level,
@@ -92,21 +114,136 @@ async def _generate_screening_problem(
     payload = await _llm_client.invoke_with_prompt(
         prompt=prompt,
         model="gpt-4o-mini",
-        temperature=0.3,
+        temperature=temperature,
         use_cache=False,
+        prompt_type="screening",
     )
     if not isinstance(payload, dict) or not payload.get("problem"):
         raise HTTPException(status_code=500, detail="Screening problem generation failed")
     return payload
 
 
-async def start_assessment(grade_level: str, difficulty: str) -> Dict[str, Any]:
-    """Generate the first diagnostic question."""
-    problem_data = await _generate_screening_problem(
-        grade_level=grade_level,
-        difficulty=difficulty,
-        round_number=1,
-    )
+async def _generate_bank_question(key: Any) -> Dict[str, Any]:
+    grade_level, difficulty = key
+    # A higher temperature than live generation keeps the pooled questions varied.
+    with llm_priority(Priority.BACKGROUND):
+        return await _generate_screening_problem(grade_level, difficulty, round_number=1, temperature=BANK_TEMPERATURE)
+
+
+def _is_valid_screening_question(problem: Dict[str, Any]) -> bool:
+    return validate_problem_consistency(problem)["valid"]
+
+
+screening_bank = QuestionBank(
+    _generate_bank_question,
+    validate=_is_valid_screening_question,
+    target_size=int(os.getenv("ASSESSMENT_BANK_SIZE", "12")),
+    low_water=int(os.getenv("ASSESSMENT_BANK_LOW_WATER", "4")),
+    max_uses=int(os.getenv("ASSESSMENT_BANK_MAX_USES", "25")),
+)
+
+
+def warm_screening_bank() -> None:
+    """Start filling the round-1 bank for every grade and difficulty (when ASSESSMENT_BANK_WARM is set)."""
+    if BANK_ENABLED and BANK_WARM_ON_STARTUP:
+        screening_bank.warm((grade, difficulty) for grade, _ in GRADE_LEVELS for difficulty, _ in DIFFICULTY_LEVELS)
+
+
+async def close_screening_bank() -> None:
+    await screening_bank.close()
+
+
+def get_screening_bank_stats() -> Dict[str, Any]:
+    return {"enabled": BANK_ENABLED, **screening_bank.get_stats()}
+
+
+_prefetch_stats: Dict[str, int] = {"started": 0, "used": 0, "discarded": 0, "failed": 0}
+
+
+_FOCUS_STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def _focus_terms(focus_area: Optional[str]) -> frozenset:
+    if not focus_area:
+        return frozenset()
+    canonical = normalize_disability(focus_area)
+    text = canonical if canonical in CANONICAL_NAMES else focus_area
+    return frozenset(normalize_free_text(text).split()) - _FOCUS_STOPWORDS
+
+
+def _focus_matches(speculative: Optional[str], actual: Optional[str]) -> bool:
+    """Whether a question prefetched for ``speculative`` can serve the evaluator's ``actual`` focus."""
+    wanted, offered = _focus_terms(actual), _focus_terms(speculative)
+    if not wanted or not offered:
+        return wanted == offered
+    return len(wanted & offered) / min(len(wanted), len(offered)) >= FOCUS_MATCH_THRESHOLD
+
+
+def _likely_focus_areas(rounds: List[Dict[str, str]]) -> List[Optional[str]]:
+    """Most recent distinct focus areas the client reported, plus the generic follow-up (None)."""
+    focuses: List[Optional[str]] = []
+    for r in reversed(rounds):
+        focus = r.get("focus_area")
+        if focus and focus not in focuses:
+            focuses.append(focus)
+    return focuses[: PREFETCH_MAX_FOCI - 1] + [None]
+
+
+def _discard(task: "asyncio.Task[Dict[str, Any]]") -> None:
+    _prefetch_stats["discarded"] += 1
+    task.cancel()
+    # Retrieve the outcome so a failed speculative call is never reported as unhandled.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+def _serves(speculative: Optional[str], task: "asyncio.Task[Dict[str, Any]]", focus_area: Optional[str]) -> bool:
+    if _focus_matches(speculative, focus_area):
+        return True
+    # A finished question may have landed on the evaluator's focus even if it was asked for another.
+    if task.done() and not task.cancelled() and task.exception() is None:
+        return _focus_matches(task.result().get("focus_area"), focus_area)
+    return False
+
+
+async def _take_prefetched(
+    prefetched: Dict[Optional[str], "asyncio.Task[Dict[str, Any]]"],
+    focus_area: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """Await the speculative question serving ``focus_area`` and discard the rest, emptying ``prefetched``."""
+    chosen = next((task for focus, task in prefetched.items() if _serves(focus, task, focus_area)), None)
+    tasks = list(prefetched.values())
+    prefetched.clear()
+    for task in tasks:
+        if task is not chosen:
+            _discard(task)
+    if chosen is None:
+        return None
+    try:
+        problem_data = await chosen
+    except Exception as exc:
+        _prefetch_stats["failed"] += 1
+        logger.info("Speculative screening question failed, regenerating: %s", exc)
+        return None
+    _prefetch_stats["used"] += 1
+    return problem_data
+
+
+def get_prefetch_stats() -> Dict[str, Any]:
+    return {"enabled": PREFETCH_ENABLED, **_prefetch_stats}
+
+
+async def start_assessment(grade_level: str, difficulty: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Serve the first diagnostic question from the bank, generating one only on a miss."""
+    key = (grade_level, difficulty)
+    problem_data = screening_bank.take(key, user_id) if BANK_ENABLED else None
+    if problem_data is None:
+        problem_data = await _generate_screening_problem(
+            grade_level=grade_level,
+            difficulty=difficulty,
+            round_number=1,
+        )
+        if BANK_ENABLED:
+            screening_bank.add(key, problem_data, seen_by=user_id)
     return {
         "round_number": 1,
         "question": {
@@ -140,75 +277,103 @@ async def evaluate_assessment(
         difficulty=difficulty,
         round_number=round_number,
     )
-    evaluation = await _llm_client.invoke_with_prompt(
-        prompt=prompt,
-        model="gpt-4o-mini",
-        temperature=0.2,
-        use_cache=False,
-    )
-    if not isinstance(evaluation, dict):
-        raise HTTPException(status_code=500, detail="Assessment evaluation returned invalid payload")
+    # Start the likely next-round questions now so a follow-up does not wait for two calls in a row.
+    prefetched: Dict[Optional[str], "asyncio.Task[Dict[str, Any]]"] = {}
+    if PREFETCH_ENABLED and round_number < MAX_ROUNDS:
+        for likely_focus in _likely_focus_areas(rounds):
+            prefetched[likely_focus] = asyncio.create_task(
+                _generate_screening_problem(
+                    grade_level=grade_level,
+                    difficulty=difficulty,
+                    round_number=round_number + 1,
+                    prior_rounds=rounds,
+                    focus_area=likely_focus,
+                )
+            )
+            _prefetch_stats["started"] += 1
 
-    status = str(evaluation.get("status", "needs_follow_up")).lower()
-    confidence = float(evaluation.get("confidence", 0.0))
-    message = evaluation.get("message") or DEFAULT_FOLLOW_UP_MESSAGE
-    focus_area = evaluation.get("next_question_focus")
-    raw_verdict = evaluation.get("verdict") or {}
+    # Whatever happens below, speculative questions the round did not use are cancelled.
+    try:
+        evaluation = await _llm_client.invoke_with_prompt(
+            prompt=prompt,
+            model="gpt-4o-mini",
+            temperature=0.2,
+            # Never cached, not even by similarity: verdicts belong to one student's answers.
+            use_cache=False,
+            prompt_type="assessment",
+        )
+        if not isinstance(evaluation, dict):
+            raise HTTPException(status_code=500, detail="Assessment evaluation returned invalid payload")
 
-    at_max_rounds = round_number >= MAX_ROUNDS
+        status = str(evaluation.get("status", "needs_follow_up")).lower()
+        confidence = float(evaluation.get("confidence", 0.0))
+        message = evaluation.get("message") or DEFAULT_FOLLOW_UP_MESSAGE
+        focus_area = evaluation.get("next_question_focus")
+        raw_verdict = evaluation.get("verdict") or {}
 
-    # Force follow-up if LLM claims verdict but confidence is too low (unless max rounds)
-    if status == "verdict" and confidence < CONFIDENCE_THRESHOLD and not at_max_rounds:
-        status = "needs_follow_up"
-        if not focus_area:
-            focus_area = raw_verdict.get("primary_disability") or "ambiguous patterns"
+        at_max_rounds = round_number >= MAX_ROUNDS
 
-    if status == "needs_follow_up" and not at_max_rounds:
-        next_round = round_number + 1
-        problem_data = await _generate_screening_problem(
-            grade_level=grade_level,
-            difficulty=difficulty,
-            round_number=next_round,
-            prior_rounds=rounds,
-            focus_area=focus_area,
-        )
-        return {
-            "status": "needs_follow_up",
-            "confidence": confidence,
-            "confidence_label": _confidence_label(confidence),
-            "message": message if confidence < CONFIDENCE_THRESHOLD else DEFAULT_FOLLOW_UP_MESSAGE,
-            "next_question": {
-                "problem": problem_data["problem"],
-                "focus_area": problem_data.get("focus_area", focus_area),
-            },
-            "round_number": next_round,
-        }
+        # Force follow-up if LLM claims verdict but confidence is too low (unless max rounds)
+        if status == "verdict" and confidence < CONFIDENCE_THRESHOLD and not at_max_rounds:
+            status = "needs_follow_up"
+            if not focus_area:
+                focus_area = raw_verdict.get("primary_disability") or "ambiguous patterns"
 
-    # Issue verdict (either confident or forced at max rounds)
-    forced_low = confidence < CONFIDENCE_THRESHOLD
-    if not raw_verdict and forced_low:
-        raw_verdict = {
-            "primary_disability": "No disability",
-            "indicators": [],
-            "error_patterns": [],
-            "strengths_observed": [],
-            "reasoning": "Insufficient evidence across all rounds to identify a specific learning disability.",
-            "recommendations": ["Consider a formal evaluation if concerns persist."],
-        }
+        if status == "needs_follow_up" and not at_max_rounds:
+            next_round = round_number + 1
+            problem_data = await _take_prefetched(prefetched, focus_area)
+            if problem_data is None:
+                problem_data = await _generate_screening_problem(
+                    grade_level=grade_level,
+                    difficulty=difficulty,
+                    round_number=next_round,
+                    prior_rounds=rounds,
+                    focus_area=focus_area,
+                )
+            return {
+                "status": "needs_follow_up",
+                "confidence": confidence,
+                "confidence_label": _confidence_label(confidence),
+                "message": message if confidence < CONFIDENCE_THRESHOLD else DEFAULT_FOLLOW_UP_MESSAGE,
+                "next_question": {
+                    "problem": problem_data["problem"],
+                    "focus_area": problem_data.get("focus_area", focus_area),
+                },
+                "round_number": next_round,
+            }
 
-    verdict = _normalize_verdict(raw_verdict, confidence, forced_low=forced_low and at_max_rounds)
+        # Issue verdict (either confident or forced at max rounds)
+        forced_low = confidence < CONFIDENCE_THRESHOLD
+        if not raw_verdict and forced_low:
+            raw_verdict = {
+                "primary_disability": "No disability",
+                "indicators": [],
+                "error_patterns": [],
+                "strengths_observed": [],
+                "reasoning": "Insufficient evidence across all rounds to identify a specific learning disability.",
+                "recommendations": ["Consider a formal evaluation if concerns persist."],
+            }
 
-    return {
-        "status": "verdict",
-        "confidence": confidence,
-        "confidence_label": verdict["confidence_label"],
-        "verdict": verdict,
-    }
+        verdict = _normalize_verdict(raw_verdict, confidence, forced_low=forced_low and at_max_rounds)
+
+        return {
+            "status": "verdict",
+            "confidence": confidence,
+            "confidence_label": verdict["confidence_label"],
+            "verdict": verdict,
+        }
 
+    finally:
+        for task in prefetched.values():
+            _discard(task)
 
 __all__ = [
     "start_assessment",
     "evaluate_assessment",
+    "get_prefetch_stats",
+    "get_screening_bank_stats",
+    "warm_screening_bank",
+    "close_screening_bank",
     "CONFIDENCE_THRESHOLD",
     "MAX_ROUNDS",
 ]
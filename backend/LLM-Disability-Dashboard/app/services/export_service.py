@@ -0,0 +1,343 @@
+"""Streaming research exports of sessions, responses and completed workflow runs.
+
+Rows are read through a dedicated read-only SQLite cursor in ``fetchmany``
+chunks and encoded chunk by chunk, so memory stays bounded by ``chunk_size``
+regardless of how much data matches. NDJSON needs nothing extra; Parquet uses
+``pyarrow`` when it is installed, writing one row group per chunk.
+
+CLI (from backend/LLM-Disability-Dashboard)::
+
+    python -m app.services.export_service workflow_runs --start 2026-01-01 --out runs.ndjson
+    python -m app.services.export_service sessions --format parquet --out sessions.parquet
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from .checkpoint_store import checkpoint_db_path
+from .database_service import database_path
+from .disability_registry import normalize_disability
+
+EXPORT_DATASETS = ("sessions", "responses", "workflow_runs")
+EXPORT_FORMATS = ("ndjson", "parquet")
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 10_000
+
+# Nested fields are emitted as JSON values in NDJSON and as JSON strings in Parquet,
+# so every chunk of a dataset shares one flat schema. Nested workflow fields are read
+# with ``json_quote(json_extract(...))``, which always returns JSON text.
+DATASET_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "sessions": ("id", "student_id", "timestamp", "session_type", "disability", "student_info", "generated_questions"),
+    "responses": ("id", "student_id", "timestamp", "teacher_feedback", "responses", "ai_analysis"),
+    "workflow_runs": (
+        "thread_id",
+        "created_at",
+        "disability",
+        "grade_level",
+        "difficulty",
+        "consistency_score",
+        "problem",
+        "student_attempt",
+        "consistency_report",
+        "adaptive_plan",
+        "disability_analysis",
+    ),
+}
+JSON_COLUMNS = frozenset(
+    {
+        "student_info",
+        "generated_questions",
+        "responses",
+        "ai_analysis",
+        "problem",
+        "student_attempt",
+        "consistency_report",
+        "adaptive_plan",
+        "disability_analysis",
+    }
+)
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown dataset/format, unsupported filter, missing pyarrow)."""
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    disability: Optional[str] = None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date or datetime; naive values are taken as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise ExportError(f"Invalid timestamp: {value}") from exc
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _sql_timestamp(value: datetime) -> str:
+    # Matches SQLite CURRENT_TIMESTAMP text (UTC).
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _disability_names(value: str) -> Tuple[str, str]:
+    # Sessions keep whatever the teacher typed; workflow state holds the registry name.
+    return value.strip(), normalize_disability(value)
+
+
+def _build_query(dataset: str, filters: ExportFilters) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if dataset == "workflow_runs":
+        if filters.start:
+            clauses.append("created_at >= ?")
+            params.append(filters.start.timestamp())
+        if filters.end:
+            clauses.append("created_at < ?")
+            params.append(filters.end.timestamp())
+        if filters.disability:
+            clauses.append("json_extract(state, '$.disability') COLLATE NOCASE IN (?, ?)")
+            params.extend(_disability_names(filters.disability))
+        where = " AND ".join(["node = '__end__'", "status = 'completed'", *clauses])
+        # json_extract/json_quote rather than ->>/->, which need SQLite 3.38.
+        sql = f"""
+            SELECT thread_id, created_at,
+                   json_extract(state, '$.disability'),
+                   json_extract(state, '$.grade_level'),
+                   json_extract(state, '$.difficulty'),
+                   json_extract(state, '$.consistency_report.overall_consistency_score'),
+                   json_quote(json_extract(state, '$.problem')),
+                   json_quote(json_extract(state, '$.student_attempt')),
+                   json_quote(json_extract(state, '$.consistency_report')),
+                   json_quote(json_extract(state, '$.adaptive_plan')),
+                   json_quote(json_extract(state, '$.disability_analysis'))
+            FROM workflow_checkpoints WHERE {where} ORDER BY id
+        """
+        return sql, params
+
+    if filters.start:
+        clauses.append("timestamp >= ?")
+        params.append(_sql_timestamp(filters.start))
+    if filters.end:
+        clauses.append("timestamp < ?")
+        params.append(_sql_timestamp(filters.end))
+    if dataset == "sessions":
+        if filters.disability:
+            clauses.append("json_extract(student_info, '$.disability') COLLATE NOCASE IN (?, ?)")
+            params.extend(_disability_names(filters.disability))
+        columns = (
+            "id, student_id, timestamp, session_type, json_extract(student_info, '$.disability'), "
+            "student_info, generated_questions"
+        )
+    else:
+        if filters.disability:
+            raise ExportError("responses do not record a disability; drop the disability filter")
+        columns = "id, student_id, timestamp, teacher_feedback, responses, ai_analysis"
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT {columns} FROM {dataset} {where} ORDER BY id", params
+
+
+def _decode(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS and isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _validate(dataset: str, fmt: str = "ndjson") -> None:
+    if dataset not in EXPORT_DATASETS:
+        raise ExportError(f"Unknown dataset '{dataset}'. Choose one of: {', '.join(EXPORT_DATASETS)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}")
+
+
+async def iter_chunks(
+    dataset: str,
+    filters: ExportFilters = ExportFilters(),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield lists of at most ``chunk_size`` row dicts, oldest first."""
+    _validate(dataset)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    sql, params = _build_query(dataset, filters)
+    path = checkpoint_db_path() if dataset == "workflow_runs" else database_path()
+    columns = DATASET_COLUMNS[dataset]
+    try:
+        conn = await aiosqlite.connect(f"file:{path}?mode=ro", uri=True)
+    except Exception:
+        return  # Nothing recorded yet.
+    try:
+        try:
+            cursor = await conn.execute(sql, params)
+        except aiosqlite.OperationalError as exc:
+            if "no such table" in str(exc):
+                return
+            raise
+        while True:
+            rows = await cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunk = []
+            for row in rows:
+                record = {column: _decode(column, value) for column, value in zip(columns, row)}
+                if dataset == "workflow_runs":
+                    record["created_at"] = datetime.fromtimestamp(record["created_at"], timezone.utc).isoformat()
+                chunk.append(record)
+            yield chunk
+        await cursor.close()
+    finally:
+        await conn.close()
+
+
+async def stream_ndjson(
+    dataset: str,
+    filters: ExportFilters = ExportFilters(),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    async for chunk in iter_chunks(dataset, filters, chunk_size=chunk_size):
+        yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in chunk).encode("utf-8")
+
+
+def _require_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa  # type: ignore[import-untyped]
+        import pyarrow.parquet as pq  # type: ignore[import-untyped]
+    except ImportError as exc:
+        raise ExportError("Parquet export requires pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+async def stream_parquet(
+    dataset: str,
+    filters: ExportFilters = ExportFilters(),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Parquet bytes, one row group per chunk; nested values are JSON strings."""
+    _validate(dataset, "parquet")
+    pa, pq = _require_pyarrow()
+    columns = DATASET_COLUMNS[dataset]
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    try:
+        async for chunk in iter_chunks(dataset, filters, chunk_size=chunk_size):
+            arrays = [
+                pa.array(
+                    [
+                        None if row[column] is None
+                        else json.dumps(row[column], ensure_ascii=False) if column in JSON_COLUMNS
+                        else str(row[column])
+                        for row in chunk
+                    ],
+                    type=pa.string(),
+                )
+                for column in columns
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = drain()
+    if data:
+        yield data
+
+
+def export_stream(
+    dataset: str,
+    fmt: str,
+    filters: ExportFilters = ExportFilters(),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Validate eagerly (so HTTP callers can return 400) and return the byte stream."""
+    _validate(dataset, fmt)
+    _build_query(dataset, filters)
+    if fmt == "parquet":
+        _require_pyarrow()
+        return stream_parquet(dataset, filters, chunk_size=chunk_size)
+    return stream_ndjson(dataset, filters, chunk_size=chunk_size)
+
+
+async def export_to_file(
+    dataset: str,
+    fmt: str,
+    write: Callable[[bytes], Any],
+    filters: ExportFilters = ExportFilters(),
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Write an export through ``write``; returns bytes written."""
+    total = 0
+    async for data in export_stream(dataset, fmt, filters, chunk_size=chunk_size):
+        write(data)
+        total += len(data)
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export research data as NDJSON or Parquet.")
+    parser.add_argument("dataset", choices=EXPORT_DATASETS)
+    parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--start", help="Inclusive lower bound (ISO date/datetime, UTC if naive)")
+    parser.add_argument("--end", help="Exclusive upper bound (ISO date/datetime, UTC if naive)")
+    parser.add_argument("--disability")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        filters = ExportFilters(parse_timestamp(args.start), parse_timestamp(args.end), args.disability)
+        if args.out:
+            with open(args.out, "wb") as handle:
+                asyncio.run(export_to_file(args.dataset, args.fmt, handle.write, filters, chunk_size=args.chunk_size))
+        else:
+            out = sys.stdout.buffer
+            asyncio.run(export_to_file(args.dataset, args.fmt, out.write, filters, chunk_size=args.chunk_size))
+            out.flush()
+    except ExportError as exc:
+        parser.error(str(exc))
+    return 0
+
+
+__all__ = [
+    "EXPORT_DATASETS",
+    "EXPORT_FORMATS",
+    "ExportError",
+    "ExportFilters",
+    "export_stream",
+    "export_to_file",
+    "iter_chunks",
+    "parse_timestamp",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,7 +15,14 @@ from .cache_store import get_cache_store
 from .disability_registry import normalize_disability
 from .grade_registry import DEFAULT_DIFFICULTY, DEFAULT_GRADE_LEVEL, normalize_difficulty, normalize_grade_level
 from .langgraph_state import LearningSessionState
+from .llm_dispatcher import Priority, get_llm_dispatcher, llm_priority
+from .llm_hedging import get_hedge_policy
+from .model_router import get_model_router
+from .nvidia_chat_client import get_nvidia_chat_client
 from .orchestrator import LangGraphOrchestrator
+from .output_schemas import get_schema_stats
+from .prompt_budget import get_prompt_token_stats
+from .speculative import get_speculation_stats
 
 logger = logging.getLogger(__name__)
 
@@ -141,11 +148,18 @@ def _parse_student_history(raw_history: Any) -> List[Dict[str, Any]]:
 
 
 async def run_adaptive_difficulty(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Compute an adaptive difficulty plan from stored session history."""
+    """Compute an adaptive difficulty plan from uploaded history or the student's stored aggregate."""
     history = _parse_student_history(payload.get("student_history"))
     current_difficulty = normalize_difficulty(payload.get("difficulty", DEFAULT_DIFFICULTY))
     grade_level = normalize_grade_level(payload.get("grade_level", DEFAULT_GRADE_LEVEL))
-    plan = adaptive_manager.calculate_next_difficulty(history, current_difficulty)
+    aggregate = None if history else await orchestrator.student_aggregate(payload.get("student_id"))
+    plan = adaptive_manager.recommend(
+        history,
+        current_difficulty,
+        grade_level=grade_level,
+        student_id=payload.get("student_id"),
+        aggregate=aggregate,
+    )
     return {
         "status": "ok",
         "workflow_type": "adaptive_only",
@@ -156,11 +170,50 @@ async def run_adaptive_difficulty(payload: Dict[str, Any]) -> Dict[str, Any]:
         "metadata": {
             "grade_level": grade_level,
             "difficulty": current_difficulty,
-            "session_count": len(history),
+            "session_count": aggregate.sessions if aggregate is not None else len(history),
+            "history_source": "aggregate" if aggregate is not None else "payload",
         },
     }
 
 
+async def run_roster_scoring(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Recommend the next difficulty for every student on a roster in one policy call."""
+    students = list(payload.get("students") or [])
+    if not students:
+        raise HTTPException(status_code=400, detail="students must be a non-empty list")
+    for student in students:
+        student["student_history"] = _parse_student_history(student.get("student_history"))
+    plans = adaptive_manager.recommend_roster(students)
+    return {
+        "status": "ok",
+        "workflow_type": "adaptive_roster",
+        "current_step": "completed",
+        "results": {
+            "plans": [
+                {"student_id": student.get("student_id"), "adaptive_plan": plan}
+                for student, plan in zip(students, plans)
+            ],
+        },
+        "metadata": {"policy": adaptive_manager.policy.name, "student_count": len(students)},
+    }
+
+
+async def run_adaptive_narrative(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """LLM narrative recommendations, fetched separately from the deterministic plan."""
+    history = _parse_student_history(payload.get("student_history"))
+    if not history:
+        raise HTTPException(status_code=400, detail="student_history is required for a narrative")
+    current_difficulty = normalize_difficulty(payload.get("difficulty", DEFAULT_DIFFICULTY))
+    narrative = await orchestrator.adaptive_narrative(history, current_difficulty)
+    return {
+        "status": "ok",
+        "workflow_type": "adaptive_narrative",
+        "current_step": "completed",
+        "results": {"adaptive_narrative": narrative},
+        "metadata": {"difficulty": current_difficulty, "session_count": len(history)},
+    }
+
+
 async def run_workflow(payload: Dict[str, Any]) -> Dict[str, Any]:
     workflow_type = str(payload.get("workflow_type", "full")).lower()
     if workflow_type == "problem_only":
@@ -221,7 +274,8 @@ async def prewarm_workflow(payload: Dict[str, Any]) -> None:
 def schedule_prewarm(payload: Dict[str, Any]) -> str:
     session_key = str((payload.get("metadata") or {}).get("session_id") or _hash_payload(payload)[:16])
     _prewarm_status[session_key] = "pending"
-    asyncio.create_task(prewarm_workflow(payload))
+    with llm_priority(Priority.BACKGROUND):
+        asyncio.create_task(prewarm_workflow(payload))
     return session_key
 
 
@@ -261,7 +315,8 @@ async def run_batch_simulate(payload: Dict[str, Any]) -> Dict[str, Any]:
         await _cache.set(batch_key, entry, WORKFLOW_TTL)
         return disability, canonical, entry
 
-    pairs = await asyncio.gather(*[_one(d) for d in disabilities], return_exceptions=True)
+    with llm_priority(Priority.BACKGROUND):
+        pairs = await asyncio.gather(*[_one(d) for d in disabilities], return_exceptions=True)
     results: Dict[str, Any] = {}
     errors: Dict[str, str] = {}
     for item in pairs:
@@ -312,7 +367,43 @@ async def run_improvement_graph(payload: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def get_cache_stats() -> Dict[str, Any]:
-    return await _cache.get_stats()
+    stats = await _cache.get_stats()
+    semantic = orchestrator.llm_client.semantic_stats()
+    if semantic is not None:
+        stats["semantic"] = semantic
+    return stats
+
+
+async def shutdown_workflows() -> None:
+    """Release long-lived connections held by the orchestrator."""
+    await orchestrator.aclose()
+
+
+async def get_workflow_progress(session_id: str) -> Dict[str, Any]:
+    """Report completed nodes for a session so clients can decide to resume."""
+    return await orchestrator.workflow_progress(session_id)
+
+
+async def get_student_aggregates(student_id: str) -> Dict[str, Any]:
+    """Running performance aggregates for a student, overall and per disability/difficulty."""
+    return await orchestrator.student_aggregate_breakdown(student_id)
+
+
+def get_checkpoint_stats() -> Dict[str, Any]:
+    return orchestrator.checkpoint_stats()
+
+
+def get_llm_stats() -> Dict[str, Any]:
+    return {
+        "dispatcher": get_llm_dispatcher().stats(),
+        "hedging": get_hedge_policy().stats(),
+        "routing": get_model_router().stats(),
+        "prompt_tokens": get_prompt_token_stats(),
+        "schemas": get_schema_stats(),
+        "speculation": get_speculation_stats(),
+        "problem_pool": orchestrator.problem_pool.get_stats(),
+        "nvidia": get_nvidia_chat_client().stats(),
+    }
 
 
 async def invalidate_workflow_cache(session_id: Optional[str] = None) -> Dict[str, Any]:
@@ -336,10 +427,17 @@ __all__ = [
     "run_problem_workflow",
     "run_analysis_workflow",
     "run_adaptive_difficulty",
+    "run_adaptive_narrative",
+    "run_roster_scoring",
+    "get_student_aggregates",
     "run_workflow",
     "schedule_prewarm",
     "get_prewarm_status",
     "run_batch_simulate",
     "get_cache_stats",
+    "get_checkpoint_stats",
+    "get_workflow_progress",
+    "shutdown_workflows",
+    "get_llm_stats",
     "invalidate_workflow_cache",
 ]
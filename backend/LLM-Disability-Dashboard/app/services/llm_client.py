@@ -5,12 +5,27 @@ import hashlib
 import json
 import logging
 import os
+import time
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 from fastapi import Response
 from openai import AsyncOpenAI
 
 from .cache_store import get_cache_store
+from .llm_dispatcher import get_llm_dispatcher, on_admission
+from .llm_hedging import get_hedge_policy
+from .model_router import Backend, get_model_router
+from .output_schemas import (
+    JSONSchema,
+    SchemaViolation,
+    StreamingSchemaCheck,
+    response_format,
+    schema_stats,
+    validate_output,
+)
+from .prompt_budget import count_message_tokens, prompt_token_stats
+from .semantic_cache import SemanticKey, get_semantic_cache
+from .traffic_recorder import record_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +35,10 @@ AsyncCallable = Callable[..., Awaitable[Any]]
 
 LLM_CACHE_PREFIX = "llm:"
 DEFAULT_LLM_TTL = int(os.getenv("CACHE_L2_TTL", "86400"))
+DEFAULT_PROMPT_TYPE = "general"
+# Routed calls are cached per prompt type, not per backend: any backend the router
+# picks is an acceptable answer, and a failover or a ranking change must not miss.
+ROUTED_CACHE_SCOPE = "routed:"
 
 
 class LLMClient:
@@ -30,8 +49,19 @@ class LLMClient:
         self._cache = get_cache_store()
         env_flag = os.getenv("LANGGRAPH_CACHE_ENABLED", "true").strip().lower()
         self._cache_enabled = env_flag not in {"0", "false", "no", "off"}
+        self._semantic_cache = get_semantic_cache() if self._cache_enabled else None
         self._last_cache_hit = False
         self._openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._dispatcher = get_llm_dispatcher()
+        self._hedging = get_hedge_policy()
+        self._router = get_model_router()
+        self._local_clients: Dict[str, AsyncOpenAI] = {}
+        # "same" re-sends to OpenAI; "nvidia" hedges to the NVIDIA chat model when a key is configured.
+        self._hedge_target = os.getenv("LLM_HEDGE_TARGET", "same").strip().lower()
+        off = {"0", "false", "no", "off"}
+        self._structured_output = os.getenv("LLM_STRUCTURED_OUTPUT", "true").strip().lower() not in off
+        self._schema_streaming = os.getenv("LLM_SCHEMA_STREAMING", "true").strip().lower() not in off
+        self._schema_retries = max(0, int(os.getenv("LLM_SCHEMA_RETRIES", "1")))
 
     async def invoke(
         self,
@@ -48,7 +78,7 @@ class LLMClient:
                 self._last_cache_hit = True
                 return cached
 
-        payload = await handler(*args, **kwargs)
+        payload = await self._dispatcher.run(lambda: handler(*args, **kwargs))
         normalized = self._normalize_payload(payload)
         self._last_cache_hit = False
 
@@ -60,24 +90,191 @@ class LLMClient:
     async def invoke_with_prompt(
         self,
         prompt: str,
-        model: str = "gpt-4o-mini",
+        model: Optional[str] = None,
         temperature: float = 0.5,
         use_cache: bool = True,
+        semantic: Optional[SemanticKey] = None,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+        system: Optional[str] = None,
+        schema: Optional[JSONSchema] = None,
     ) -> JSONLike:
         messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
         return await self.invoke_chat(
             messages=messages,
             model=model,
             temperature=temperature,
             use_cache=use_cache,
+            semantic=semantic,
+            prompt_type=prompt_type,
+            schema=schema,
         )
 
+    async def cached_prompt(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+        system: Optional[str] = None,
+    ) -> Optional[JSONLike]:
+        """What :meth:`invoke_with_prompt` would serve from the exact-match cache, without calling a provider."""
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
+        return await self.cached_chat(messages, model=model, temperature=temperature, prompt_type=prompt_type)
+
+    async def cached_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+    ) -> Optional[JSONLike]:
+        """What :meth:`invoke_chat` would serve from the exact-match cache, without calling a provider.
+
+        Lets callers that fan out several generations check the cache once first.
+        """
+        if not self._cache_enabled:
+            return None
+        model = model or ROUTED_CACHE_SCOPE + prompt_type
+        cache_key = LLM_CACHE_PREFIX + self._make_messages_cache_key(messages, model, temperature)
+        cached = await self._cache.get(cache_key)
+        if cached is not None:
+            self._last_cache_hit = True
+            record_llm_call(prompt_type, model, temperature, cached, 0.0, cached=True)
+        return cached
+
     async def invoke_chat(
         self,
         messages: List[Dict[str, str]],
-        model: str = "gpt-4o-mini",
+        model: Optional[str] = None,
         temperature: float = 0.5,
         use_cache: bool = True,
+        semantic: Optional[SemanticKey] = None,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+        schema: Optional[JSONSchema] = None,
+    ) -> JSONLike:
+        """Complete ``messages`` as JSON; without a ``model`` the router picks a backend for ``prompt_type``.
+
+        With a ``schema`` the reply is validated (while streaming, for OpenAI) and a
+        reply that breaks it is abandoned and re-requested up to ``LLM_SCHEMA_RETRIES``
+        times; the final :class:`SchemaViolation` is raised to the caller.
+        """
+        if model is None:
+            return await self._invoke_routed(messages, temperature, use_cache, semantic, prompt_type, schema)
+
+        async def complete() -> JSONLike:
+            return await self._retry_on_violation(
+                lambda: self._dispatcher.run(
+                    lambda: self._complete_with_openai(
+                        messages, temperature, model, prompt_type=prompt_type, schema=schema
+                    )
+                ),
+                prompt_type,
+                schema,
+            )
+
+        hedge = self._nvidia_hedge(messages, temperature, schema)
+
+        return await self._cached_completion(
+            "OpenAI", complete, hedge, messages, model, temperature, use_cache, semantic, prompt_type
+        )
+
+    async def _invoke_routed(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        use_cache: bool,
+        semantic: Optional[SemanticKey],
+        prompt_type: str,
+        schema: Optional[JSONSchema] = None,
+    ) -> JSONLike:
+        ranked = self._router.route(prompt_type)
+
+        async def complete() -> JSONLike:
+            # One failover to the runner-up keeps a provider incident from failing the node outright.
+            error: Optional[Exception] = None
+            for backend in ranked[:2]:
+                # The backend's latency starts when the dispatcher admits the call, not while it queues.
+                started: List[float] = []
+
+                def admit() -> None:
+                    if not started:
+                        started.append(time.perf_counter())
+
+                try:
+                    with on_admission(admit):
+                        result = await self._retry_on_violation(
+                            lambda: self._dispatcher.run(
+                                lambda: self._complete_with_backend(
+                                    backend, messages, temperature, prompt_type=prompt_type, schema=schema
+                                )
+                            ),
+                            prompt_type,
+                            schema,
+                        )
+                except SchemaViolation:
+                    # A malformed reply is the prompt's problem, not the backend's health.
+                    raise
+                except Exception as exc:
+                    elapsed = time.perf_counter() - started[0] if started else 0.0
+                    self._router.record(backend, elapsed, failed=True)
+                    logger.info("LLM backend %s failed for %s: %s", backend.name, prompt_type, exc)
+                    error = exc
+                    continue
+                self._router.record(backend, time.perf_counter() - started[0])
+                return result
+            raise error  # type: ignore[misc]
+
+        hedge = self._nvidia_hedge(messages, temperature, schema)
+
+        provider = {"openai": "OpenAI", "nvidia": "NVIDIA"}.get(ranked[0].provider, ranked[0].name)
+        return await self._cached_completion(
+            provider,
+            complete,
+            hedge,
+            messages,
+            ROUTED_CACHE_SCOPE + prompt_type,
+            temperature,
+            use_cache,
+            semantic,
+            prompt_type,
+        )
+
+    async def invoke_nvidia_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.6,
+        use_cache: bool = True,
+        semantic: Optional[SemanticKey] = None,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+    ) -> JSONLike:
+        """Like :meth:`invoke_chat`, but completed by the NVIDIA chat model (with its retries and fallback)."""
+        from .nvidia_chat_client import get_nvidia_chat_client
+
+        model = model or get_nvidia_chat_client().primary_model
+
+        async def complete() -> JSONLike:
+            return await self._dispatcher.run(lambda: self._complete_with_nvidia(messages, temperature, model))
+
+        return await self._cached_completion(
+            "NVIDIA", complete, None, messages, model, temperature, use_cache, semantic, prompt_type
+        )
+
+    async def _cached_completion(
+        self,
+        provider: str,
+        complete: Callable[[], Awaitable[JSONLike]],
+        hedge: Optional[Callable[[], Awaitable[JSONLike]]],
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        use_cache: bool,
+        semantic: Optional[SemanticKey],
+        prompt_type: str,
     ) -> JSONLike:
         cache_key: Optional[str] = None
         if self._cache_enabled and use_cache:
@@ -86,31 +283,206 @@ class LLMClient:
             if cached is not None:
                 self._last_cache_hit = True
                 logger.debug("LLM cache hit: %s", cache_key[:16])
+                record_llm_call(prompt_type, model, temperature, cached, 0.0, cached=True)
                 return cached
 
+        semantic_scope = f"{model}:{temperature}"
+        if use_cache and semantic is not None and self._semantic_cache is not None:
+            similar_key = self._semantic_cache.lookup(semantic, scope=semantic_scope)
+            if similar_key is not None:
+                cached = await self._cache.get(similar_key)
+                if cached is not None:
+                    self._last_cache_hit = True
+                    logger.debug("LLM semantic cache hit: %s", similar_key[:16])
+                    record_llm_call(prompt_type, model, temperature, cached, 0.0, cached=True)
+                    return cached
+
+        prompt_token_stats.record_estimate(prompt_type, count_message_tokens(messages))
         try:
-            response = await self._openai_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                response_format={"type": "json_object"},
-            )
-
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("Empty response from OpenAI")
-
-            json_data = json.loads(content)
-            normalized = self._normalize_payload(json_data)
+            started = time.perf_counter()
+            normalized = await self._provider_call(prompt_type, complete, hedge)
+            record_llm_call(prompt_type, model, temperature, normalized, time.perf_counter() - started, cached=False)
             self._last_cache_hit = False
 
-            if cache_key is not None and self._cache_enabled and use_cache:
+            # cache_key is only set when use_cache is on; opted-out calls neither read nor write.
+            if cache_key is not None:
                 await self._cache.set(cache_key, normalized, DEFAULT_LLM_TTL)
+                if semantic is not None and self._semantic_cache is not None:
+                    self._semantic_cache.register(semantic, cache_key, scope=semantic_scope)
 
             return normalized
 
+        except SchemaViolation:
+            raise
         except Exception as e:
-            raise ValueError(f"Error calling OpenAI: {str(e)}") from e
+            raise ValueError(f"Error calling {provider}: {str(e)}") from e
+
+    async def _provider_call(
+        self,
+        prompt_type: str,
+        complete: Callable[[], Awaitable[JSONLike]],
+        hedge: Optional[Callable[[], Awaitable[JSONLike]]],
+    ) -> JSONLike:
+        """The provider round trip behind the caches; the traffic replay benchmark stubs this."""
+        return await self._hedging.run(
+            prompt_type,
+            complete,
+            hedge,
+            can_hedge=lambda: self._dispatcher.in_flight < self._dispatcher.limit,
+            from_admission=True,
+        )
+
+    def _nvidia_hedge(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        schema: Optional[JSONSchema],
+    ) -> Optional[Callable[[], Awaitable[JSONLike]]]:
+        if self._hedge_target != "nvidia" or not os.getenv("NVIDIA_API_KEY", "").strip():
+            return None
+        return lambda: self._dispatcher.run(lambda: self._complete_with_nvidia(messages, temperature, schema=schema))
+
+    async def _retry_on_violation(
+        self,
+        attempt: Callable[[], Awaitable[JSONLike]],
+        prompt_type: str,
+        schema: Optional[JSONSchema],
+    ) -> JSONLike:
+        if schema is None:
+            return await attempt()
+        for retry in range(self._schema_retries + 1):
+            try:
+                result = await attempt()
+            except SchemaViolation as exc:
+                retrying = retry < self._schema_retries
+                schema_stats.record_violation(prompt_type, exc, retried=retrying)
+                if not retrying:
+                    raise
+                logger.info(
+                    "%s reply broke its schema after %d chars (%s); retrying", prompt_type, exc.received_chars, exc
+                )
+                continue
+            schema_stats.record_valid(prompt_type)
+            return result
+        raise AssertionError("unreachable")
+
+    async def _complete_with_openai(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        model: str,
+        client: Optional[AsyncOpenAI] = None,
+        *,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+        schema: Optional[JSONSchema] = None,
+    ) -> JSONLike:
+        client = client or self._openai_client
+        if schema is not None and self._structured_output:
+            requested_format = response_format(prompt_type, schema)
+        else:
+            requested_format = {"type": "json_object"}
+        if schema is not None and self._schema_streaming:
+            return await self._stream_validated(
+                client, model, messages, temperature, requested_format, schema, prompt_type
+            )
+
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=requested_format,
+        )
+        prompt_token_stats.record_usage(prompt_type, getattr(response, "usage", None))
+        content = response.choices[0].message.content
+        if not content:
+            raise ValueError("Empty response from OpenAI")
+        return validate_output(self._normalize_payload(json.loads(content)), schema)
+
+    async def _stream_validated(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        requested_format: Dict[str, Any],
+        schema: JSONSchema,
+        prompt_type: str,
+    ) -> JSONLike:
+        """Stream the reply through a schema check; a violation closes the stream mid-generation."""
+        check = StreamingSchemaCheck(schema)
+        extra: Dict[str, Any] = {}
+        if client is self._openai_client:
+            extra["stream_options"] = {"include_usage": True}
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=requested_format,
+            stream=True,
+            **extra,
+        )
+        parts: List[str] = []
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    prompt_token_stats.record_usage(prompt_type, chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    check.feed(delta)
+        finally:
+            await stream.close()
+        if not parts:
+            raise ValueError("Empty response from OpenAI")
+        return self._normalize_payload(check.finish("".join(parts)))
+
+    async def _complete_with_backend(
+        self,
+        backend: Backend,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        *,
+        prompt_type: str = DEFAULT_PROMPT_TYPE,
+        schema: Optional[JSONSchema] = None,
+    ) -> JSONLike:
+        if backend.provider == "nvidia":
+            return await self._complete_with_nvidia(messages, temperature, backend.model, schema=schema)
+        if backend.provider == "local":
+            client = self._local_clients.get(backend.base_url or "")
+            if client is None:
+                client = self._local_clients[backend.base_url or ""] = AsyncOpenAI(
+                    api_key=os.getenv("LOCAL_LLM_API_KEY", "local"),
+                    base_url=backend.base_url,
+                )
+            return await self._complete_with_openai(
+                messages, temperature, backend.model, client, prompt_type=prompt_type, schema=schema
+            )
+        return await self._complete_with_openai(
+            messages, temperature, backend.model, prompt_type=prompt_type, schema=schema
+        )
+
+    async def _complete_with_nvidia(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        model: Optional[str] = None,
+        *,
+        schema: Optional[JSONSchema] = None,
+    ) -> JSONLike:
+        from .nvidia_chat_client import chat_completion
+        from .openai_service import clean_json_response
+
+        response = await chat_completion(messages, model=model, temperature=temperature)
+        payload = self._normalize_payload(clean_json_response(response.choices[0].message.content or ""))
+        return validate_output(payload, schema)
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        return self._hedging.stats()
+
+    def routing_stats(self) -> Dict[str, Any]:
+        return self._router.stats()
 
     def ensure_dict(self, data: Union[str, Dict[str, Any], None]) -> Dict[str, Any]:
         if data is None:
@@ -214,5 +586,10 @@ class LLMClient:
     def last_cache_hit(self) -> bool:
         return self._last_cache_hit
 
+    def semantic_stats(self) -> Optional[Dict[str, Any]]:
+        if self._semantic_cache is None:
+            return None
+        return self._semantic_cache.stats()
+
 
 __all__ = ["LLMClient"]
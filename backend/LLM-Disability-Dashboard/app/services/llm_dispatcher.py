@@ -0,0 +1,276 @@
+"""Process-wide admission control for outbound LLM calls.
+
+Every provider call goes through :class:`LLMDispatcher.run`. The number of
+calls in flight is capped by an AIMD limit: each call that completes under
+``latency_ceiling`` adds ``1/limit`` (about +1 per round of calls), a 429 /
+rate-limit error halves the limit and a slow call shrinks it by 10%. Only
+calls admitted while the limit was the constraint (every slot but at most one
+taken) grow it, so a quiet period cannot drift it up to the maximum. Waiting
+calls are admitted strictly by priority class (interactive, then workflow,
+then background), and background calls may only use ``background_share`` of
+the limit, so batch jobs and prewarms can never take the slots students are
+waiting on.
+
+The class is taken from a context variable, so a request handler or a task
+sets it once and every call beneath it inherits it::
+
+    with llm_priority(Priority.INTERACTIVE):
+        reply = await chat_with_ai(...)
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_INITIAL_LIMIT = 8
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 64
+DEFAULT_LATENCY_CEILING = 20.0
+DEFAULT_BACKGROUND_SHARE = 0.5
+RATE_LIMIT_BACKOFF = 0.5
+SLOW_CALL_BACKOFF = 0.9
+DECREASE_COOLDOWN = 2.0
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    WORKFLOW = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.WORKFLOW)
+_admission_listener: ContextVar[Optional[Callable[[], None]]] = ContextVar("llm_admission_listener", default=None)
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed calls (and tasks created inside) at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def on_admission(callback: Callable[[], None]) -> Iterator[None]:
+    """Call ``callback`` when a dispatcher call in this context leaves the queue and starts.
+
+    Listeners nest: an inner ``callback`` runs after the ones already installed.
+    """
+    outer = _admission_listener.get()
+
+    def chained() -> None:
+        if outer is not None:
+            outer()
+        callback()
+
+    token = _admission_listener.set(chained if outer is not None else callback)
+    try:
+        yield
+    finally:
+        _admission_listener.reset(token)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or type(exc).__name__ == "RateLimitError"
+
+
+@dataclass
+class ClassStats:
+    admitted: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    in_flight: int = 0
+    wait_seconds: float = 0.0
+    failures: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "failures": self.failures,
+        }
+
+
+class LLMDispatcher:
+    """AIMD concurrency limit with strict-priority admission."""
+
+    def __init__(
+        self,
+        *,
+        initial_limit: float = DEFAULT_INITIAL_LIMIT,
+        min_limit: float = DEFAULT_MIN_LIMIT,
+        max_limit: float = DEFAULT_MAX_LIMIT,
+        latency_ceiling: float = DEFAULT_LATENCY_CEILING,
+        background_share: float = DEFAULT_BACKGROUND_SHARE,
+    ) -> None:
+        self.min_limit = max(1.0, float(min_limit))
+        self.max_limit = max(self.min_limit, float(max_limit))
+        self.limit = min(max(float(initial_limit), self.min_limit), self.max_limit)
+        self.latency_ceiling = latency_ceiling
+        self.background_share = min(max(background_share, 0.0), 1.0)
+        self.in_flight = 0
+        self.rate_limited = 0
+        self.slow_calls = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._classes = {priority: ClassStats() for priority in Priority}
+        # One decrease per window: a burst of 429s from calls already in flight is a single signal.
+        self._last_decrease = 0.0
+
+    def _capacity(self, priority: Priority) -> int:
+        limit = int(self.limit)
+        if priority is Priority.BACKGROUND:
+            return max(1, int(limit * self.background_share))
+        return limit
+
+    def _can_start(self, priority: Priority) -> bool:
+        if priority is Priority.BACKGROUND and self._classes[Priority.BACKGROUND].in_flight >= self._capacity(priority):
+            return False
+        return self.in_flight < self._capacity(priority)
+
+    def _wake(self) -> None:
+        # Strict priority: stop at the first waiter that cannot start (everything behind it ranks lower).
+        while self._waiters:
+            priority_value, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            priority = Priority(priority_value)
+            if not self._can_start(priority):
+                return
+            heapq.heappop(self._waiters)
+            future.set_result(self._start(priority))
+
+    def _start(self, priority: Priority) -> bool:
+        """Take a slot; True when the limit was the constraint at admission."""
+        saturated = self.in_flight >= int(self.limit) - 1
+        self.in_flight += 1
+        stats = self._classes[priority]
+        stats.in_flight += 1
+        stats.admitted += 1
+        return saturated
+
+    async def _acquire(self, priority: Priority) -> bool:
+        if (not self._waiters or self._waiters[0][0] > priority) and self._can_start(priority):
+            return self._start(priority)
+        stats = self._classes[priority]
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        started = time.perf_counter()
+        self._wake()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(priority)
+            raise
+        finally:
+            stats.queued -= 1
+            stats.wait_seconds += time.perf_counter() - started
+
+    def _release(self, priority: Priority) -> None:
+        self.in_flight -= 1
+        self._classes[priority].in_flight -= 1
+        self._wake()
+
+    def _on_success(self, latency: float, saturated: bool) -> None:
+        if latency > self.latency_ceiling:
+            self.slow_calls += 1
+            self._decrease(SLOW_CALL_BACKOFF)
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    async def run(self, call: Callable[[], Awaitable[T]], *, priority: Optional[Priority] = None) -> T:
+        """Await ``call()`` once a slot for ``priority`` (default: the context's) is free."""
+        priority = current_priority() if priority is None else priority
+        saturated = await self._acquire(priority)
+        listener = _admission_listener.get()
+        if listener is not None:
+            listener()
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as exc:
+            self._classes[priority].failures += 1
+            if is_rate_limit_error(exc):
+                self.rate_limited += 1
+                self._decrease(RATE_LIMIT_BACKOFF)
+                logger.info("LLM rate limited; concurrency limit now %.1f", self.limit)
+            raise
+        else:
+            self._on_success(time.perf_counter() - started, saturated)
+            return result
+        finally:
+            self._release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "rate_limited": self.rate_limited,
+            "slow_calls": self.slow_calls,
+            "classes": {priority.name.lower(): self._classes[priority].to_dict() for priority in Priority},
+        }
+
+
+_dispatcher: Optional[LLMDispatcher] = None
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """Shared dispatcher configured from LLM_CONCURRENCY_* settings."""
+    global _dispatcher
+    if _dispatcher is None:
+        try:
+            _dispatcher = LLMDispatcher(
+                initial_limit=float(os.getenv("LLM_CONCURRENCY_INITIAL", str(DEFAULT_INITIAL_LIMIT))),
+                min_limit=float(os.getenv("LLM_CONCURRENCY_MIN", str(DEFAULT_MIN_LIMIT))),
+                max_limit=float(os.getenv("LLM_CONCURRENCY_MAX", str(DEFAULT_MAX_LIMIT))),
+                latency_ceiling=float(os.getenv("LLM_LATENCY_CEILING", str(DEFAULT_LATENCY_CEILING))),
+                background_share=float(os.getenv("LLM_BACKGROUND_SHARE", str(DEFAULT_BACKGROUND_SHARE))),
+            )
+        except ValueError:
+            _dispatcher = LLMDispatcher()
+    return _dispatcher
+
+
+__all__ = [
+    "LLMDispatcher",
+    "Priority",
+    "current_priority",
+    "get_llm_dispatcher",
+    "is_rate_limit_error",
+    "llm_priority",
+    "on_admission",
+]
@@ -0,0 +1,247 @@
+"""Per-call deadlines and hedged duplicates for LLM completions.
+
+Each ``prompt_type`` (``thought``, ``assessment``, ...) keeps a window of
+recent primary-call latencies. Once a call has run longer than that type's
+p95, one duplicate ("hedge") is started and whichever finishes first wins;
+the other is cancelled. Hedges are skipped while fewer than ``min_samples``
+latencies are known, when more than ``budget`` of recent calls were hedged,
+or when the caller says there is no spare capacity, so spend stays within a
+few percent of unhedged traffic. Every call also gets a deadline
+(``LLM_DEADLINES`` per type, else ``LLM_DEADLINE_DEFAULT``) after which it
+fails with ``asyncio.TimeoutError`` instead of hanging.
+
+With ``from_admission`` the deadline, hedge delay and recorded latency all
+start when the primary call leaves the :mod:`llm_dispatcher` queue, so time
+spent waiting for a slot under load is neither timed out nor mistaken for
+provider latency.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from .llm_dispatcher import on_admission
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+CallFactory = Callable[[], Awaitable[T]]
+
+DEFAULT_DEADLINE = 60.0
+DEFAULT_DEADLINES: Dict[str, float] = {
+    "assessment": 30.0,
+    "screening": 30.0,
+    "identify": 30.0,
+}
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_HEDGE_BUDGET = 0.1
+DEFAULT_MIN_HEDGE_DELAY = 0.5
+LATENCY_WINDOW = 200
+
+
+def _parse_deadlines(raw: str) -> Dict[str, float]:
+    deadlines = dict(DEFAULT_DEADLINES)
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        try:
+            if name.strip() and value.strip():
+                deadlines[name.strip()] = float(value)
+        except ValueError:
+            logger.warning("Ignoring invalid LLM deadline entry: %s", item)
+    return deadlines
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    primary_wins: int = 0
+    timeouts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "timeouts": self.timeouts,
+        }
+
+
+class HedgePolicy:
+    """Deadlines and p95-delayed hedging, tracked per prompt type."""
+
+    def __init__(
+        self,
+        *,
+        deadlines: Optional[Dict[str, float]] = None,
+        default_deadline: Optional[float] = DEFAULT_DEADLINE,
+        hedge_enabled: bool = True,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        budget: float = DEFAULT_HEDGE_BUDGET,
+        min_delay: float = DEFAULT_MIN_HEDGE_DELAY,
+    ) -> None:
+        self.deadlines = dict(DEFAULT_DEADLINES if deadlines is None else deadlines)
+        self.default_deadline = default_deadline
+        self.hedge_enabled = hedge_enabled
+        self.percentile = percentile
+        self.min_samples = max(1, min_samples)
+        self.budget = budget
+        self.min_delay = min_delay
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._recent_hedges: Deque[bool] = deque(maxlen=LATENCY_WINDOW)
+        self._stats: Dict[str, HedgeStats] = {}
+
+    def deadline(self, prompt_type: str) -> Optional[float]:
+        value = self.deadlines.get(prompt_type, self.default_deadline)
+        return value if value and value > 0 else None
+
+    def record(self, prompt_type: str, seconds: float) -> None:
+        self._latencies.setdefault(prompt_type, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, prompt_type: str) -> Optional[float]:
+        """The type's latency percentile, or None until enough samples exist."""
+        samples = self._latencies.get(prompt_type)
+        if not self.hedge_enabled or not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    def _within_budget(self) -> bool:
+        if not self._recent_hedges:
+            return self.budget > 0
+        return sum(self._recent_hedges) / len(self._recent_hedges) < self.budget
+
+    async def run(
+        self,
+        prompt_type: str,
+        primary: CallFactory,
+        hedge: Optional[CallFactory] = None,
+        *,
+        can_hedge: Optional[Callable[[], bool]] = None,
+        from_admission: bool = False,
+    ) -> T:
+        """Run ``primary``; after the hedge delay also run ``hedge`` (default: ``primary`` again).
+
+        ``from_admission`` means ``primary`` goes through the LLM dispatcher; the
+        clocks then start when it is admitted rather than when it is queued.
+        """
+        stats = self._stats.setdefault(prompt_type, HedgeStats())
+        stats.requests += 1
+        deadline = self.deadline(prompt_type)
+        loop = asyncio.get_running_loop()
+        admitted = asyncio.Event()
+        started = time.perf_counter()
+
+        def admit() -> None:
+            nonlocal started
+            if not admitted.is_set():
+                started = time.perf_counter()
+                admitted.set()
+
+        if not from_admission:
+            admit()
+
+        async def timed_primary() -> T:
+            with on_admission(admit):
+                result = await primary()
+            self.record(prompt_type, time.perf_counter() - started)
+            return result
+
+        primary_task = asyncio.ensure_future(timed_primary())
+        labels = {primary_task: "primary"}
+        hedged = False
+        try:
+            if not admitted.is_set():
+                admission = asyncio.ensure_future(admitted.wait())
+                await asyncio.wait({primary_task, admission}, return_when=asyncio.FIRST_COMPLETED)
+                admission.cancel()
+            expires = loop.time() + deadline if deadline else None
+            delay = self.hedge_delay(prompt_type)
+            if delay is not None and (expires is None or loop.time() + delay < expires):
+                done, _ = await asyncio.wait({primary_task}, timeout=delay)
+                if not done and self._within_budget() and (can_hedge is None or can_hedge()):
+                    hedged = True
+                    stats.hedged += 1
+                    labels[asyncio.ensure_future((hedge or primary)())] = "hedge"
+            self._recent_hedges.append(hedged)
+
+            error: Optional[BaseException] = None
+            pending = set(labels)
+            while pending:
+                timeout = None if expires is None else max(0.0, expires - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    stats.timeouts += 1
+                    raise asyncio.TimeoutError(f"LLM call '{prompt_type}' exceeded its {deadline:.1f}s deadline")
+                for task in done:
+                    if task.exception() is None:
+                        if hedged:
+                            if labels[task] == "hedge":
+                                stats.hedge_wins += 1
+                            else:
+                                stats.primary_wins += 1
+                        return task.result()
+                    error = task.exception()
+                    if labels[task] == "hedge":
+                        logger.info("Hedged %s call failed: %s", prompt_type, error)
+            raise error  # type: ignore[misc]
+        finally:
+            if not primary_task.done() and admitted.is_set():
+                # A primary that lost or timed out took at least this long; keep it in the window.
+                self.record(prompt_type, time.perf_counter() - started)
+            for task in labels:
+                if not task.done():
+                    task.cancel()
+                    # Retrieve the loser's outcome so it is never reported as unhandled.
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedge_enabled": self.hedge_enabled,
+            "budget": self.budget,
+            "types": {
+                name: {
+                    **stats.to_dict(),
+                    "deadline_s": self.deadline(name),
+                    "hedge_delay_s": self.hedge_delay(name),
+                }
+                for name, stats in sorted(self._stats.items())
+            },
+        }
+
+
+_policy: Optional[HedgePolicy] = None
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """Shared policy configured from LLM_DEADLINE* and LLM_HEDGE_* settings."""
+    global _policy
+    if _policy is None:
+        hedge_flag = os.getenv("LLM_HEDGE_ENABLED", "true").strip().lower()
+        try:
+            _policy = HedgePolicy(
+                deadlines=_parse_deadlines(os.getenv("LLM_DEADLINES", "")),
+                default_deadline=float(os.getenv("LLM_DEADLINE_DEFAULT", str(DEFAULT_DEADLINE))),
+                hedge_enabled=hedge_flag not in {"0", "false", "no", "off"},
+                percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", str(DEFAULT_HEDGE_PERCENTILE))),
+                min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", str(DEFAULT_MIN_SAMPLES))),
+                budget=float(os.getenv("LLM_HEDGE_BUDGET", str(DEFAULT_HEDGE_BUDGET))),
+            )
+        except ValueError:
+            _policy = HedgePolicy()
+    return _policy
+
+
+__all__ = ["HedgePolicy", "HedgeStats", "get_hedge_policy"]
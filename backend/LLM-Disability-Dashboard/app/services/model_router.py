@@ -0,0 +1,245 @@
+"""Per-node model selection across the configured LLM backends.
+
+Each prompt type (orchestrator node) declares the minimum quality tier it
+needs and the latency it should finish in. :class:`ModelRouter` keeps an EWMA
+of latency and error rate for every backend and ranks the eligible ones for
+each call:
+
+1. an ``LLM_ROUTES`` override for the node (``thought=openai-fast,...``),
+   unless that backend is currently unhealthy;
+2. backends expected to meet the node's latency target, cheapest sufficient
+   quality tier first, then by expected time to a successful answer;
+3. everything else by expected time, unhealthy backends last.
+
+Error EWMAs decay while a backend is idle, so a provider that had an incident
+is tried again a minute or two later instead of being shunned forever.
+
+Backends (``LLM_ROUTER_BACKENDS``, default ``openai``):
+
+* ``openai`` - ``LLM_OPENAI_MODEL`` (default ``gpt-4o-mini``), standard tier.
+* ``openai-fast`` - ``LLM_OPENAI_FAST_MODEL``, fast tier.
+* ``nvidia`` - ``NVIDIA_CHAT_MODEL`` through :mod:`nvidia_chat_client`, standard tier.
+* ``local`` - an OpenAI-compatible server at ``LOCAL_LLM_BASE_URL`` running
+  ``LOCAL_LLM_MODEL`` (vLLM, Ollama, ...), fast tier.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FAST = 1
+STANDARD = 2
+STRONG = 3
+
+EWMA_ALPHA = 0.2
+ERROR_HALF_LIFE = 60.0
+UNHEALTHY_ERROR_RATE = 0.5
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+
+
+@dataclass(frozen=True)
+class NodeRequirements:
+    min_quality: int = STANDARD
+    latency_target: float = 15.0
+
+
+DEFAULT_REQUIREMENTS: Dict[str, NodeRequirements] = {
+    "problem": NodeRequirements(STANDARD, 15.0),
+    "attempt": NodeRequirements(STANDARD, 12.0),
+    "thought": NodeRequirements(FAST, 8.0),
+    "strategies": NodeRequirements(FAST, 10.0),
+    "tutor": NodeRequirements(FAST, 8.0),
+    "identify": NodeRequirements(STANDARD, 20.0),
+    "adaptive": NodeRequirements(FAST, 8.0),
+}
+
+
+@dataclass
+class Backend:
+    name: str
+    provider: str
+    model: str
+    quality: int = STANDARD
+    base_url: Optional[str] = None
+    latency_ewma: Optional[float] = None
+    error_ewma: float = 0.0
+    calls: int = 0
+    failures: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def error_rate(self, now: Optional[float] = None) -> float:
+        idle = (time.monotonic() if now is None else now) - self.updated_at
+        return self.error_ewma * 0.5 ** (max(0.0, idle) / ERROR_HALF_LIFE)
+
+    def expected_seconds(self, prior: float, now: Optional[float] = None) -> float:
+        """Expected time to a successful answer, counting failed tries."""
+        latency = prior if self.latency_ewma is None else self.latency_ewma
+        return latency / max(0.05, 1.0 - self.error_rate(now))
+
+
+def _parse_routes(raw: str) -> Dict[str, str]:
+    routes: Dict[str, str] = {}
+    for item in raw.split(","):
+        name, _, backend = item.partition("=")
+        if name.strip() and backend.strip():
+            routes[name.strip()] = backend.strip()
+    return routes
+
+
+def configured_backends() -> List[Backend]:
+    """Backends named in LLM_ROUTER_BACKENDS whose credentials/models are configured."""
+    available = {
+        "openai": (
+            os.getenv("OPENAI_API_KEY", "").strip(),
+            Backend("openai", "openai", os.getenv("LLM_OPENAI_MODEL", DEFAULT_OPENAI_MODEL), STANDARD),
+        ),
+        "openai-fast": (
+            os.getenv("OPENAI_API_KEY", "").strip() and os.getenv("LLM_OPENAI_FAST_MODEL", "").strip(),
+            Backend("openai-fast", "openai", os.getenv("LLM_OPENAI_FAST_MODEL", "").strip(), FAST),
+        ),
+        "nvidia": (
+            os.getenv("NVIDIA_API_KEY", "").strip(),
+            Backend("nvidia", "nvidia", os.getenv("NVIDIA_CHAT_MODEL", "qwen/qwen3.5-122b-a10b"), STANDARD),
+        ),
+        "local": (
+            os.getenv("LOCAL_LLM_BASE_URL", "").strip() and os.getenv("LOCAL_LLM_MODEL", "").strip(),
+            Backend(
+                "local",
+                "local",
+                os.getenv("LOCAL_LLM_MODEL", "").strip(),
+                FAST,
+                base_url=os.getenv("LOCAL_LLM_BASE_URL", "").strip(),
+            ),
+        ),
+    }
+    backends = []
+    for name in os.getenv("LLM_ROUTER_BACKENDS", "openai").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in available:
+            logger.warning("Unknown LLM backend %r in LLM_ROUTER_BACKENDS", name)
+        elif not available[name][0]:
+            logger.warning("LLM backend %r is not configured; skipping", name)
+        else:
+            backends.append(available[name][1])
+    return backends
+
+
+class ModelRouter:
+    """Ranks backends per prompt type from declared requirements and live health."""
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        *,
+        requirements: Optional[Dict[str, NodeRequirements]] = None,
+        routes: Optional[Dict[str, str]] = None,
+        default_requirements: NodeRequirements = NodeRequirements(),
+    ) -> None:
+        if not backends:
+            backends = [Backend("openai", "openai", DEFAULT_OPENAI_MODEL, STANDARD)]
+        self.backends: Dict[str, Backend] = {backend.name: backend for backend in backends}
+        self.requirements = dict(DEFAULT_REQUIREMENTS if requirements is None else requirements)
+        self.routes = dict(routes or {})
+        self.default_requirements = default_requirements
+        self._order = {name: index for index, name in enumerate(self.backends)}
+        self._chosen: Dict[str, Dict[str, int]] = {}
+
+    def requirements_for(self, prompt_type: str) -> NodeRequirements:
+        return self.requirements.get(prompt_type, self.default_requirements)
+
+    def rank(self, prompt_type: str) -> List[Backend]:
+        """Backends to try for ``prompt_type``, best first."""
+        needs = self.requirements_for(prompt_type)
+        now = time.monotonic()
+        candidates = [b for b in self.backends.values() if b.quality >= needs.min_quality]
+        if not candidates:
+            # Nothing is good enough: use the strongest tier available.
+            best = max(b.quality for b in self.backends.values())
+            candidates = [b for b in self.backends.values() if b.quality == best]
+
+        def key(backend: Backend):
+            expected = backend.expected_seconds(needs.latency_target, now)
+            unhealthy = backend.error_rate(now) >= UNHEALTHY_ERROR_RATE
+            on_target = expected <= needs.latency_target
+            return (
+                unhealthy,
+                not on_target,
+                backend.quality if on_target else 0,
+                expected,
+                self._order[backend.name],
+            )
+
+        ranked = sorted(candidates, key=key)
+        override = self.backends.get(self.routes.get(prompt_type, ""))
+        if override is not None and override.error_rate(now) < UNHEALTHY_ERROR_RATE:
+            ranked = [override] + [b for b in ranked if b is not override]
+        return ranked
+
+    def route(self, prompt_type: str) -> List[Backend]:
+        """Rank backends for a call and count the first choice in the stats."""
+        ranked = self.rank(prompt_type)
+        counts = self._chosen.setdefault(prompt_type, {})
+        counts[ranked[0].name] = counts.get(ranked[0].name, 0) + 1
+        return ranked
+
+    def record(self, backend: Backend, seconds: float, *, failed: bool = False) -> None:
+        now = time.monotonic()
+        backend.error_ewma = (1 - EWMA_ALPHA) * backend.error_rate(now) + EWMA_ALPHA * (1.0 if failed else 0.0)
+        backend.updated_at = now
+        backend.calls += 1
+        if failed:
+            backend.failures += 1
+            return
+        if backend.latency_ewma is None:
+            backend.latency_ewma = seconds
+        else:
+            backend.latency_ewma = (1 - EWMA_ALPHA) * backend.latency_ewma + EWMA_ALPHA * seconds
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "backends": {
+                name: {
+                    "provider": backend.provider,
+                    "model": backend.model,
+                    "quality": backend.quality,
+                    "latency_ewma_s": None if backend.latency_ewma is None else round(backend.latency_ewma, 3),
+                    "error_rate": round(backend.error_rate(now), 3),
+                    "calls": backend.calls,
+                    "failures": backend.failures,
+                }
+                for name, backend in self.backends.items()
+            },
+            "routes": self.routes,
+            "chosen": self._chosen,
+        }
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Shared router configured from LLM_ROUTER_BACKENDS and LLM_ROUTES."""
+    global _router
+    if _router is None:
+        _router = ModelRouter(configured_backends(), routes=_parse_routes(os.getenv("LLM_ROUTES", "")))
+    return _router
+
+
+__all__ = [
+    "Backend",
+    "FAST",
+    "ModelRouter",
+    "NodeRequirements",
+    "STANDARD",
+    "STRONG",
+    "configured_backends",
+    "get_model_router",
+]
@@ -1,37 +1,365 @@
+"""Async client for the NVIDIA NIM chat endpoint.
+
+All calls share one pooled ``httpx.AsyncClient`` (HTTP/2 when the ``h2``
+package is installed, keep-alive otherwise), so concurrent completions reuse
+warm connections instead of opening a socket each. Failures are classified:
+timeouts, connection errors, 429 and 5xx responses are retried with jittered
+backoff, but only while the shared retry budget has tokens (each request
+deposits ``NVIDIA_RETRY_RATIO`` of a token), so an outage cannot multiply
+traffic. Anything else (400, 401, 404, ...) is the request's fault and is
+raised at once, without touching the fallback model.
+
+Each model has a circuit breaker over a rolling window of outcomes. The
+primary (``NVIDIA_CHAT_MODEL``) is tried first unless its breaker is open, in
+which case requests go straight to ``NVIDIA_CHAT_MODEL_FALLBACK``; after
+``NVIDIA_BREAKER_COOLDOWN`` seconds one probe request is let through to see
+whether the primary has recovered. When every model's breaker is open (always
+the case for an open primary with no fallback configured), requests fail at
+once with :class:`CircuitOpenError` instead of reaching the provider, until
+the cooldown lets a probe through.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
 import os
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_MODEL = "qwen/qwen3.5-122b-a10b"
+NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE = 16
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_RATIO = 0.2
+DEFAULT_RETRY_BURST = 10.0
+DEFAULT_BACKOFF = 0.25
+MAX_BACKOFF = 4.0
+DEFAULT_BREAKER_WINDOW = 30.0
+DEFAULT_BREAKER_MIN_CALLS = 5
+DEFAULT_BREAKER_THRESHOLD = 0.5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Transient failures worth retrying (or routing to the fallback model)."""
+    if isinstance(exc, (APITimeoutError, APIConnectionError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS or exc.status_code >= 500
+    return False
+
+
+class CircuitOpenError(RuntimeError):
+    """Every candidate model's breaker is open; the request was not sent."""
+
+
+class RetryBudget:
+    """Token bucket: every request deposits ``ratio`` tokens, every retry spends one."""
+
+    def __init__(self, ratio: float = DEFAULT_RETRY_RATIO, burst: float = DEFAULT_RETRY_BURST) -> None:
+        self.ratio = max(0.0, ratio)
+        self.burst = max(0.0, burst)
+        self.tokens = self.burst
+        self.spent = 0
+        self.denied = 0
 
-client = OpenAI(
-    api_key=os.getenv("NVIDIA_API_KEY"),
-    base_url="https://integrate.api.nvidia.com/v1",
-)
+    def deposit(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
 
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            self.denied += 1
+            return False
+        self.tokens -= 1.0
+        self.spent += 1
+        return True
 
-def chat_completion(messages, model=None, max_tokens=1024, temperature=0.6):
-    primary_model = model or os.getenv("NVIDIA_CHAT_MODEL", DEFAULT_MODEL)
-    fallback_model = os.getenv("NVIDIA_CHAT_MODEL_FALLBACK")
+    def stats(self) -> Dict[str, Any]:
+        return {"tokens": round(self.tokens, 2), "spent": self.spent, "denied": self.denied}
 
+
+class CircuitBreaker:
+    """Opens when the rolling error rate crosses ``threshold``; half-opens after ``cooldown``."""
+
+    def __init__(
+        self,
+        *,
+        window: float = DEFAULT_BREAKER_WINDOW,
+        min_calls: int = DEFAULT_BREAKER_MIN_CALLS,
+        threshold: float = DEFAULT_BREAKER_THRESHOLD,
+        cooldown: float = DEFAULT_BREAKER_COOLDOWN,
+    ) -> None:
+        self.window = window
+        self.min_calls = max(1, min_calls)
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probing = False
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def error_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, failed in self._outcomes if failed) / len(self._outcomes)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """The half-open probe ended without a verdict (cancelled); let the next call probe instead."""
+        self._probing = False
+
+    def record(self, failed: bool) -> None:
+        now = time.monotonic()
+        if self.opened_at is not None:
+            # Only the half-open probe reports while open; it decides the next state alone.
+            self._probing = False
+            if failed:
+                self.opened_at = now
+            else:
+                self.opened_at = None
+                self._outcomes.clear()
+            return
+        self._outcomes.append((now, failed))
+        self._trim(now)
+        if len(self._outcomes) >= self.min_calls and self.error_rate() >= self.threshold:
+            self.opened_at = now
+            self.trips += 1
+            logger.warning("NVIDIA circuit opened (error rate %.0f%%)", self.error_rate() * 100)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "calls": len(self._outcomes),
+            "trips": self.trips,
+        }
+
+
+def _http2_available() -> bool:
     try:
-        return client.chat.completions.create(
-            model=primary_model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            top_p=0.95,
-        )
-    except Exception:
-        if not fallback_model or fallback_model == primary_model:
-            raise
-        return client.chat.completions.create(
-            model=fallback_model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            top_p=0.95,
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Shared connection pool sized from NVIDIA_MAX_CONNECTIONS / NVIDIA_MAX_KEEPALIVE."""
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=int(_env_float("NVIDIA_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+            max_keepalive_connections=int(_env_float("NVIDIA_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE)),
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(_env_float("NVIDIA_TIMEOUT", DEFAULT_TIMEOUT), connect=DEFAULT_CONNECT_TIMEOUT),
+    )
+
+
+class NvidiaChatClient:
+    """Retrying, breaker-routed chat completions against the NVIDIA endpoint."""
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        *,
+        primary_model: Optional[str] = None,
+        fallback_model: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_budget: Optional[RetryBudget] = None,
+        backoff: float = DEFAULT_BACKOFF,
+        breaker_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._client = client
+        self.primary_model = primary_model or os.getenv("NVIDIA_CHAT_MODEL", DEFAULT_MODEL)
+        self.fallback_model = fallback_model if fallback_model is not None else os.getenv("NVIDIA_CHAT_MODEL_FALLBACK")
+        self.max_attempts = max(1, max_attempts)
+        self.retry_budget = retry_budget or RetryBudget()
+        self.backoff = backoff
+        self._breaker_options = breaker_options or {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.requests = 0
+        self.fallbacks = 0
+        self.rejected = 0
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=os.getenv("NVIDIA_API_KEY"),
+                base_url=NVIDIA_BASE_URL,
+                http_client=build_http_client(),
+                # Retries are ours: classified and paid for from the budget.
+                max_retries=0,
+            )
+        return self._client
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(**self._breaker_options)
+        return breaker
+
+    def _candidates(self, model: Optional[str]) -> List[str]:
+        primary = model or self.primary_model
+        if self.fallback_model and self.fallback_model != primary:
+            return [primary, self.fallback_model]
+        return [primary]
+
+    async def _attempt(self, model: str, request: Dict[str, Any]) -> Any:
+        breaker = self.breaker(model)
+        attempt = 1
+        while True:
+            try:
+                response = await self.client.chat.completions.create(model=model, **request)
+            except Exception as exc:
+                retryable = is_retryable_error(exc)
+                breaker.record(failed=retryable)
+                if not retryable or attempt >= self.max_attempts or breaker.state != "closed":
+                    raise
+                if not self.retry_budget.withdraw():
+                    raise
+                delay = min(MAX_BACKOFF, self.backoff * 2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(0, delay))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled by a hedge, deadline or race: says nothing about the model.
+                breaker.release_probe()
+                raise
+            breaker.record(failed=False)
+            return response
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.6,
+    ) -> Any:
+        self.requests += 1
+        self.retry_budget.deposit()
+        request = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature, "top_p": 0.95}
+        candidates = self._candidates(model)
+        error: Optional[Exception] = None
+        for name in candidates:
+            # Ask the breaker only when about to call, so an unused half-open probe slot is not held.
+            if not self.breaker(name).allow():
+                continue
+            if error is not None:
+                self.fallbacks += 1
+                logger.info("NVIDIA request falling back to %s after: %s", name, error)
+            try:
+                return await self._attempt(name, request)
+            except Exception as exc:
+                if not is_retryable_error(exc):
+                    raise
+                error = exc
+        if error is not None:
+            raise error
+        # Every breaker is open: fail fast rather than keep a failing provider busy.
+        self.rejected += 1
+        raise CircuitOpenError(f"NVIDIA circuit open for {', '.join(candidates)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "rejected": self.rejected,
+            "retry_budget": self.retry_budget.stats(),
+            "models": {name: breaker.stats() for name, breaker in sorted(self._breakers.items())},
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_nvidia_client: Optional[NvidiaChatClient] = None
+
+
+def get_nvidia_chat_client() -> NvidiaChatClient:
+    """Shared client configured from NVIDIA_* settings."""
+    global _nvidia_client
+    if _nvidia_client is None:
+        _nvidia_client = NvidiaChatClient(
+            max_attempts=int(_env_float("NVIDIA_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+            retry_budget=RetryBudget(
+                ratio=_env_float("NVIDIA_RETRY_RATIO", DEFAULT_RETRY_RATIO),
+                burst=_env_float("NVIDIA_RETRY_BURST", DEFAULT_RETRY_BURST),
+            ),
+            breaker_options={
+                "threshold": _env_float("NVIDIA_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD),
+                "cooldown": _env_float("NVIDIA_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN),
+            },
         )
+    return _nvidia_client
+
+
+async def chat_completion(messages, model=None, max_tokens=1024, temperature=0.6):
+    return await get_nvidia_chat_client().chat_completion(
+        messages, model=model, max_tokens=max_tokens, temperature=temperature
+    )
+
+
+async def close_nvidia_chat_client() -> None:
+    if _nvidia_client is not None:
+        await _nvidia_client.close()
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "NvidiaChatClient",
+    "RetryBudget",
+    "chat_completion",
+    "close_nvidia_chat_client",
+    "get_nvidia_chat_client",
+    "is_retryable_error",
+]
@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 from fastapi import HTTPException, Response
 from openai import OpenAI, AsyncOpenAI
 
+from app.services.llm_dispatcher import Priority, get_llm_dispatcher
+from app.services.llm_hedging import get_hedge_policy
+
 load_dotenv()
 
 # Initialize OpenAI client directly
@@ -586,11 +589,20 @@ Respond as a helpful AI tutor. Be conversational, educational, and engaging."""
                 messages.append({"role": role, "content": content})
         messages.append({"role": "user", "content": user_message})
 
-        response = await async_openai_client.chat.completions.create(
-            model=os.getenv("CHAT_MODEL", "gpt-4o-mini"),
-            messages=messages,
-            max_tokens=400,
-            temperature=0.5,
+        dispatcher = get_llm_dispatcher()
+        response = await get_hedge_policy().run(
+            "chat",
+            lambda: dispatcher.run(
+                lambda: async_openai_client.chat.completions.create(
+                    model=os.getenv("CHAT_MODEL", "gpt-4o-mini"),
+                    messages=messages,
+                    max_tokens=400,
+                    temperature=0.5,
+                ),
+                priority=Priority.INTERACTIVE,
+            ),
+            can_hedge=lambda: dispatcher.in_flight < dispatcher.limit,
+            from_admission=True,
         )
 
         content = response.choices[0].message.content.strip()
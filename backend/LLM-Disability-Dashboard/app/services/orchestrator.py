@@ -1,35 +1,140 @@
 """LangGraph orchestrator that wires prompt handlers into a workflow graph."""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
-import sqlite3
-from pathlib import Path
-from typing import Any, Dict, Optional
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from langgraph.graph import END, StateGraph
 
+from .adaptive_difficulty import adaptive_manager
 from .attempt_normalizer import (
     is_correct_answer,
     normalize_attempt,
     patch_attempt_for_consistency,
 )
+from .checkpoint_store import CheckpointStore, create_checkpoint_store
 from .consistency_validator import CONSISTENCY_THRESHOLD, validate_response_consistency
+from .difficulty_policy import session_success
 from .problem_validator import validate_problem_consistency
+from .prompt_budget import budget_for, compact_attempt, compact_thought, summarize_history
 from .disability_registry import normalize_disability
 from .grade_registry import DEFAULT_DIFFICULTY, DEFAULT_GRADE_LEVEL, normalize_difficulty, normalize_grade_level
 from .langgraph_state import LearningSessionState
 from .llm_client import LLMClient
+from .llm_dispatcher import Priority, llm_priority
+from .output_schemas import OUTPUT_SCHEMAS, SchemaViolation
 from .prompt_registry import PromptRegistry
 from .prompts import get_workflow_prompts
+from .question_bank import QuestionBank
+from .semantic_cache import SemanticKey
+from .speculative import drain_background, race
+from .student_aggregates import StudentAggregate, StudentAggregateStore, create_student_aggregate_store
 
 logger = logging.getLogger(__name__)
 
 SIMULATE_TEMPERATURES = (0.7, 0.5, 0.3)
 MAX_SIMULATE_RETRIES = 2
+# Concurrent attempt candidates per simulation; 1 keeps the sequential retry loop.
+SPECULATIVE_ATTEMPT_CANDIDATES = max(1, int(os.getenv("SPECULATIVE_ATTEMPT_CANDIDATES", "1")))
 PROBLEM_GENERATION_TEMPERATURES = (0.5, 0.3, 0.2)
 MAX_PROBLEM_RETRIES = 3
+# Concurrent problem candidates per generation; 1 keeps the sequential retry loop.
+SPECULATIVE_PROBLEM_CANDIDATES = max(1, int(os.getenv("SPECULATIVE_PROBLEM_CANDIDATES", "1")))
+# Valid runner-up problems kept per (grade, difficulty) for uncached requests.
+PROBLEM_POOL_SIZE = int(os.getenv("PROBLEM_POOL_SIZE", "12"))
+ADAPTIVE_MODES = ("hybrid", "local", "llm")
+ADAPTIVE_LLM_CONFIDENCE = float(os.getenv("ADAPTIVE_LLM_CONFIDENCE", "0.5"))
+
+NodeHandler = Callable[[LearningSessionState], Awaitable[Dict[str, Any]]]
+
+RUN_INPUT_FIELDS = (
+    "grade_level",
+    "difficulty",
+    "disability",
+    "problem",
+    "student_attempt",
+    "student_response",
+    "student_history",
+)
+
+
+# State fields (and metadata flags) each node reads, and the fields it writes.
+# Incremental re-runs reuse a node's previous outputs when its inputs are unchanged.
+NODE_INPUTS: Dict[str, tuple] = {
+    "generate_problem_step": (
+        "grade_level",
+        "difficulty",
+        "problem",
+        "metadata.use_provided_problem",
+        "metadata.workflow_type",
+    ),
+    "simulate_attempt_step": (
+        "problem",
+        "disability",
+        "student_attempt",
+        "metadata.target_correctness",
+        "metadata.error_style",
+        "metadata.force_resimulate",
+    ),
+    "analyze_attempt_step": ("problem", "student_attempt", "disability", "thought_analysis", "metadata.simulate_only"),
+    "strategies_step": (
+        "problem",
+        "student_attempt",
+        "disability",
+        "thought_analysis",
+        "strategies",
+        "metadata.simulate_only",
+    ),
+    "tutor_step": (
+        "problem",
+        "student_attempt",
+        "disability",
+        "thought_analysis",
+        "tutor_session",
+        "metadata.simulate_only",
+        "metadata.stop_after",
+    ),
+    "consistency_step": (
+        "problem",
+        "student_attempt",
+        "disability",
+        "difficulty",
+        "consistency_report",
+        "metadata.stop_after",
+        "metadata.student_id",
+    ),
+    "adaptive_step": (
+        "student_history",
+        "grade_level",
+        "difficulty",
+        "adaptive_plan",
+        "metadata.stop_after",
+        "metadata.adaptive_mode",
+        "metadata.adaptive_narrative",
+        "metadata.student_id",
+    ),
+    "identify_step": ("student_response", "problem", "disability_analysis", "metadata.stop_after"),
+}
+NODE_OUTPUTS: Dict[str, tuple] = {
+    "generate_problem_step": ("problem",),
+    "simulate_attempt_step": ("student_attempt", "consistency_report"),
+    "analyze_attempt_step": ("thought_analysis",),
+    "strategies_step": ("strategies",),
+    "tutor_step": ("tutor_session",),
+    "consistency_step": ("consistency_report", "student_attempt"),
+    "adaptive_step": ("adaptive_plan",),
+    "identify_step": ("disability_analysis",),
+}
+
+
+def _fingerprint(data: Any) -> str:
+    serialized = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
 
 
 class LangGraphOrchestrator:
@@ -44,20 +149,64 @@ class LangGraphOrchestrator:
         self.registry = registry or PromptRegistry()
         self.llm_client = llm_client or LLMClient()
         self.prompts = get_workflow_prompts()
-        self._checkpointer = self._create_checkpointer()
+        self._checkpoints = self._create_checkpoint_store()
+        self._aggregates = self._create_aggregate_store()
+        # Runs in flight per thread; the same session may be run concurrently.
+        self._active_threads: Dict[str, int] = {}
+        # Keyed by run_id, not thread_id, so concurrent runs of one thread stay apart.
+        self._reuse_sources: Dict[str, Dict[str, Any]] = {}
+        self._run_outputs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.attempt_candidates = SPECULATIVE_ATTEMPT_CANDIDATES
+        self.problem_candidates = SPECULATIVE_PROBLEM_CANDIDATES
+        self.problem_pool = QuestionBank(
+            self._generate_pooled_problem,
+            validate=lambda problem: bool(validate_problem_consistency(problem).get("valid")),
+            target_size=PROBLEM_POOL_SIZE,
+            low_water=0,
+            max_uses=1,
+            auto_refill=False,
+        )
         self._graph = self._build_graph()
 
-    def _create_checkpointer(self):
+    def _create_checkpoint_store(self) -> Optional[CheckpointStore]:
         try:
-            from langgraph.checkpoint.sqlite import SqliteSaver
+            return create_checkpoint_store()
+        except Exception as exc:
+            logger.warning("Checkpoint store unavailable, running without persistence: %s", exc)
+            return None
 
-            db_path = Path(__file__).resolve().parents[2] / "data" / "checkpoints.db"
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-            conn = sqlite3.connect(str(db_path), check_same_thread=False)
-            return SqliteSaver(conn)
+    def _create_aggregate_store(self) -> Optional[StudentAggregateStore]:
+        try:
+            return create_student_aggregate_store()
         except Exception as exc:
-            logger.warning("Checkpointer unavailable, running without persistence: %s", exc)
+            logger.warning("Student aggregate store unavailable: %s", exc)
+            return None
+
+    async def aclose(self) -> None:
+        await drain_background()
+        await self.problem_pool.close()
+        if self._checkpoints is not None:
+            await self._checkpoints.close()
+        if self._aggregates is not None:
+            await self._aggregates.close()
+
+    def checkpoint_stats(self) -> Dict[str, Any]:
+        if self._checkpoints is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._checkpoints.get_stats()}
+
+    async def student_aggregate(self, student_id: Any) -> Optional[StudentAggregate]:
+        if self._aggregates is None or student_id in (None, ""):
             return None
+        return await self._aggregates.get(str(student_id))
+
+    async def student_aggregate_breakdown(self, student_id: Any) -> Dict[str, Any]:
+        rows = [] if self._aggregates is None else await self._aggregates.breakdown(str(student_id))
+        return {
+            "enabled": self._aggregates is not None,
+            "student_id": str(student_id),
+            "aggregates": [row.to_dict() for row in rows],
+        }
 
     def build_initial_state(self, payload: Dict[str, Any]) -> LearningSessionState:
         metadata = dict(payload.get("metadata") or {})
@@ -144,6 +293,7 @@ class LangGraphOrchestrator:
             "consistency_score": consistency.get("overall_consistency_score"),
             "prewarm_status": metadata.get("prewarm_status"),
             "answer_validated": bool(problem_payload.get("answer_validated")),
+            "reused_nodes": metadata.get("reused_nodes", []),
         }
 
         results = {
@@ -172,45 +322,134 @@ class LangGraphOrchestrator:
         *,
         use_cache: bool = True,
     ) -> Dict[str, Any]:
-        """Generate a problem and retry until answer matches solution steps."""
+        """Generate a problem and retry until answer matches solution steps.
+
+        With ``problem_candidates`` > 1 the first round races that many
+        candidates, and valid runners-up are kept in ``problem_pool`` to serve
+        later requests that skip the cache.
+        """
+        key = (grade_level, difficulty)
+        if not use_cache and self.problem_candidates > 1:
+            pooled = self.problem_pool.take(key)
+            if pooled is not None:
+                return pooled
+
         prompt = self.prompts.get_problem_generation_prompt(grade_level, difficulty)
         last_validation: Dict[str, Any] = {}
+        first_retry = 0
+        if self.problem_candidates > 1:
+            payload, last_validation = await self._speculate_problem(prompt, key, use_cache)
+            if payload is not None:
+                return payload
+            first_retry = self.problem_candidates
 
-        for attempt_idx in range(MAX_PROBLEM_RETRIES):
+        for attempt_idx in range(first_retry, MAX_PROBLEM_RETRIES):
             temperature = PROBLEM_GENERATION_TEMPERATURES[
                 min(attempt_idx, len(PROBLEM_GENERATION_TEMPERATURES) - 1)
             ]
             attempt_use_cache = use_cache and attempt_idx == 0
-            payload = await self.llm_client.invoke_with_prompt(
-                prompt=prompt,
-                model="gpt-4o-mini",
-                temperature=temperature,
-                use_cache=attempt_use_cache,
-            )
-
-            if not isinstance(payload, dict) or not payload:
-                last_validation = {"details": "Problem generation returned empty payload"}
+            try:
+                result = await self._problem_candidate(prompt, temperature, attempt_use_cache)
+            except SchemaViolation as exc:
+                last_validation = {"details": f"Problem generation broke its schema: {exc}"}
                 continue
 
-            validation = validate_problem_consistency(payload)
-            last_validation = validation
-            if validation.get("valid"):
-                payload["answer_validated"] = True
-                return payload
+            last_validation = result["validation"]
+            if last_validation.get("valid"):
+                return result["payload"]
 
             logger.warning(
                 "Problem answer/solution mismatch (attempt %s/%s): %s",
                 attempt_idx + 1,
                 MAX_PROBLEM_RETRIES,
-                validation.get("details"),
+                last_validation.get("details"),
             )
 
+        attempts = max(MAX_PROBLEM_RETRIES, first_retry)
         detail = last_validation.get("details", "Unknown validation failure")
         raise HTTPException(
             status_code=502,
-            detail=f"Could not generate a consistent problem after {MAX_PROBLEM_RETRIES} attempts: {detail}",
+            detail=f"Could not generate a consistent problem after {attempts} attempts: {detail}",
         )
 
+    async def _problem_candidate(self, prompt: str, temperature: float, use_cache: bool) -> Dict[str, Any]:
+        """One generated problem with its answer/solution validation."""
+        payload = await self.llm_client.invoke_with_prompt(
+            prompt=prompt,
+            temperature=temperature,
+            use_cache=use_cache,
+            prompt_type="problem",
+            schema=OUTPUT_SCHEMAS["problem"],
+        )
+        if not isinstance(payload, dict) or not payload:
+            empty = {"valid": False, "details": "Problem generation returned empty payload"}
+            return {"payload": payload, "validation": empty}
+        validation = validate_problem_consistency(payload)
+        if validation.get("valid"):
+            payload["answer_validated"] = True
+        return {"payload": payload, "validation": validation}
+
+    async def _speculate_problem(
+        self,
+        prompt: str,
+        key: Tuple[str, str],
+        use_cache: bool,
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Race ``problem_candidates`` generations; returns the first valid payload and its validation.
+
+        A valid cached problem is served without starting any candidate.
+        """
+        first_temperature = PROBLEM_GENERATION_TEMPERATURES[0]
+        if use_cache:
+            cached = await self.llm_client.cached_prompt(prompt, temperature=first_temperature, prompt_type="problem")
+            if isinstance(cached, dict) and cached:
+                validation = validate_problem_consistency(cached)
+                if validation.get("valid"):
+                    cached["answer_validated"] = True
+                    return cached, validation
+
+        def candidate(index: int) -> Callable[[], Awaitable[Dict[str, Any]]]:
+            temperature = PROBLEM_GENERATION_TEMPERATURES[index % len(PROBLEM_GENERATION_TEMPERATURES)]
+            return lambda: self._problem_candidate(prompt, temperature, use_cache and index == 0)
+
+        def keep(result: Dict[str, Any]) -> None:
+            if result["validation"].get("valid"):
+                self.problem_pool.add(key, result["payload"])
+
+        outcome = await race(
+            "problem",
+            [candidate(index) for index in range(self.problem_candidates)],
+            lambda result: bool(result["validation"].get("valid")),
+            # Let the losers finish only while the pool has room for what they produce.
+            on_late=keep if self.problem_pool.has_room(key) else None,
+        )
+        for finished in outcome.finished:
+            if finished is not outcome.winner and finished.error is None:
+                keep(finished.value)
+        if outcome.winner is not None:
+            return outcome.winner.value["payload"], outcome.winner.value["validation"]
+
+        errors = [c.error for c in outcome.finished if c.error is not None]
+        if len(errors) == len(outcome.finished):
+            for error in errors:
+                if not isinstance(error, SchemaViolation):
+                    raise error
+            return None, {"details": f"Problem generation broke its schema: {errors[-1]}"}
+        rejected = [c.value["validation"] for c in outcome.finished if c.error is None]
+        logger.warning(
+            "No valid problem among %s speculative candidates: %s",
+            len(outcome.finished),
+            rejected[-1].get("details"),
+        )
+        return None, rejected[-1]
+
+    async def _generate_pooled_problem(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        grade_level, difficulty = key
+        prompt = self.prompts.get_problem_generation_prompt(grade_level, difficulty)
+        with llm_priority(Priority.BACKGROUND):
+            result = await self._problem_candidate(prompt, PROBLEM_GENERATION_TEMPERATURES[0], False)
+        return result["payload"]
+
     async def generate_problem(
         self,
         grade_level: str,
@@ -225,12 +464,144 @@ class LangGraphOrchestrator:
         )
 
     async def run_graph(self, state: LearningSessionState) -> LearningSessionState:
+        metadata = state.setdefault("metadata", {})
+        thread_id = str(metadata.setdefault("thread_id", str(metadata.get("session_id") or uuid.uuid4().hex)))
+        metadata["input_key"] = self._run_input_key(state)
+        metadata["completed_nodes"] = []
+        metadata["node_fingerprints"] = {}
+        metadata["reused_nodes"] = []
+        run_id = metadata["run_id"] = uuid.uuid4().hex
+
+        if metadata.get("session_id") and self._can_resume(metadata):
+            state = await self._resume_state(thread_id, state)
+            if self._incremental_enabled(metadata):
+                previous = await self._previous_run(thread_id)
+                if previous is not None:
+                    self._reuse_sources[run_id] = previous
+
+        self._active_threads[thread_id] = self._active_threads.get(thread_id, 0) + 1
+        self._run_outputs[run_id] = {}
+        try:
+            final_state = await self._graph.ainvoke(state)
+        finally:
+            self._active_threads[thread_id] -= 1
+            if not self._active_threads[thread_id]:
+                del self._active_threads[thread_id]
+            self._reuse_sources.pop(run_id, None)
+            node_outputs = self._run_outputs.pop(run_id, {})
+
+        if self._checkpoints is not None:
+            await self._checkpoints.save(
+                thread_id,
+                "__end__",
+                {**final_state, "node_outputs": node_outputs},
+                status="completed",
+            )
+        return final_state
+
+    def _run_input_key(self, state: LearningSessionState) -> str:
+        metadata = state.get("metadata") or {}
+        inputs = {key: state.get(key) for key in RUN_INPUT_FIELDS}
+        inputs["workflow_type"] = metadata.get("workflow_type")
+        inputs["stop_after"] = metadata.get("stop_after")
+        inputs["simulate_only"] = bool(metadata.get("simulate_only"))
+        return _fingerprint(inputs)
+
+    def _can_resume(self, metadata: Dict[str, Any]) -> bool:
+        if self._checkpoints is None or metadata.get("resume") is False:
+            return False
+        return not (metadata.get("refresh_problem") or metadata.get("force_refresh"))
+
+    def _incremental_enabled(self, metadata: Dict[str, Any]) -> bool:
+        if "incremental" in metadata:
+            return bool(metadata["incremental"])
+        flag = os.getenv("WORKFLOW_INCREMENTAL", "false").strip().lower()
+        return flag in {"1", "true", "yes", "on"}
+
+    async def _previous_run(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            latest = await self._checkpoints.latest(thread_id, status="completed")
+        except Exception as exc:
+            logger.warning("Could not load previous run for %s: %s", thread_id, exc)
+            return None
+        return latest["state"] if latest is not None else None
+
+    @staticmethod
+    def _node_fingerprint(name: str, state: LearningSessionState) -> str:
         metadata = state.get("metadata") or {}
-        session_id = metadata.get("session_id") or metadata.get("workflow_key") or "default"
-        config = {"configurable": {"thread_id": str(session_id)}}
-        if self._checkpointer is not None:
-            return await self._graph.ainvoke(state, config=config)
-        return await self._graph.ainvoke(state)
+        inputs: Dict[str, Any] = {}
+        for field in NODE_INPUTS.get(name, ()):
+            if field.startswith("metadata."):
+                inputs[field] = metadata.get(field[len("metadata.") :])
+            else:
+                inputs[field] = state.get(field)
+        return _fingerprint(inputs)
+
+    async def _server_inputs(self, name: str, state: LearningSessionState) -> Optional[Dict[str, Any]]:
+        """Inputs a node reads from server-side state, or None when its output must never be reused."""
+        if name != "adaptive_step":
+            return {}
+        if not adaptive_manager.policy.deterministic:
+            return None
+        if state.get("student_history"):
+            return {}
+        aggregate = await self.student_aggregate((state.get("metadata") or {}).get("student_id"))
+        return {"aggregate": None if aggregate is None else aggregate.to_dict()}
+
+    async def _resume_state(self, thread_id: str, state: LearningSessionState) -> LearningSessionState:
+        """Seed ``state`` from the thread's last partial checkpoint when inputs match."""
+        try:
+            latest = await self._checkpoints.latest(thread_id)
+        except Exception as exc:
+            logger.warning("Could not load checkpoint for %s: %s", thread_id, exc)
+            return state
+        if latest is None or latest["status"] != "running":
+            return state
+
+        saved = latest["state"]
+        saved_meta = saved.get("metadata") or {}
+        metadata = state.get("metadata") or {}
+        if saved_meta.get("input_key") != metadata.get("input_key"):
+            return state
+
+        completed = list(saved_meta.get("completed_nodes") or [])
+        resumed: LearningSessionState = {**saved, **{k: v for k, v in state.items() if k != "metadata"}}
+        resumed["metadata"] = {
+            **metadata,
+            "cache_status": dict(saved_meta.get("cache_status") or {}),
+            "node_fingerprints": dict(saved_meta.get("node_fingerprints") or {}),
+            "completed_nodes": list(completed),
+            "resumed_nodes": completed,
+            "resumed_from": latest["node"],
+        }
+        logger.info("Resuming workflow %s after %s", thread_id, latest["node"])
+        return resumed
+
+    async def workflow_progress(self, thread_id: str) -> Dict[str, Any]:
+        """Report which nodes a thread has already completed."""
+        if self._checkpoints is None:
+            return {"session_id": thread_id, "status": "unavailable", "completed_nodes": [], "resumable": False}
+
+        latest = await self._checkpoints.latest(thread_id)
+        if latest is None:
+            status = "running" if thread_id in self._active_threads else "not_found"
+            return {"session_id": thread_id, "status": status, "completed_nodes": [], "resumable": False}
+
+        saved_meta = latest["state"].get("metadata") or {}
+        if latest["status"] == "completed":
+            status = "completed"
+        elif thread_id in self._active_threads:
+            status = "running"
+        else:
+            status = "interrupted"
+        return {
+            "session_id": thread_id,
+            "status": status,
+            "completed_nodes": list(saved_meta.get("completed_nodes") or []),
+            "last_checkpoint_node": latest["node"],
+            "updated_at": latest["created_at"],
+            "resumable": status == "interrupted",
+        }
 
     async def simulate_attempt_only(self, state: LearningSessionState) -> Dict[str, Any]:
         """Run simulate + validate for batch comparison flows."""
@@ -252,14 +623,14 @@ class LangGraphOrchestrator:
         adaptive_node = "adaptive_step"
         identify_node = "identify_step"
 
-        workflow.add_node(problem_node, self._generate_problem_node)
-        workflow.add_node(attempt_node, self._simulate_attempt_node)
-        workflow.add_node(analyze_node, self._analyze_attempt_node)
-        workflow.add_node(strategies_node, self._strategy_node)
-        workflow.add_node(tutor_node, self._tutor_node)
-        workflow.add_node(consistency_node, self._consistency_node)
-        workflow.add_node(adaptive_node, self._adaptive_difficulty_node)
-        workflow.add_node(identify_node, self._identify_disability_node)
+        workflow.add_node(problem_node, self._checkpointed(problem_node, self._generate_problem_node))
+        workflow.add_node(attempt_node, self._checkpointed(attempt_node, self._simulate_attempt_node))
+        workflow.add_node(analyze_node, self._checkpointed(analyze_node, self._analyze_attempt_node))
+        workflow.add_node(strategies_node, self._checkpointed(strategies_node, self._strategy_node))
+        workflow.add_node(tutor_node, self._checkpointed(tutor_node, self._tutor_node))
+        workflow.add_node(consistency_node, self._checkpointed(consistency_node, self._consistency_node))
+        workflow.add_node(adaptive_node, self._checkpointed(adaptive_node, self._adaptive_difficulty_node))
+        workflow.add_node(identify_node, self._checkpointed(identify_node, self._identify_disability_node))
 
         workflow.set_entry_point(problem_node)
         workflow.add_conditional_edges(
@@ -283,10 +654,58 @@ class LangGraphOrchestrator:
         workflow.add_edge(adaptive_node, identify_node)
         workflow.add_edge(identify_node, END)
 
-        if self._checkpointer is not None:
-            return workflow.compile(checkpointer=self._checkpointer)
         return workflow.compile()
 
+    def _checkpointed(self, name: str, handler: NodeHandler) -> NodeHandler:
+        """Track completion of ``name`` and snapshot state when it is a checkpoint node.
+
+        Nodes already completed by a resumed checkpoint are skipped; their
+        outputs are already present in the seeded state. In incremental mode a
+        node whose declared inputs match the session's previous run reuses that
+        run's outputs instead of calling the handler.
+        """
+
+        async def run(state: LearningSessionState) -> Dict[str, Any]:
+            if name in ((state.get("metadata") or {}).get("resumed_nodes") or ()):
+                return {}
+
+            metadata = dict(state.get("metadata") or {})
+            run_id = metadata.get("run_id")
+            fingerprint = self._node_fingerprint(name, state)
+            previous = self._reuse_sources.get(run_id) if run_id else None
+            previous_prints = ((previous or {}).get("metadata") or {}).get("node_fingerprints") or {}
+            previous_outputs = ((previous or {}).get("node_outputs") or {}).get(name)
+            server_inputs = await self._server_inputs(name, state)
+            if server_inputs:
+                fingerprint = _fingerprint({"request": fingerprint, "server": server_inputs})
+
+            if (
+                server_inputs is not None
+                and previous_outputs is not None
+                and previous_prints.get(name) == fingerprint
+            ):
+                update = dict(previous_outputs)
+                metadata["reused_nodes"] = [*(metadata.get("reused_nodes") or []), name]
+            else:
+                update = dict(await handler(state) or {})
+
+            run_outputs = self._run_outputs.get(run_id) if run_id else None
+            if run_outputs is not None:
+                run_outputs[name] = {k: v for k, v in update.items() if k in NODE_OUTPUTS.get(name, ())}
+
+            metadata["node_fingerprints"] = {**(metadata.get("node_fingerprints") or {}), name: fingerprint}
+            metadata["completed_nodes"] = [*(metadata.get("completed_nodes") or []), name]
+            update["metadata"] = metadata
+
+            store = self._checkpoints
+            if store is not None and store.should_checkpoint(name):
+                thread_id = metadata.get("thread_id")
+                if thread_id:
+                    await store.save(str(thread_id), name, {**state, **update})
+            return update
+
+        return run
+
     def _route_after_problem(self, state: LearningSessionState) -> str:
         metadata = state.get("metadata") or {}
         if metadata.get("simulate_only"):
@@ -374,6 +793,20 @@ class LangGraphOrchestrator:
         consistency_report: Optional[Dict[str, Any]] = None
         final_attempt: Optional[Dict[str, Any]] = None
 
+        if self.attempt_candidates > 1:
+            prompts = self.prompts.get_student_attempt_prompt(
+                disability=disability,
+                problem=problem_text,
+                target_correctness=target,
+                expected_answer=expected,
+                error_style=error_style,
+            )
+            final_attempt, consistency_report = await self._speculate_attempt(
+                prompts, problem_text, disability, expected, use_cache
+            )
+            self._record_cache(state, "simulate_attempt")
+            return {"student_attempt": final_attempt, "consistency_report": consistency_report}
+
         for attempt_idx in range(MAX_SIMULATE_RETRIES + 1):
             temperature = SIMULATE_TEMPERATURES[min(attempt_idx, len(SIMULATE_TEMPERATURES) - 1)]
             prompts = self.prompts.get_student_attempt_prompt(
@@ -393,12 +826,18 @@ class LangGraphOrchestrator:
                 {"role": "system", "content": prompts["system"] + retry_note},
                 {"role": "user", "content": prompts["user"]},
             ]
-            payload = await self.llm_client.invoke_chat(
-                messages=chat_messages,
-                model="gpt-4o-mini",
-                temperature=temperature,
-                use_cache=use_cache and attempt_idx == 0,
-            )
+            try:
+                payload = await self.llm_client.invoke_chat(
+                    messages=chat_messages,
+                    temperature=temperature,
+                    use_cache=use_cache and attempt_idx == 0,
+                    prompt_type="attempt",
+                    schema=OUTPUT_SCHEMAS["attempt"],
+                )
+            except SchemaViolation as exc:
+                if attempt_idx < MAX_SIMULATE_RETRIES:
+                    continue
+                raise HTTPException(status_code=502, detail=f"Student attempt broke its schema: {exc}") from exc
 
             if not isinstance(payload, dict):
                 raise HTTPException(status_code=500, detail="Student attempt returned invalid payload")
@@ -430,6 +869,95 @@ class LangGraphOrchestrator:
             result["consistency_report"] = consistency_report
         return result
 
+    async def _attempt_candidate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        use_cache: bool,
+        problem_text: str,
+        disability: str,
+        expected: str,
+    ) -> Dict[str, Any]:
+        """One simulated attempt, normalized and scored for consistency."""
+        payload = await self.llm_client.invoke_chat(
+            messages=messages,
+            temperature=temperature,
+            use_cache=use_cache,
+            prompt_type="attempt",
+            schema=OUTPUT_SCHEMAS["attempt"],
+        )
+        return self._scored_attempt(payload, problem_text, disability, expected)
+
+    @staticmethod
+    def _scored_attempt(payload: Any, problem_text: str, disability: str, expected: str) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=500, detail="Student attempt returned invalid payload")
+        normalized = normalize_attempt(payload, expected)
+        return {
+            "attempt": normalized,
+            "report": validate_response_consistency(problem_text, disability, normalized, expected),
+            "correct": bool(expected) and is_correct_answer(payload, expected),
+        }
+
+    async def _speculate_attempt(
+        self,
+        prompts: Dict[str, str],
+        problem_text: str,
+        disability: str,
+        expected: str,
+        use_cache: bool,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Race ``attempt_candidates`` simulations; the first consistent, incorrect one wins.
+
+        When none qualifies, the best-scoring candidate is patched, as the last
+        sequential retry would be. A qualifying cached attempt is served without
+        starting any candidate.
+        """
+        messages = [
+            {"role": "system", "content": prompts["system"]},
+            {"role": "user", "content": prompts["user"]},
+        ]
+
+        def score(result: Dict[str, Any]) -> float:
+            return result["report"].get("overall_consistency_score", 0.0)
+
+        def accept(result: Dict[str, Any]) -> bool:
+            return not result["correct"] and score(result) >= CONSISTENCY_THRESHOLD
+
+        if use_cache:
+            cached = await self.llm_client.cached_chat(
+                messages, temperature=SIMULATE_TEMPERATURES[0], prompt_type="attempt"
+            )
+            if isinstance(cached, dict):
+                result = self._scored_attempt(cached, problem_text, disability, expected)
+                if accept(result):
+                    return result["attempt"], result["report"]
+
+        def candidate(index: int) -> Callable[[], Awaitable[Dict[str, Any]]]:
+            temperature = SIMULATE_TEMPERATURES[index % len(SIMULATE_TEMPERATURES)]
+            return lambda: self._attempt_candidate(
+                messages, temperature, use_cache and index == 0, problem_text, disability, expected
+            )
+
+        outcome = await race("attempt", [candidate(index) for index in range(self.attempt_candidates)], accept)
+        if outcome.winner is not None:
+            return outcome.winner.value["attempt"], outcome.winner.value["report"]
+
+        scored = [c.value for c in outcome.finished if c.error is None]
+        if not scored:
+            errors = [c.error for c in outcome.finished]
+            for error in errors:
+                if not isinstance(error, SchemaViolation):
+                    raise error
+            raise HTTPException(status_code=502, detail=f"Student attempt broke its schema: {errors[0]}")
+
+        best = max(scored, key=lambda result: (not result["correct"], score(result)))
+        normalized, report = best["attempt"], best["report"]
+        if score(best) < CONSISTENCY_THRESHOLD:
+            normalized = patch_attempt_for_consistency(normalized)
+            report = validate_response_consistency(problem_text, disability, normalized, expected)
+        return normalized, report
+
     async def _analyze_attempt_node(self, state: LearningSessionState) -> Dict[str, Any]:
         metadata = state.get("metadata") or {}
         if metadata.get("simulate_only"):
@@ -444,7 +972,7 @@ class LangGraphOrchestrator:
             return {}
 
         problem_text = problem.get("problem", "") if isinstance(problem, dict) else str(problem)
-        attempt_json = self.llm_client.dumps(attempt)
+        attempt_json = self.llm_client.dumps(compact_attempt(attempt, budget_for("thought")))
 
         prompt = self.prompts.get_thought_analysis_prompt(
             disability=disability,
@@ -453,9 +981,12 @@ class LangGraphOrchestrator:
         )
 
         payload = await self.llm_client.invoke_with_prompt(
-            prompt=prompt,
-            model="gpt-4o-mini",
+            prompt=prompt["user"],
+            system=prompt["system"],
             temperature=0.3,
+            semantic=SemanticKey("thought", f"{disability}\n{problem_text}", attempt_json),
+            prompt_type="thought",
+            schema=OUTPUT_SCHEMAS["thought"],
         )
 
         if not isinstance(payload, dict):
@@ -463,6 +994,15 @@ class LangGraphOrchestrator:
         self._record_cache(state, "analyze_attempt")
         return {"thought_analysis": payload}
 
+    def _compact_inputs(self, attempt: Any, thought: Any, prompt_type: str) -> Tuple[str, str]:
+        """Attempt and analysis JSON trimmed to the fields the prompt reads, sharing the node's budget."""
+        budget = budget_for(prompt_type)
+        share = budget // 2 if budget else None
+        return (
+            self.llm_client.dumps(compact_attempt(attempt, share)),
+            self.llm_client.dumps(compact_thought(thought, share)),
+        )
+
     async def _strategy_node(self, state: LearningSessionState) -> Dict[str, Any]:
         metadata = state.get("metadata") or {}
         if metadata.get("simulate_only"):
@@ -476,8 +1016,7 @@ class LangGraphOrchestrator:
         thought = state.get("thought_analysis", {})
 
         problem_text = problem.get("problem", "") if isinstance(problem, dict) else str(problem)
-        attempt_json = self.llm_client.dumps(attempt)
-        thought_json = self.llm_client.dumps(thought)
+        attempt_json, thought_json = self._compact_inputs(attempt, thought, "strategies")
 
         prompt = self.prompts.get_teaching_strategies_prompt(
             disability=disability,
@@ -487,9 +1026,11 @@ class LangGraphOrchestrator:
         )
 
         payload = await self.llm_client.invoke_with_prompt(
-            prompt=prompt,
-            model="gpt-4o-mini",
+            prompt=prompt["user"],
+            system=prompt["system"],
             temperature=0.4,
+            prompt_type="strategies",
+            schema=OUTPUT_SCHEMAS["strategies"],
         )
 
         if not isinstance(payload, dict):
@@ -512,8 +1053,7 @@ class LangGraphOrchestrator:
         thought = state.get("thought_analysis", {})
 
         problem_text = problem.get("problem", "") if isinstance(problem, dict) else str(problem)
-        attempt_json = self.llm_client.dumps(attempt)
-        thought_json = self.llm_client.dumps(thought)
+        attempt_json, thought_json = self._compact_inputs(attempt, thought, "tutor")
 
         prompt = self.prompts.get_tutor_session_prompt(
             disability=disability,
@@ -523,9 +1063,11 @@ class LangGraphOrchestrator:
         )
 
         payload = await self.llm_client.invoke_with_prompt(
-            prompt=prompt,
-            model="gpt-4o-mini",
+            prompt=prompt["user"],
+            system=prompt["system"],
             temperature=0.7,
+            prompt_type="tutor",
+            schema=OUTPUT_SCHEMAS["tutor"],
         )
 
         if not isinstance(payload, dict):
@@ -536,45 +1078,121 @@ class LangGraphOrchestrator:
     async def _consistency_node(self, state: LearningSessionState) -> Dict[str, Any]:
         if self._stop_after(state) in {"analysis", "strategies", "tutor"}:
             return {}
-        if state.get("consistency_report"):
-            return {}
-
         problem = state.get("problem", {})
         attempt = state.get("student_attempt")
         disability = state.get("disability", "Dyslexia")
+        expected_answer = str(problem.get("answer") or "") if isinstance(problem, dict) else ""
+
+        if state.get("consistency_report"):
+            await self._record_aggregate(state, state["consistency_report"], attempt, expected_answer)
+            return {}
 
         if not problem or not attempt:
             return {}
 
         problem_text = problem.get("problem", "") if isinstance(problem, dict) else str(problem)
-        expected_answer = str(problem.get("answer") or "") if isinstance(problem, dict) else ""
         normalized = normalize_attempt(self.llm_client.ensure_dict(attempt), expected_answer)
         report = validate_response_consistency(problem_text, disability, normalized, expected_answer)
+        await self._record_aggregate(state, report, normalized, expected_answer)
         return {"consistency_report": report, "student_attempt": normalized}
 
-    async def _adaptive_difficulty_node(self, state: LearningSessionState) -> Dict[str, Any]:
-        if self._stop_after(state) in {"analysis", "strategies", "tutor", "consistency"}:
-            return {}
-        history = state.get("student_history")
-        if not history or state.get("adaptive_plan"):
-            return {}
+    async def _record_aggregate(
+        self,
+        state: LearningSessionState,
+        report: Dict[str, Any],
+        attempt: Any,
+        expected_answer: str,
+    ) -> None:
+        """Fold this session's consistency report into the student's aggregates and the difficulty policy."""
+        metadata = state.get("metadata") or {}
+        student_id = metadata.get("student_id")
+        if student_id in (None, "") or not isinstance(report, dict):
+            return
+        is_correct = None
+        if expected_answer and isinstance(attempt, dict):
+            is_correct = is_correct_answer(attempt, expected_answer)
+        session = {"consistency_score": float(report.get("overall_consistency_score") or 0.0)}
+        if is_correct is not None:
+            session["is_correct"] = is_correct
+        difficulty = normalize_difficulty(state.get("difficulty", DEFAULT_DIFFICULTY))
+        if self._aggregates is not None:
+            applied = await self._aggregates.record_session(
+                str(student_id),
+                disability=state.get("disability", "Dyslexia"),
+                difficulty=difficulty,
+                consistency_score=session["consistency_score"],
+                is_correct=is_correct,
+                event_key=f"{metadata.get('thread_id', '')}:{_fingerprint(report)[:16]}",
+            )
+            if not applied:
+                return
+        adaptive_manager.observe(
+            str(student_id),
+            grade_level=normalize_grade_level(state.get("grade_level", DEFAULT_GRADE_LEVEL)),
+            difficulty=difficulty,
+            success=session_success(session),
+        )
 
-        current_difficulty = normalize_difficulty(state.get("difficulty", DEFAULT_DIFFICULTY))
+    def _adaptive_mode(self, state: LearningSessionState) -> str:
+        metadata = state.get("metadata") or {}
+        mode = str(metadata.get("adaptive_mode") or os.getenv("ADAPTIVE_MODE", "hybrid")).strip().lower()
+        return mode if mode in ADAPTIVE_MODES else "hybrid"
+
+    async def adaptive_narrative(self, history: Any, current_difficulty: str) -> Dict[str, Any]:
+        """LLM-written recommendations for a history, separate from the plan itself."""
         prompt = self.prompts.get_adaptive_difficulty_prompt(
-            history=history,
+            history=summarize_history(history),
             current_difficulty=current_difficulty,
         )
-
         payload = await self.llm_client.invoke_with_prompt(
-            prompt=prompt,
-            model="gpt-4o-mini",
+            prompt=prompt["user"],
+            system=prompt["system"],
             temperature=0.3,
+            prompt_type="adaptive",
+            schema=OUTPUT_SCHEMAS["adaptive"],
         )
-
         if not isinstance(payload, dict):
             raise HTTPException(status_code=500, detail="Adaptive difficulty returned invalid payload")
+        return payload
+
+    async def _adaptive_difficulty_node(self, state: LearningSessionState) -> Dict[str, Any]:
+        if self._stop_after(state) in {"analysis", "strategies", "tutor", "consistency"}:
+            return {}
+        if state.get("adaptive_plan"):
+            return {}
+        metadata = state.get("metadata") or {}
+        history = state.get("student_history")
+        aggregate = None
+        if not history:
+            # No uploaded history: fall back to the server-side running aggregate.
+            aggregate = await self.student_aggregate(metadata.get("student_id"))
+            if aggregate is None or not aggregate.sessions:
+                return {}
+        narrative_input = history or aggregate.to_dict()
+
+        current_difficulty = normalize_difficulty(state.get("difficulty", DEFAULT_DIFFICULTY))
+        mode = self._adaptive_mode(state)
+        if mode == "llm":
+            payload = await self.adaptive_narrative(narrative_input, current_difficulty)
+            self._record_cache(state, "adaptive")
+            return {"adaptive_plan": payload}
+
+        plan = adaptive_manager.recommend(
+            history or [],
+            current_difficulty,
+            grade_level=normalize_grade_level(state.get("grade_level", DEFAULT_GRADE_LEVEL)),
+            student_id=metadata.get("student_id"),
+            aggregate=aggregate,
+        )
+        wants_narrative = bool(metadata.get("adaptive_narrative"))
+        if mode == "local" or (plan["confidence"] >= ADAPTIVE_LLM_CONFIDENCE and not wants_narrative):
+            plan["source"] = "deterministic" if history else "aggregate"
+            return {"adaptive_plan": plan}
+
+        plan["narrative"] = await self.adaptive_narrative(narrative_input, current_difficulty)
+        plan["source"] = "hybrid"
         self._record_cache(state, "adaptive")
-        return {"adaptive_plan": payload}
+        return {"adaptive_plan": plan}
 
     async def _identify_disability_node(self, state: LearningSessionState) -> Dict[str, Any]:
         if self._stop_after(state) in {"analysis", "strategies", "tutor", "consistency", "adaptive"}:
@@ -595,8 +1213,10 @@ class LangGraphOrchestrator:
 
         payload = await self.llm_client.invoke_with_prompt(
             prompt=prompt,
-            model="gpt-4o-mini",
             temperature=0.2,
+            semantic=SemanticKey("identify", problem_text, str(student_response)),
+            prompt_type="identify",
+            schema=OUTPUT_SCHEMAS["identify"],
         )
 
         if not isinstance(payload, dict):
@@ -0,0 +1,308 @@
+"""Per-node JSON output schemas, validated while the completion streams.
+
+Each workflow node declares the shape of the JSON it expects (a small subset
+of JSON Schema: ``type``, ``required``, ``properties`` and ``items``). The
+schema is sent to the provider as a structured-output hint where supported,
+and :class:`StreamingSchemaCheck` follows the streamed text with a tiny
+top-level scanner: as soon as the reply stops being a JSON object, or a
+declared field starts with a value of the wrong type (``"steps_to_solve":
+"..."`` instead of a list), the stream is aborted with :class:`SchemaViolation`
+and the caller can retry at once instead of paying for the rest of a reply
+that would be thrown away. Missing required fields are caught when the
+stream ends.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+JSONSchema = Dict[str, Any]
+
+_TEXT = ["string", "number"]
+
+OUTPUT_SCHEMAS: Dict[str, JSONSchema] = {
+    "problem": {
+        "type": "object",
+        "required": ["problem", "answer", "solution"],
+        "properties": {
+            "problem": {"type": "string"},
+            "answer": {"type": _TEXT},
+            "solution": {"type": ["string", "array"]},
+            "concepts": {"type": "array"},
+        },
+    },
+    "attempt": {
+        "type": "object",
+        "required": ["thoughtprocess", "steps_to_solve", "final_answer"],
+        "properties": {
+            "studentAnswer": {"type": _TEXT},
+            "thoughtprocess": {"type": "string"},
+            "steps_to_solve": {"type": "array", "items": {"type": "string"}},
+            "final_answer": {"type": _TEXT},
+            "disability_impact": {"type": "string"},
+            "is_final_answer_intentionally_incorrect": {"type": "boolean"},
+            "error_pattern": {"type": "string"},
+        },
+    },
+    "thought": {
+        "type": "object",
+        "required": ["cognitive_patterns", "error_analysis"],
+    },
+    "strategies": {
+        "type": "object",
+        "required": ["primary_strategies"],
+        "properties": {
+            "primary_strategies": {"type": "array", "items": {"type": "object"}},
+            "alternative_approaches": {"type": "array"},
+            "scaffolding_sequence": {"type": "array"},
+        },
+    },
+    "tutor": {
+        "type": "object",
+        "required": ["conversation"],
+        "properties": {
+            "conversation": {"type": "array", "items": {"type": "object"}},
+            "test_question": {"type": "object"},
+            "session_summary": {"type": "object"},
+        },
+    },
+    "identify": {
+        "type": "object",
+        "required": ["potential_disabilities", "primary_concern"],
+        "properties": {
+            "potential_disabilities": {"type": "array", "items": {"type": "object"}},
+            "primary_concern": {"type": "string"},
+        },
+    },
+    "adaptive": {
+        "type": "object",
+        "required": ["recommended_difficulty"],
+        "properties": {"recommended_difficulty": {"type": "string"}},
+    },
+}
+
+
+class SchemaViolation(ValueError):
+    """A completion that does not match its node's schema; ``early`` when caught mid-stream."""
+
+    def __init__(self, message: str, *, early: bool = False, received_chars: int = 0) -> None:
+        super().__init__(message)
+        self.early = early
+        self.received_chars = received_chars
+
+
+def output_schema(prompt_type: str) -> Optional[JSONSchema]:
+    return OUTPUT_SCHEMAS.get(prompt_type)
+
+
+def response_format(prompt_type: str, schema: JSONSchema) -> Dict[str, Any]:
+    """OpenAI structured-output request for ``schema`` (non-strict, so optional fields stay optional)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": f"{prompt_type}_output", "schema": schema, "strict": False},
+    }
+
+
+def _allowed(schema: JSONSchema) -> Sequence[str]:
+    declared: Union[str, Sequence[str], None] = schema.get("type")
+    if declared is None:
+        return ()
+    return (declared,) if isinstance(declared, str) else tuple(declared)
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _type_ok(found: str, allowed: Sequence[str]) -> bool:
+    return not allowed or found in allowed or (found == "number" and "integer" in allowed)
+
+
+def schema_errors(value: Any, schema: JSONSchema, path: str = "$") -> List[str]:
+    """Violations of ``schema`` by a parsed value (empty when it conforms)."""
+    found = _json_type(value)
+    if not _type_ok(found, _allowed(schema)):
+        return [f"{path}: expected {'/'.join(_allowed(schema))}, got {found}"]
+    errors: List[str] = []
+    if isinstance(value, dict):
+        missing = [key for key in schema.get("required", ()) if value.get(key) in (None, "")]
+        errors.extend(f"{path}.{key}: required" for key in missing)
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value and value[key] is not None:
+                errors.extend(schema_errors(value[key], subschema, f"{path}.{key}"))
+    elif isinstance(value, list) and "items" in schema:
+        for index, item in enumerate(value):
+            errors.extend(schema_errors(item, schema["items"], f"{path}[{index}]"))
+    return errors
+
+
+def validate_output(value: Any, schema: Optional[JSONSchema]) -> Any:
+    if schema is not None:
+        errors = schema_errors(value, schema)
+        if errors:
+            raise SchemaViolation("; ".join(errors[:5]))
+    return value
+
+
+_FIRST_CHAR_TYPES = {"{": "object", "[": "array", '"': "string", "t": "boolean", "f": "boolean", "n": "null"}
+
+
+class StreamingSchemaCheck:
+    """Follows streamed JSON text and raises :class:`SchemaViolation` at the first detectable break.
+
+    Only the top level is tracked: the object start, each key, and the first
+    character of each value (which fixes its JSON type). Nested content is
+    skipped by depth and string counting, so feeding costs O(chunk).
+    """
+
+    def __init__(self, schema: JSONSchema) -> None:
+        self.schema = schema
+        self.properties: Dict[str, JSONSchema] = schema.get("properties", {})
+        self.received = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._mode = "start"  # start -> key -> colon -> value -> in_value -> (key | done)
+        self._key: List[str] = []
+        self._current_key = ""
+
+    def _fail(self, message: str) -> None:
+        raise SchemaViolation(message, early=True, received_chars=self.received)
+
+    def feed(self, chunk: str) -> None:
+        for char in chunk:
+            self.received += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._mode == "key":
+                        self._current_key = "".join(self._key)
+                        self._mode = "colon"
+                elif self._mode == "key":
+                    self._key.append(char)
+                continue
+
+            if char.isspace():
+                continue
+            if self._mode == "start":
+                if char != "{":
+                    self._fail("response is not a JSON object")
+                self._depth, self._mode = 1, "key"
+            elif self._mode == "key":
+                if char == '"':
+                    self._in_string, self._key = True, []
+                elif char == "}":
+                    self._mode, self._depth = "done", 0
+            elif self._mode == "colon":
+                if char == ":":
+                    self._mode = "value"
+            elif self._mode == "value":
+                self._check_value_type(char)
+                self._mode = "in_value"
+                self._enter(char)
+            elif self._mode == "in_value":
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._mode = "done"
+                elif char == "," and self._depth == 1:
+                    self._mode = "key"
+
+    def _enter(self, char: str) -> None:
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+
+    def _check_value_type(self, char: str) -> None:
+        subschema = self.properties.get(self._current_key)
+        if subschema is None:
+            return
+        found = _FIRST_CHAR_TYPES.get(char, "number" if char == "-" or char.isdigit() else "invalid")
+        if found == "null" and self._current_key not in self.schema.get("required", ()):
+            return
+        if not _type_ok(found, _allowed(subschema)):
+            self._fail(f"$.{self._current_key}: expected {'/'.join(_allowed(subschema))}, got {found}")
+
+    def finish(self, text: str) -> Any:
+        """Parse and fully validate the complete text."""
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise SchemaViolation(f"invalid JSON: {exc}", received_chars=self.received) from exc
+        errors = schema_errors(value, self.schema)
+        if errors:
+            raise SchemaViolation("; ".join(errors[:5]), received_chars=self.received)
+        return value
+
+
+@dataclass
+class _NodeSchemaStats:
+    validated: int = 0
+    violations: int = 0
+    early_aborts: int = 0
+    aborted_chars: int = 0
+    retries: int = 0
+
+
+class SchemaStats:
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _NodeSchemaStats] = {}
+
+    def _node(self, prompt_type: str) -> _NodeSchemaStats:
+        return self._nodes.setdefault(prompt_type, _NodeSchemaStats())
+
+    def record_valid(self, prompt_type: str) -> None:
+        self._node(prompt_type).validated += 1
+
+    def record_violation(self, prompt_type: str, exc: SchemaViolation, *, retried: bool) -> None:
+        node = self._node(prompt_type)
+        node.violations += 1
+        if exc.early:
+            node.early_aborts += 1
+            node.aborted_chars += exc.received_chars
+        if retried:
+            node.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: vars(node).copy() for name, node in sorted(self._nodes.items())}
+
+
+schema_stats = SchemaStats()
+
+
+def get_schema_stats() -> Dict[str, Any]:
+    return schema_stats.stats()
+
+
+__all__ = [
+    "OUTPUT_SCHEMAS",
+    "SchemaStats",
+    "SchemaViolation",
+    "StreamingSchemaCheck",
+    "get_schema_stats",
+    "output_schema",
+    "response_format",
+    "schema_errors",
+    "schema_stats",
+    "validate_output",
+]
@@ -0,0 +1,251 @@
+"""Token counting and input compaction for long-context workflow prompts.
+
+The analysis, strategy, tutor and adaptive nodes used to embed whole payloads:
+the full student attempt and thought analysis as JSON, and the raw
+``student_history`` list. This module shrinks those inputs before they are
+formatted into a prompt:
+
+* attempts and analyses keep only the fields the downstream prompt reads,
+  with long strings and lists clipped;
+* histories become summary statistics (counts, accuracy, consistency, trend,
+  recent scores and the most common error patterns);
+* each node's variable input is held to a token budget
+  (``PROMPT_TOKEN_BUDGETS``) by tightening the clip length until it fits.
+
+Tokens are counted with ``tiktoken`` when it is installed and estimated at
+four characters per token otherwise. :class:`PromptTokenStats` keeps
+per-node estimates alongside the provider's reported prompt and cached
+tokens, so the effect of prefix caching is visible in ``/llm-stats``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+DEFAULT_BUDGETS: Dict[str, int] = {
+    "thought": 700,
+    "strategies": 1100,
+    "tutor": 1100,
+    "adaptive": 400,
+}
+DEFAULT_FIELD_CHARS = 1200
+MIN_FIELD_CHARS = 120
+MAX_LIST_ITEMS = 8
+RECENT_SCORES = 5
+TOP_ERROR_PATTERNS = 3
+
+ATTEMPT_FIELDS = (
+    "thoughtprocess",
+    "steps_to_solve",
+    "final_answer",
+    "studentAnswer",
+    "disability_impact",
+    "error_pattern",
+)
+THOUGHT_FIELDS = (
+    "cognitive_patterns",
+    "error_analysis",
+    "disability_impact",
+    "strengths",
+    "growth_areas",
+    "emotional_indicators",
+    "recommendations",
+)
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(os.getenv("PROMPT_TOKEN_ENCODING", DEFAULT_ENCODING))
+    except Exception as exc:  # unknown encoding name or missing BPE file offline
+        logger.warning("tiktoken encoding unavailable, estimating tokens: %s", exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: Iterable[Dict[str, str]]) -> int:
+    return sum(count_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        try:
+            if name.strip() and value.strip():
+                budgets[name.strip()] = int(value)
+        except ValueError:
+            logger.warning("Ignoring invalid prompt token budget entry: %s", item)
+    return budgets
+
+
+PROMPT_TOKEN_BUDGETS = _parse_budgets(os.getenv("PROMPT_TOKEN_BUDGETS", ""))
+
+
+def _clip(value: Any, max_chars: int) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[: max_chars - 1].rstrip() + "…"
+    if isinstance(value, (list, tuple)):
+        return [_clip(item, max_chars) for item in list(value)[:MAX_LIST_ITEMS]]
+    if isinstance(value, dict):
+        return {key: _clip(item, max_chars) for key, item in value.items()}
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def compact_fields(payload: Any, fields: Sequence[str], budget: Optional[int] = None) -> Any:
+    """Keep ``fields`` of a dict payload, clipping values until the JSON fits ``budget`` tokens."""
+    if not isinstance(payload, dict):
+        return payload
+    kept = {key: payload[key] for key in fields if payload.get(key) not in (None, "", [], {})}
+    if not kept:
+        # Unknown shape: better to pass it through clipped than to drop everything.
+        kept = dict(payload)
+    max_chars = DEFAULT_FIELD_CHARS
+    compacted = _clip(kept, max_chars)
+    while budget and max_chars > MIN_FIELD_CHARS and count_tokens(_dumps(compacted)) > budget:
+        max_chars //= 2
+        compacted = _clip(kept, max_chars)
+    return compacted
+
+
+def compact_attempt(attempt: Any, budget: Optional[int] = None) -> Any:
+    return compact_fields(attempt, ATTEMPT_FIELDS, budget)
+
+
+def compact_thought(thought: Any, budget: Optional[int] = None) -> Any:
+    return compact_fields(thought, THOUGHT_FIELDS, budget)
+
+
+def summarize_history(history: Any) -> Any:
+    """Summary statistics of a session history list; other shapes are returned unchanged."""
+    if not isinstance(history, list):
+        return history
+    sessions = [entry for entry in history if isinstance(entry, dict)]
+    scores = [
+        float(entry["consistency_score"])
+        for entry in sessions
+        if isinstance(entry.get("consistency_score"), (int, float))
+    ]
+    graded = [bool(entry["is_correct"]) for entry in sessions if "is_correct" in entry]
+    summary: Dict[str, Any] = {"sessions": len(sessions)}
+    if graded:
+        summary["accuracy"] = round(sum(graded) / len(graded), 3)
+    if scores:
+        summary["mean_consistency"] = round(sum(scores) / len(scores), 3)
+        summary["recent_consistency"] = [round(score, 2) for score in scores[-RECENT_SCORES:]]
+        if len(scores) >= 4:
+            half = len(scores) // 2
+            delta = sum(scores[half:]) / (len(scores) - half) - sum(scores[:half]) / half
+            summary["trend"] = "improving" if delta > 0.1 else "declining" if delta < -0.1 else "stable"
+    difficulties = Counter(str(entry["difficulty"]) for entry in sessions if entry.get("difficulty"))
+    if difficulties:
+        summary["difficulties"] = dict(difficulties)
+    patterns = Counter(
+        str(entry.get("error_pattern") or entry.get("error_type"))
+        for entry in sessions
+        if entry.get("error_pattern") or entry.get("error_type")
+    )
+    if patterns:
+        summary["common_error_patterns"] = [name for name, _ in patterns.most_common(TOP_ERROR_PATTERNS)]
+    return summary
+
+
+@dataclass
+class _NodeTokens:
+    calls: int = 0
+    estimated: int = 0
+    max_estimated: int = 0
+    reported_calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+
+class PromptTokenStats:
+    """Per-node prompt sizes: local estimates plus provider-reported usage."""
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _NodeTokens] = {}
+
+    def record_estimate(self, prompt_type: str, tokens: int) -> None:
+        node = self._nodes.setdefault(prompt_type, _NodeTokens())
+        node.calls += 1
+        node.estimated += tokens
+        node.max_estimated = max(node.max_estimated, tokens)
+
+    def record_usage(self, prompt_type: str, usage: Any) -> None:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            return
+        node = self._nodes.setdefault(prompt_type, _NodeTokens())
+        node.reported_calls += 1
+        node.prompt_tokens += prompt_tokens
+        cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+        if isinstance(cached, int):
+            node.cached_tokens += cached
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"tokenizer": "tiktoken" if _encoding() is not None else "estimate", "nodes": {}}
+        for name, node in sorted(self._nodes.items()):
+            entry: Dict[str, Any] = {
+                "calls": node.calls,
+                "avg_estimated": round(node.estimated / node.calls, 1) if node.calls else 0.0,
+                "max_estimated": node.max_estimated,
+                "budget": PROMPT_TOKEN_BUDGETS.get(name),
+            }
+            if node.reported_calls:
+                entry["avg_prompt_tokens"] = round(node.prompt_tokens / node.reported_calls, 1)
+                entry["cached_ratio"] = round(node.cached_tokens / node.prompt_tokens, 3) if node.prompt_tokens else 0.0
+            result["nodes"][name] = entry
+        return result
+
+
+prompt_token_stats = PromptTokenStats()
+
+
+def budget_for(prompt_type: str) -> Optional[int]:
+    return PROMPT_TOKEN_BUDGETS.get(prompt_type)
+
+
+def get_prompt_token_stats() -> Dict[str, Any]:
+    return prompt_token_stats.stats()
+
+
+__all__ = [
+    "ATTEMPT_FIELDS",
+    "PromptTokenStats",
+    "THOUGHT_FIELDS",
+    "budget_for",
+    "compact_attempt",
+    "compact_fields",
+    "compact_thought",
+    "count_message_tokens",
+    "count_tokens",
+    "get_prompt_token_stats",
+    "prompt_token_stats",
+    "summarize_history",
+]
@@ -13,6 +13,176 @@ from app.services.grade_registry import (
 )
 
 
+# Static instruction blocks sent as the system message. They contain no per-call
+# values, so every request for a node starts with the same bytes and providers can
+# reuse their cached prefix; the problem, attempt and analysis follow in the user message.
+THOUGHT_ANALYSIS_SYSTEM = """
+You are an expert educational psychologist specializing in learning disabilities and mathematical cognition. Your task is to analyze a student's attempt at solving a math problem and provide insights into their thinking process. The user message gives the problem, the student's attempt and the disability context.
+
+Analyze the student's approach and provide insights on:
+
+1. **Cognitive Patterns**: What thinking patterns do you observe?
+2. **Error Analysis**: What specific errors were made and why?
+3. **Disability Impact**: How did the disability specifically influence their approach?
+4. **Strengths**: What did the student do well or show understanding of?
+5. **Areas for Growth**: What concepts need reinforcement?
+6. **Emotional State**: What emotions might the student be experiencing?
+
+Format as JSON:
+{
+  "cognitive_patterns": "Analysis of thinking approach",
+  "error_analysis": "Detailed breakdown of mistakes",
+  "disability_impact": "How the disability affected performance",
+  "strengths": "What the student did well",
+  "growth_areas": "Concepts needing work",
+  "emotional_indicators": "Inferred emotional state",
+  "confidence_level": "low/medium/high",
+  "recommendations": "Specific next steps for support"
+}
+"""
+
+TEACHING_STRATEGIES_SYSTEM = """
+You are a master teacher and learning disability specialist. Create targeted teaching strategies based on the student's attempt and analysis. The user message gives the disability, the problem, the student's attempt and the thought analysis.
+
+Develop comprehensive teaching strategies that:
+
+1. **Address Specific Challenges**: Target the exact difficulties shown
+2. **Leverage Strengths**: Build on what the student does well
+3. **Use Evidence-Based Methods**: Apply proven techniques for the student's disability
+4. **Provide Multiple Pathways**: Offer different ways to understand the concept
+5. **Include Scaffolding**: Break down complex concepts into manageable steps
+6. **Consider Emotional Support**: Address confidence and motivation
+
+Format as JSON:
+{
+  "primary_strategies": [
+    {
+      "name": "Strategy name",
+      "description": "How to implement",
+      "rationale": "Why this works for the student's disability",
+      "implementation": "Step-by-step instructions"
+    }
+  ],
+  "alternative_approaches": [
+    {
+      "name": "Alternative method",
+      "description": "Different way to teach the concept",
+      "when_to_use": "When primary strategies don't work"
+    }
+  ],
+  "scaffolding_sequence": [
+    "Step 1: Start with...",
+    "Step 2: Then introduce...",
+    "Step 3: Gradually add..."
+  ],
+  "accommodations": [
+    "Specific accommodations for the student's disability",
+    "Tools or resources needed"
+  ],
+  "assessment_methods": [
+    "How to check understanding",
+    "Alternative ways to demonstrate learning"
+  ]
+}
+"""
+
+TUTOR_SESSION_SYSTEM = """
+You are an experienced, patient, and skilled tutor who specializes in working with students with learning disabilities. You have deep expertise in evidence-based teaching methods and understand how to support students with learning differences. The user message gives the student's disability, the problem, the student's approach and the teacher analysis.
+
+Create a realistic 10-12 exchange tutoring conversation that:
+
+1. **Builds Rapport**: Start with understanding and empathy
+2. **Addresses Challenges**: Gently work through specific difficulties
+3. **Uses Scaffolding**: Guide step-by-step without giving answers
+4. **Provides Multiple Perspectives**: Offer different ways to understand
+5. **Checks Understanding**: Regularly assess comprehension
+6. **Maintains Encouragement**: Keep the student motivated and confident
+7. **Adapts to Disability**: Use techniques specific to the student's disability
+
+The student's responses should be realistic - showing initial confusion, gradual understanding, and occasional setbacks, but overall progress with guidance.
+
+**Emotion and tone labels (required on every turn):**
+- Every Tutor turn MUST include a "tone" field: a short lowercase label from encouraging, empathetic, patient, celebratory, reassuring, curious, supportive
+- Every Student turn MUST include an "emotion" field: a short lowercase label from frustrated, confused, anxious, discouraged, curious, hesitant, hopeful, relieved, proud, engaged
+- Labels must match what the dialogue conveys (e.g. student says "I'm feeling frustrated" → emotion: "frustrated"; tutor responds warmly → tone: "encouraging")
+
+Format as JSON:
+{
+  "conversation": [
+    {
+      "speaker": "Tutor",
+      "text": "Tutor's message",
+      "tone": "encouraging",
+      "strategy": "Teaching strategy being used",
+      "purpose": "Why this approach"
+    },
+    {
+      "speaker": "Student", 
+      "text": "Student's response",
+      "emotion": "frustrated",
+      "understanding_level": "low/medium/high"
+    }
+  ],
+  "test_question": {
+    "question": "Follow-up question to check understanding",
+    "expected_answer": "Correct answer",
+    "context": "Same real-world context as original problem"
+  },
+  "session_summary": {
+    "key_breakthroughs": "What the student learned",
+    "remaining_challenges": "What still needs work",
+    "next_steps": "Recommended follow-up"
+  }
+}
+"""
+
+ADAPTIVE_DIFFICULTY_SYSTEM = """
+You are an expert educational data analyst specializing in adaptive learning systems. Analyze the student's learning history to recommend appropriate difficulty adjustments. The user message gives summary statistics of the history and the current difficulty.
+
+Analyze patterns in:
+
+1. **Performance Trends**: How has the student's performance changed over time?
+2. **Error Patterns**: What types of errors are most common?
+3. **Learning Velocity**: How quickly does the student master new concepts?
+4. **Engagement Levels**: What difficulty levels maintain optimal engagement?
+5. **Struggle Points**: Where does the student consistently struggle?
+
+Recommend adjustments that:
+
+- Maintain appropriate challenge level
+- Build on strengths
+- Address persistent difficulties
+- Keep the student engaged and motivated
+- Follow evidence-based progression patterns
+
+Format as JSON:
+{
+  "recommended_difficulty": "easy/medium/hard",
+  "confidence_level": 0.0-1.0,
+  "analysis": {
+    "performance_trend": "improving/stable/declining",
+    "mastery_level": "beginner/intermediate/advanced",
+    "error_frequency": "high/medium/low",
+    "engagement_indicators": "high/medium/low"
+  },
+  "reasoning": {
+    "strengths_observed": "What the student does well",
+    "challenges_identified": "Areas needing support",
+    "learning_patterns": "How the student learns best"
+  },
+  "recommendations": {
+    "immediate_adjustments": "Changes to make now",
+    "gradual_progression": "How to advance over time",
+    "monitoring_points": "What to watch for"
+  },
+  "alternative_paths": [
+    "Different learning approaches to try",
+    "Alternative difficulty progressions"
+  ]
+}
+"""
+
+
 class WorkflowPrompts:
     """Centralized prompt templates for all workflow nodes."""
     
@@ -142,145 +312,44 @@ Instructions:
         }
 
     @staticmethod
-    def get_thought_analysis_prompt(disability: str, problem: str, attempt_json: str) -> str:
-        """Generate prompt for analyzing student thought processes."""
-        return f"""
-You are an expert educational psychologist specializing in learning disabilities and mathematical cognition. Your task is to analyze a student's attempt at solving a math problem and provide insights into their thinking process.
-
+    def get_thought_analysis_prompt(disability: str, problem: str, attempt_json: str) -> Dict[str, str]:
+        """Generate prompts for analyzing student thought processes (static system, per-call user)."""
+        return {
+            "system": THOUGHT_ANALYSIS_SYSTEM,
+            "user": f"""
 Problem: {problem}
 Student's attempt: {attempt_json}
 Disability context: {disability}
-
-Analyze the student's approach and provide insights on:
-
-1. **Cognitive Patterns**: What thinking patterns do you observe?
-2. **Error Analysis**: What specific errors were made and why?
-3. **Disability Impact**: How did {disability} specifically influence their approach?
-4. **Strengths**: What did the student do well or show understanding of?
-5. **Areas for Growth**: What concepts need reinforcement?
-6. **Emotional State**: What emotions might the student be experiencing?
-
-Format as JSON:
-{{
-  "cognitive_patterns": "Analysis of thinking approach",
-  "error_analysis": "Detailed breakdown of mistakes",
-  "disability_impact": "How {disability} affected performance",
-  "strengths": "What the student did well",
-  "growth_areas": "Concepts needing work",
-  "emotional_indicators": "Inferred emotional state",
-  "confidence_level": "low/medium/high",
-  "recommendations": "Specific next steps for support"
-}}
-"""
+""",
+        }
 
     @staticmethod
-    def get_teaching_strategies_prompt(disability: str, problem: str, attempt_json: str, thought_json: str) -> str:
-        """Generate prompt for creating teaching strategies."""
-        return f"""
-You are a master teacher and learning disability specialist with expertise in {disability}. Create targeted teaching strategies based on the student's attempt and analysis.
-
+    def get_teaching_strategies_prompt(
+        disability: str, problem: str, attempt_json: str, thought_json: str
+    ) -> Dict[str, str]:
+        """Generate prompts for creating teaching strategies (static system, per-call user)."""
+        return {
+            "system": TEACHING_STRATEGIES_SYSTEM,
+            "user": f"""
+Disability: {disability}
 Problem: {problem}
 Student's attempt: {attempt_json}
 Thought analysis: {thought_json}
-
-Develop comprehensive teaching strategies that:
-
-1. **Address Specific Challenges**: Target the exact difficulties shown
-2. **Leverage Strengths**: Build on what the student does well
-3. **Use Evidence-Based Methods**: Apply proven techniques for {disability}
-4. **Provide Multiple Pathways**: Offer different ways to understand the concept
-5. **Include Scaffolding**: Break down complex concepts into manageable steps
-6. **Consider Emotional Support**: Address confidence and motivation
-
-Format as JSON:
-{{
-  "primary_strategies": [
-    {{
-      "name": "Strategy name",
-      "description": "How to implement",
-      "rationale": "Why this works for {disability}",
-      "implementation": "Step-by-step instructions"
-    }}
-  ],
-  "alternative_approaches": [
-    {{
-      "name": "Alternative method",
-      "description": "Different way to teach the concept",
-      "when_to_use": "When primary strategies don't work"
-    }}
-  ],
-  "scaffolding_sequence": [
-    "Step 1: Start with...",
-    "Step 2: Then introduce...",
-    "Step 3: Gradually add..."
-  ],
-  "accommodations": [
-    "Specific accommodations for {disability}",
-    "Tools or resources needed"
-  ],
-  "assessment_methods": [
-    "How to check understanding",
-    "Alternative ways to demonstrate learning"
-  ]
-}}
-"""
+""",
+        }
 
     @staticmethod
-    def get_tutor_session_prompt(disability: str, problem: str, attempt_json: str, thought_json: str) -> str:
-        """Generate prompt for creating tutor conversation."""
-        return f"""
-You are an experienced, patient, and skilled tutor who specializes in working with students with {disability}. You have deep expertise in evidence-based teaching methods and understand how to support students with learning differences.
-
+    def get_tutor_session_prompt(disability: str, problem: str, attempt_json: str, thought_json: str) -> Dict[str, str]:
+        """Generate prompts for creating tutor conversation (static system, per-call user)."""
+        return {
+            "system": TUTOR_SESSION_SYSTEM,
+            "user": f"""
+Student's disability: {disability}
 Problem: {problem}
 Student's approach: {attempt_json}
 Teacher analysis: {thought_json}
-
-Create a realistic 10-12 exchange tutoring conversation that:
-
-1. **Builds Rapport**: Start with understanding and empathy
-2. **Addresses Challenges**: Gently work through specific difficulties
-3. **Uses Scaffolding**: Guide step-by-step without giving answers
-4. **Provides Multiple Perspectives**: Offer different ways to understand
-5. **Checks Understanding**: Regularly assess comprehension
-6. **Maintains Encouragement**: Keep the student motivated and confident
-7. **Adapts to Disability**: Use techniques specific to {disability}
-
-The student's responses should be realistic - showing initial confusion, gradual understanding, and occasional setbacks, but overall progress with guidance.
-
-**Emotion and tone labels (required on every turn):**
-- Every Tutor turn MUST include a "tone" field: a short lowercase label from encouraging, empathetic, patient, celebratory, reassuring, curious, supportive
-- Every Student turn MUST include an "emotion" field: a short lowercase label from frustrated, confused, anxious, discouraged, curious, hesitant, hopeful, relieved, proud, engaged
-- Labels must match what the dialogue conveys (e.g. student says "I'm feeling frustrated" → emotion: "frustrated"; tutor responds warmly → tone: "encouraging")
-
-Format as JSON:
-{{
-  "conversation": [
-    {{
-      "speaker": "Tutor",
-      "text": "Tutor's message",
-      "tone": "encouraging",
-      "strategy": "Teaching strategy being used",
-      "purpose": "Why this approach"
-    }},
-    {{
-      "speaker": "Student", 
-      "text": "Student's response",
-      "emotion": "frustrated",
-      "understanding_level": "low/medium/high"
-    }}
-  ],
-  "test_question": {{
-    "question": "Follow-up question to check understanding",
-    "expected_answer": "Correct answer",
-    "context": "Same real-world context as original problem"
-  }},
-  "session_summary": {{
-    "key_breakthroughs": "What the student learned",
-    "remaining_challenges": "What still needs work",
-    "next_steps": "Recommended follow-up"
-  }}
-}}
-"""
+""",
+        }
 
     @staticmethod
     def get_consistency_validation_prompt(problem: str, disability: str, attempt_json: str, expected_answer: str) -> str:
@@ -329,56 +398,17 @@ Format as JSON:
 """
 
     @staticmethod
-    def get_adaptive_difficulty_prompt(history: list, current_difficulty: str) -> str:
-        """Generate prompt for adaptive difficulty adjustment."""
-        return f"""
-You are an expert educational data analyst specializing in adaptive learning systems. Analyze the student's learning history to recommend appropriate difficulty adjustments.
-
+    def get_adaptive_difficulty_prompt(history: Any, current_difficulty: str) -> Dict[str, str]:
+        """Generate prompts for adaptive difficulty adjustment from a history summary."""
+        if not isinstance(history, str):
+            history = json.dumps(history, ensure_ascii=False, separators=(",", ":"))
+        return {
+            "system": ADAPTIVE_DIFFICULTY_SYSTEM,
+            "user": f"""
 Student History: {history}
 Current Difficulty: {current_difficulty}
-
-Analyze patterns in:
-
-1. **Performance Trends**: How has the student's performance changed over time?
-2. **Error Patterns**: What types of errors are most common?
-3. **Learning Velocity**: How quickly does the student master new concepts?
-4. **Engagement Levels**: What difficulty levels maintain optimal engagement?
-5. **Struggle Points**: Where does the student consistently struggle?
-
-Recommend adjustments that:
-
-- Maintain appropriate challenge level
-- Build on strengths
-- Address persistent difficulties
-- Keep the student engaged and motivated
-- Follow evidence-based progression patterns
-
-Format as JSON:
-{{
-  "recommended_difficulty": "easy/medium/hard",
-  "confidence_level": 0.0-1.0,
-  "analysis": {{
-    "performance_trend": "improving/stable/declining",
-    "mastery_level": "beginner/intermediate/advanced",
-    "error_frequency": "high/medium/low",
-    "engagement_indicators": "high/medium/low"
-  }},
-  "reasoning": {{
-    "strengths_observed": "What the student does well",
-    "challenges_identified": "Areas needing support",
-    "learning_patterns": "How the student learns best"
-  }},
-  "recommendations": {{
-    "immediate_adjustments": "Changes to make now",
-    "gradual_progression": "How to advance over time",
-    "monitoring_points": "What to watch for"
-  }},
-  "alternative_paths": [
-    "Different learning approaches to try",
-    "Alternative difficulty progressions"
-  ]
-}}
-"""
+""",
+        }
 
     @staticmethod
     def get_disability_identification_prompt(problem: str, student_response: str) -> str:
@@ -0,0 +1,215 @@
+"""Pre-generated question pools served without repeats per user.
+
+A :class:`QuestionBank` keeps a pool of validated items for each key (for
+example ``(grade_level, difficulty)``). ``take`` hands out a random item the
+user has not seen yet in O(pool) time without calling the generator; each
+item is retired after ``max_uses`` servings. When a pool drops below
+``low_water`` a background task tops it back up to ``target_size`` with the
+generator, so request latency never includes generation unless the pool is
+empty or exhausted for that user. With ``auto_refill=False`` the pool only
+grows through ``add`` and explicit ``fill``/``warm`` calls.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGET_SIZE = 12
+DEFAULT_LOW_WATER = 4
+DEFAULT_MAX_USES = 25
+DEFAULT_REFILL_CONCURRENCY = 3
+DEFAULT_MAX_USERS = 4096
+
+Item = Dict[str, Any]
+Generator = Callable[[Hashable], Awaitable[Item]]
+Validator = Callable[[Item], bool]
+
+
+def item_fingerprint(item: Item, text_field: str = "problem") -> str:
+    text = " ".join(str(item.get(text_field, "")).casefold().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class _Entry:
+    item: Item
+    fingerprint: str
+    uses: int = 0
+
+
+@dataclass
+class QuestionBankStats:
+    hits: int = 0
+    misses: int = 0
+    generated: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    retired: int = 0
+    refills: int = 0
+    errors: int = 0
+
+
+class QuestionBank:
+    """Keyed pools of generated items with per-user no-repeat selection."""
+
+    def __init__(
+        self,
+        generate: Generator,
+        *,
+        validate: Optional[Validator] = None,
+        target_size: int = DEFAULT_TARGET_SIZE,
+        low_water: int = DEFAULT_LOW_WATER,
+        max_uses: int = DEFAULT_MAX_USES,
+        refill_concurrency: int = DEFAULT_REFILL_CONCURRENCY,
+        max_users: int = DEFAULT_MAX_USERS,
+        text_field: str = "problem",
+        rng: Optional[random.Random] = None,
+        auto_refill: bool = True,
+    ) -> None:
+        self._generate = generate
+        self._validate = validate
+        self.target_size = max(1, target_size)
+        self.low_water = max(0, min(low_water, self.target_size - 1))
+        self.max_uses = max(1, max_uses)
+        self.refill_concurrency = max(1, refill_concurrency)
+        self.max_users = max(1, max_users)
+        self.text_field = text_field
+        self.auto_refill = auto_refill
+        self.stats = QuestionBankStats()
+        self._rng = rng or random.Random()
+        self._pools: Dict[Hashable, List[_Entry]] = {}
+        self._seen: "OrderedDict[Hashable, Set[str]]" = OrderedDict()
+        self._refills: Dict[Hashable, asyncio.Task] = {}
+
+    def size(self, key: Hashable) -> int:
+        return len(self._pools.get(key, ()))
+
+    def has_room(self, key: Hashable) -> bool:
+        return self.size(key) < self.target_size
+
+    def _seen_by(self, user_id: Optional[Hashable]) -> Set[str]:
+        if user_id is None:
+            return set()
+        seen = self._seen.get(user_id)
+        if seen is None:
+            seen = self._seen[user_id] = set()
+            while len(self._seen) > self.max_users:
+                self._seen.popitem(last=False)
+        else:
+            self._seen.move_to_end(user_id)
+        return seen
+
+    def take(self, key: Hashable, user_id: Optional[Hashable] = None) -> Optional[Item]:
+        """Return an unseen item for ``user_id`` (a copy), or None; tops the pool up in the background."""
+        pool = self._pools.setdefault(key, [])
+        seen = self._seen_by(user_id)
+        candidates = [entry for entry in pool if entry.fingerprint not in seen]
+        if not candidates:
+            self.stats.misses += 1
+            if self.auto_refill:
+                self.schedule_refill(key)
+            return None
+
+        entry = self._rng.choice(candidates)
+        entry.uses += 1
+        if user_id is not None:
+            seen.add(entry.fingerprint)
+        if entry.uses >= self.max_uses:
+            pool.remove(entry)
+            self.stats.retired += 1
+        self.stats.hits += 1
+        if self.auto_refill and len(pool) <= self.low_water:
+            self.schedule_refill(key)
+        return dict(entry.item)
+
+    def add(self, key: Hashable, item: Item, *, seen_by: Optional[Hashable] = None) -> bool:
+        """Validate and pool an item; ``seen_by`` marks it as already served to that user."""
+        if not isinstance(item, dict) or not item.get(self.text_field):
+            self.stats.rejected += 1
+            return False
+        if self._validate is not None and not self._validate(item):
+            self.stats.rejected += 1
+            return False
+        fingerprint = item_fingerprint(item, self.text_field)
+        if seen_by is not None:
+            self._seen_by(seen_by).add(fingerprint)
+        pool = self._pools.setdefault(key, [])
+        if any(entry.fingerprint == fingerprint for entry in pool):
+            self.stats.duplicates += 1
+            return False
+        if len(pool) >= self.target_size:
+            return False
+        pool.append(_Entry(dict(item), fingerprint, uses=1 if seen_by is not None else 0))
+        return True
+
+    def schedule_refill(self, key: Hashable) -> Optional[asyncio.Task]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        task = self._refills.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return task
+        task = loop.create_task(self.fill(key))
+        self._refills[key] = task
+        return task
+
+    async def fill(self, key: Hashable) -> int:
+        """Generate until the pool for ``key`` reaches ``target_size``; returns items added."""
+        self.stats.refills += 1
+        semaphore = asyncio.Semaphore(self.refill_concurrency)
+
+        async def one() -> bool:
+            async with semaphore:
+                try:
+                    item = await self._generate(key)
+                except Exception as exc:
+                    self.stats.errors += 1
+                    logger.info("Question bank generation failed for %s: %s", key, exc)
+                    return False
+                self.stats.generated += 1
+                return self.add(key, item)
+
+        added = 0
+        # Duplicates and rejects leave gaps; stop after one round that adds nothing.
+        while self.size(key) < self.target_size:
+            results = await asyncio.gather(*(one() for _ in range(self.target_size - self.size(key))))
+            if not any(results):
+                break
+            added += sum(results)
+        return added
+
+    def warm(self, keys: Iterable[Hashable]) -> List[asyncio.Task]:
+        """Start background fills for ``keys`` without waiting for them."""
+        return [task for task in (self.schedule_refill(key) for key in keys) if task is not None]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats
+        return {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "generated": stats.generated,
+            "rejected": stats.rejected,
+            "duplicates": stats.duplicates,
+            "retired": stats.retired,
+            "refills": stats.refills,
+            "errors": stats.errors,
+            "pools": {str(key): len(pool) for key, pool in self._pools.items()},
+            "users_tracked": len(self._seen),
+        }
+
+    async def close(self) -> None:
+        tasks, self._refills = list(self._refills.values()), {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = ["QuestionBank", "QuestionBankStats", "item_fingerprint"]
@@ -0,0 +1,247 @@
+"""Near-duplicate lookup for prompts driven by free-text student responses.
+
+Exact cache keys treat "i got 42 because 6x7" and "I got 42, because 6 x 7" as
+different prompts. This index normalizes the free-text part of a prompt, builds
+a MinHash signature over character shingles and uses LSH banding to find a
+previously answered prompt whose text is similar enough. The numbers in the
+text must match exactly: "I got 42" and "I got 24" differ in precisely the digit
+reversal the analysis is looking for. The payload itself stays in the tiered
+cache; the index only maps text to an existing cache key.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE_SIZE = 4
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "identify": 0.85,
+    "thought": 0.9,
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_DIGIT_BOUNDARY_RE = re.compile(r"(?<=\d)(?=[^\d\s.,])|(?<=[^\d\s.,])(?=\d)")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_PUNCT_RE = re.compile(r"[^\w\s+\-*/=×%.]|(?<!\d)\.|\.(?!\d)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SemanticKey:
+    """Identify the fuzzy part of a prompt.
+
+    ``context`` must match exactly (problem text, grade, round...), while
+    ``text`` is the free-text student response compared by similarity.
+    """
+
+    prompt_type: str
+    context: str
+    text: str
+
+
+def _canonical_number(match: "re.Match[str]") -> str:
+    raw = match.group(0)
+    if "." not in raw:
+        return str(int(raw))
+    value = raw.rstrip("0").rstrip(".")
+    return value or "0"
+
+
+def normalize_free_text(text: str) -> str:
+    """Casefold, canonicalize numbers/operators and collapse whitespace."""
+    value = str(text or "").casefold()
+    value = _THOUSANDS_RE.sub("", value)
+    value = _DIGIT_BOUNDARY_RE.sub(" ", value)
+    value = _NUMBER_RE.sub(_canonical_number, value)
+    value = _PUNCT_RE.sub(" ", value)
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def numeric_tokens(text: str) -> Tuple[str, ...]:
+    """The canonical numbers of ``text`` in order; part of the exact-match key."""
+    return tuple(_NUMBER_RE.findall(normalize_free_text(text)))
+
+
+def _shingles(text: str, size: int) -> Set[str]:
+    if len(text) <= size:
+        return {text}
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _parse_thresholds(raw: str) -> Dict[str, float]:
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            thresholds[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return thresholds
+
+
+class SemanticCache:
+    """MinHash/LSH index from normalized free text to cached response keys."""
+
+    def __init__(
+        self,
+        *,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        thresholds: Optional[Dict[str, float]] = None,
+        default_threshold: float = DEFAULT_THRESHOLD,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = max(1, shingle_size)
+        self.max_entries = max(1, max_entries)
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self.default_threshold = default_threshold
+        rng = random.Random(1729)
+        self._perms: List[Tuple[int, int]] = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._entries: "OrderedDict[int, Tuple[Tuple[str, int, Tuple[int, ...]], ...]]" = OrderedDict()
+        self._signatures: Dict[int, Tuple[str, Tuple[int, ...], str]] = {}
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def threshold_for(self, prompt_type: str) -> float:
+        return self.thresholds.get(prompt_type, self.default_threshold)
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashed = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+            for s in _shingles(normalize_free_text(text), self.shingle_size)
+        ]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed) for a, b in self._perms
+        )
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        if not left or len(left) != len(right):
+            return 0.0
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+    @staticmethod
+    def _namespace(key: SemanticKey, scope: str) -> str:
+        numbers = " ".join(numeric_tokens(key.text))
+        digest = hashlib.sha256(f"{scope}\x00{key.context}\x00{numbers}".encode("utf-8")).hexdigest()[:24]
+        return f"{key.prompt_type}:{digest}"
+
+    def _band_keys(self, namespace: str, sig: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [(namespace, band, sig[band * self.rows : (band + 1) * self.rows]) for band in range(self.bands)]
+
+    def lookup(self, key: SemanticKey, *, scope: str = "") -> Optional[str]:
+        """Return the cache key of the most similar indexed prompt above threshold."""
+        self.lookups += 1
+        namespace = self._namespace(key, scope)
+        sig = self.signature(key.text)
+        candidates: Set[int] = set()
+        for band_key in self._band_keys(namespace, sig):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        threshold = self.threshold_for(key.prompt_type)
+        best_id: Optional[int] = None
+        best_score = 0.0
+        for entry_id in candidates:
+            _, other_sig, _ = self._signatures[entry_id]
+            score = self.similarity(sig, other_sig)
+            if score >= threshold and score > best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        return self._signatures[best_id][2]
+
+    def register(self, key: SemanticKey, cache_key: str, *, scope: str = "") -> None:
+        """Index ``key.text`` so similar future prompts resolve to ``cache_key``."""
+        namespace = self._namespace(key, scope)
+        sig = self.signature(key.text)
+        band_keys = tuple(self._band_keys(namespace, sig))
+
+        while len(self._entries) >= self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = band_keys
+        self._signatures[entry_id] = (namespace, sig, cache_key)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(entry_id)
+
+    def _evict(self, entry_id: int) -> None:
+        for band_key in self._entries.pop(entry_id, ()):
+            members = self._buckets.get(band_key)
+            if members is None:
+                continue
+            members.discard(entry_id)
+            if not members:
+                self._buckets.pop(band_key, None)
+        self._signatures.pop(entry_id, None)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "thresholds": dict(self.thresholds),
+        }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def semantic_cache_enabled() -> bool:
+    flag = os.getenv("SEMANTIC_CACHE_ENABLED", "false").strip().lower()
+    return flag in {"1", "true", "yes", "on"}
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the process-wide semantic index, or None when the feature is off."""
+    global _semantic_cache
+    if not semantic_cache_enabled():
+        return None
+    if _semantic_cache is None:
+        try:
+            max_entries = int(os.getenv("SEMANTIC_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES)))
+        except ValueError:
+            max_entries = DEFAULT_MAX_ENTRIES
+        _semantic_cache = SemanticCache(
+            max_entries=max_entries,
+            thresholds=_parse_thresholds(os.getenv("SEMANTIC_CACHE_THRESHOLDS", "")),
+        )
+    return _semantic_cache
+
+
+__all__ = [
+    "SemanticCache",
+    "SemanticKey",
+    "get_semantic_cache",
+    "normalize_free_text",
+    "numeric_tokens",
+    "semantic_cache_enabled",
+]
@@ -0,0 +1,178 @@
+"""Speculative candidates: start several generations at once, keep the first acceptable one.
+
+Some nodes retry an LLM call in series until a local check passes: attempt
+simulation re-runs until the consistency score clears its threshold, and
+problem generation re-runs until the answer matches the worked solution.
+Each retry is a full round trip. :func:`race` instead starts ``K``
+candidates concurrently (typically one per temperature) and returns as soon
+as one passes the caller's ``accept`` check.
+
+The remaining candidates are cancelled. If the caller can use them, it passes
+``on_late`` instead; they are left to finish in the background and each
+result is handed over when it arrives. This costs some extra tokens and
+removes the latency of retrying one call after another.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Sequence, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class Candidate(Generic[T]):
+    index: int
+    value: Optional[T] = None
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class RaceResult(Generic[T]):
+    """The accepted candidate (if any) and every candidate that finished before the race ended."""
+
+    winner: Optional[Candidate[T]]
+    finished: List[Candidate[T]]
+
+
+@dataclass
+class _NodeSpeculation:
+    races: int = 0
+    candidates: int = 0
+    accepted: int = 0
+    all_rejected: int = 0
+    cancelled: int = 0
+    late_results: int = 0
+    win_seconds: float = 0.0
+    wins_by_index: Dict[int, int] = field(default_factory=dict)
+
+
+class SpeculationStats:
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _NodeSpeculation] = {}
+
+    def node(self, prompt_type: str) -> _NodeSpeculation:
+        return self._nodes.setdefault(prompt_type, _NodeSpeculation())
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for name, node in sorted(self._nodes.items()):
+            entry = {key: value for key, value in vars(node).items() if key != "win_seconds"}
+            entry["wins_by_index"] = dict(sorted(node.wins_by_index.items()))
+            entry["avg_win_s"] = round(node.win_seconds / node.accepted, 3) if node.accepted else None
+            result[name] = entry
+        return result
+
+
+speculation_stats = SpeculationStats()
+
+# Late candidates still running for on_late; held here so they are not garbage-collected.
+_background: Set[asyncio.Future] = set()
+
+
+def _outcome(task: asyncio.Future, index: int) -> Candidate:
+    if task.cancelled():
+        return Candidate(index, error=asyncio.CancelledError())
+    error = task.exception()
+    if error is not None:
+        return Candidate(index, error=error)
+    return Candidate(index, value=task.result())
+
+
+async def race(
+    prompt_type: str,
+    factories: Sequence[Callable[[], Awaitable[T]]],
+    accept: Callable[[T], bool],
+    *,
+    on_late: Optional[Callable[[T], None]] = None,
+) -> RaceResult[T]:
+    """Run all ``factories`` concurrently and return once one result passes ``accept``.
+
+    Candidates that raise are recorded in ``finished`` with their error, not
+    re-raised; the caller decides what to do when nothing is accepted. With
+    ``on_late``, candidates still running after the winner are not cancelled;
+    each successful one is passed to ``on_late`` when it completes.
+    """
+    stats = speculation_stats.node(prompt_type)
+    stats.races += 1
+    stats.candidates += len(factories)
+    started = time.perf_counter()
+
+    tasks = {asyncio.ensure_future(factory()): index for index, factory in enumerate(factories)}
+    pending: Set[asyncio.Future] = set(tasks)
+    finished: List[Candidate[T]] = []
+    winner: Optional[Candidate[T]] = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.__getitem__):
+                candidate = _outcome(task, tasks[task])
+                finished.append(candidate)
+                if winner is None and candidate.error is None and accept(candidate.value):
+                    winner = candidate
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+
+    if winner is None:
+        stats.all_rejected += 1
+    else:
+        stats.accepted += 1
+        stats.win_seconds += time.perf_counter() - started
+        stats.wins_by_index[winner.index] = stats.wins_by_index.get(winner.index, 0) + 1
+
+    for task in pending:
+        if on_late is None:
+            stats.cancelled += 1
+            task.cancel()
+            # Retrieve the loser's outcome so it is never reported as unhandled.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            _background.add(task)
+            task.add_done_callback(lambda t: _deliver_late(prompt_type, t, on_late))
+    return RaceResult(winner, finished)
+
+
+def _deliver_late(prompt_type: str, task: asyncio.Future, on_late: Callable[[Any], None]) -> None:
+    _background.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.info("Late %s candidate failed: %s", prompt_type, error)
+        return
+    speculation_stats.node(prompt_type).late_results += 1
+    try:
+        on_late(task.result())
+    except Exception:  # a bad late result must not surface as an unhandled callback error
+        logger.exception("Handling late %s candidate failed", prompt_type)
+
+
+async def drain_background() -> None:
+    """Cancel late candidates that are still running (used at shutdown)."""
+    tasks = list(_background)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    return speculation_stats.stats()
+
+
+__all__ = [
+    "Candidate",
+    "RaceResult",
+    "SpeculationStats",
+    "drain_background",
+    "get_speculation_stats",
+    "race",
+    "speculation_stats",
+]
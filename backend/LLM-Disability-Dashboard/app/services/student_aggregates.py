@@ -0,0 +1,264 @@
+"""Per-student running performance aggregates for adaptive difficulty.
+
+Instead of re-reading (or re-uploading) a student's full session history, each
+consistency report folds into a fixed-size row: session counts, running mean,
+EWMA and a short window of the most recent sessions for trend detection. Rows
+are kept per (disability, difficulty) bucket plus an overall ``*``/``*`` row, so
+updates and reads are O(1) in the number of sessions.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiosqlite
+
+from .adaptive_difficulty import RECENT_WINDOW
+
+logger = logging.getLogger(__name__)
+
+ALL = "*"
+DEFAULT_EWMA_ALPHA = 0.3
+
+
+@dataclass
+class StudentAggregate:
+    student_id: str
+    disability: str = ALL
+    difficulty: str = ALL
+    sessions: int = 0
+    explicit_count: int = 0
+    correct_count: int = 0
+    consistency_sum: float = 0.0
+    consistency_ewma: float = 0.0
+    recent: List[Dict[str, Any]] = field(default_factory=list)
+    last_event: Optional[str] = None
+    updated_at: float = 0.0
+
+    @property
+    def mean_consistency(self) -> float:
+        return self.consistency_sum / self.sessions if self.sessions else 0.0
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        return self.correct_count / self.explicit_count if self.explicit_count else None
+
+    def fold(self, consistency_score: float, is_correct: Optional[bool], *, alpha: float) -> None:
+        score = max(0.0, min(1.0, float(consistency_score)))
+        self.consistency_ewma = score if not self.sessions else alpha * score + (1 - alpha) * self.consistency_ewma
+        self.sessions += 1
+        self.consistency_sum += score
+        entry: Dict[str, Any] = {"consistency_score": score}
+        if is_correct is not None:
+            self.explicit_count += 1
+            self.correct_count += int(bool(is_correct))
+            entry["is_correct"] = bool(is_correct)
+        self.recent = [*self.recent, entry][-RECENT_WINDOW:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("last_event", None)
+        data["mean_consistency"] = round(self.mean_consistency, 4)
+        data["consistency_ewma"] = round(self.consistency_ewma, 4)
+        data["accuracy"] = None if self.accuracy is None else round(self.accuracy, 4)
+        return data
+
+
+class StudentAggregateStore:
+    """SQLite-backed aggregates keyed by student, disability and difficulty."""
+
+    def __init__(self, db_path: str, *, ewma_alpha: float = DEFAULT_EWMA_ALPHA) -> None:
+        self.db_path = db_path
+        self.ewma_alpha = min(1.0, max(0.01, ewma_alpha))
+        self.updates = 0
+        self.skipped = 0
+        self.errors = 0
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            await conn.execute("PRAGMA busy_timeout=5000")
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS student_aggregates (
+                    student_id TEXT NOT NULL,
+                    disability TEXT NOT NULL,
+                    difficulty TEXT NOT NULL,
+                    sessions INTEGER NOT NULL,
+                    explicit_count INTEGER NOT NULL,
+                    correct_count INTEGER NOT NULL,
+                    consistency_sum REAL NOT NULL,
+                    consistency_ewma REAL NOT NULL,
+                    recent TEXT NOT NULL,
+                    last_event TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (student_id, disability, difficulty)
+                )
+                """
+            )
+            if self._conn is None:
+                self._conn = conn
+            else:  # pragma: no cover - lost a concurrent open race
+                await conn.close()
+        return self._conn
+
+    async def _fetch(
+        self, conn: aiosqlite.Connection, student_id: str, disability: str, difficulty: str
+    ) -> Optional[StudentAggregate]:
+        cursor = await conn.execute(
+            "SELECT sessions, explicit_count, correct_count, consistency_sum, consistency_ewma, recent, "
+            "last_event, updated_at FROM student_aggregates "
+            "WHERE student_id = ? AND disability = ? AND difficulty = ?",
+            (student_id, disability, difficulty),
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
+        if row is None:
+            return None
+        sessions, explicit, correct, total, ewma, recent, last_event, updated_at = row
+        return StudentAggregate(
+            student_id=student_id,
+            disability=disability,
+            difficulty=difficulty,
+            sessions=sessions,
+            explicit_count=explicit,
+            correct_count=correct,
+            consistency_sum=total,
+            consistency_ewma=ewma,
+            recent=json.loads(recent),
+            last_event=last_event,
+            updated_at=updated_at,
+        )
+
+    async def _upsert(self, conn: aiosqlite.Connection, aggregate: StudentAggregate) -> None:
+        await conn.execute(
+            """
+            INSERT OR REPLACE INTO student_aggregates
+            (student_id, disability, difficulty, sessions, explicit_count, correct_count,
+             consistency_sum, consistency_ewma, recent, last_event, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                aggregate.student_id,
+                aggregate.disability,
+                aggregate.difficulty,
+                aggregate.sessions,
+                aggregate.explicit_count,
+                aggregate.correct_count,
+                aggregate.consistency_sum,
+                aggregate.consistency_ewma,
+                json.dumps(aggregate.recent, separators=(",", ":")),
+                aggregate.last_event,
+                aggregate.updated_at,
+            ),
+        )
+
+    async def record_session(
+        self,
+        student_id: str,
+        *,
+        disability: str,
+        difficulty: str,
+        consistency_score: float,
+        is_correct: Optional[bool] = None,
+        event_key: Optional[str] = None,
+    ) -> bool:
+        """Fold one session into the student's overall and per-bucket rows.
+
+        ``event_key`` identifies the session; recording the same key twice in a
+        row (a resumed or repeated run) is a no-op. Returns True when applied.
+        """
+        async with self._lock:
+            try:
+                conn = await self._connection()
+                await conn.execute("BEGIN IMMEDIATE")
+                try:
+                    overall = await self._fetch(conn, student_id, ALL, ALL)
+                    if event_key is not None and overall is not None and overall.last_event == event_key:
+                        await conn.execute("ROLLBACK")
+                        self.skipped += 1
+                        return False
+                    bucket = await self._fetch(conn, student_id, disability, difficulty)
+                    now = time.time()
+                    for aggregate in (
+                        overall or StudentAggregate(student_id),
+                        bucket or StudentAggregate(student_id, disability, difficulty),
+                    ):
+                        aggregate.fold(consistency_score, is_correct, alpha=self.ewma_alpha)
+                        aggregate.last_event = event_key
+                        aggregate.updated_at = now
+                        await self._upsert(conn, aggregate)
+                    await conn.execute("COMMIT")
+                except Exception:
+                    await conn.execute("ROLLBACK")
+                    raise
+            except Exception as exc:
+                self.errors += 1
+                logger.warning("Student aggregate update failed for %s: %s", student_id, exc)
+                return False
+        self.updates += 1
+        return True
+
+    async def get(
+        self, student_id: str, *, disability: str = ALL, difficulty: str = ALL
+    ) -> Optional[StudentAggregate]:
+        conn = await self._connection()
+        return await self._fetch(conn, student_id, disability, difficulty)
+
+    async def breakdown(self, student_id: str) -> List[StudentAggregate]:
+        """All rows for a student, overall row first."""
+        conn = await self._connection()
+        cursor = await conn.execute(
+            "SELECT disability, difficulty FROM student_aggregates WHERE student_id = ? "
+            "ORDER BY disability != ?, disability, difficulty",
+            (student_id, ALL),
+        )
+        keys = await cursor.fetchall()
+        await cursor.close()
+        rows = [await self._fetch(conn, student_id, disability, difficulty) for disability, difficulty in keys]
+        return [row for row in rows if row is not None]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "ewma_alpha": self.ewma_alpha,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+def create_student_aggregate_store() -> Optional[StudentAggregateStore]:
+    """Build the store from environment settings, or None when disabled."""
+    flag = os.getenv("STUDENT_AGGREGATES_ENABLED", "true").strip().lower()
+    if flag in {"0", "false", "no", "off"}:
+        return None
+
+    db_path = os.getenv(
+        "STUDENT_AGGREGATES_DB_PATH",
+        str(Path(__file__).resolve().parents[2] / "data" / "student_aggregates.db"),
+    )
+    try:
+        alpha = float(os.getenv("STUDENT_AGGREGATES_EWMA_ALPHA", str(DEFAULT_EWMA_ALPHA)))
+    except ValueError:
+        alpha = DEFAULT_EWMA_ALPHA
+    return StudentAggregateStore(db_path, ewma_alpha=alpha)
+
+
+__all__ = ["StudentAggregate", "StudentAggregateStore", "create_student_aggregate_store"]
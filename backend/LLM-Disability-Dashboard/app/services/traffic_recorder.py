@@ -0,0 +1,396 @@
+"""Recording of API traffic and the LLM completions it triggered, for offline replay.
+
+With ``LLM_TRAFFIC_RECORD_PATH`` set, :class:`TrafficRecorderMiddleware` appends
+one JSON line per recorded request::
+
+    {"id", "method", "path", "query", "body", "status", "elapsed_ms",
+     "llm_calls": [{"prompt_type", "model", "temperature", "cached", "latency_ms", "response"}]}
+
+Only JSON-bodied ``POST``/``PUT``/``PATCH`` requests under
+``LLM_TRAFFIC_RECORD_PATHS`` are recorded, sampled at ``LLM_TRAFFIC_SAMPLE``.
+Lines are appended from a worker thread, never on the event loop. Once the
+file would exceed ``LLM_TRAFFIC_MAX_BYTES`` it is rotated to ``<path>.1``
+(replacing the previous one), so at most twice the cap stays on disk.
+Bodies and responses are anonymized before they are written. Identifying keys
+(student and session ids, names, emails) are replaced by stable salted
+pseudonyms, and email addresses and phone numbers inside free text are masked.
+
+LLM calls are captured in ``LLMClient._cached_completion``. Cache hits are
+captured too (with ``cached: true``), so a recording replays against a cold
+cache just as well as a warm one. :class:`TrafficReplay` serves a recording
+back to the app in place of ``LLMClient._provider_call``; see
+``benchmarks/llm_traffic_replay.py``.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import statistics
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORD_PATHS = ("/api/v1/langgraph", "/api/v2/langgraph")
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+RECORDED_METHODS = {"POST", "PUT", "PATCH"}
+IDENTIFYING_KEYS = {
+    "email",
+    "name",
+    "session_id",
+    "sessionid",
+    "student_id",
+    "studentid",
+    "student_name",
+    "studentname",
+    "teacher",
+    "teacher_name",
+    "teachername",
+    "thread_id",
+    "user_id",
+    "userid",
+}
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Only phone-shaped numbers: a leading "+" country code, or NANP-style 3-3-4 groups
+# with separators. Bare digit runs and "3456 - 1289" are arithmetic, not contact details.
+PHONE_RE = re.compile(
+    r"(?<![\w.])(?:"
+    r"\+\d{1,3}[\s.-]?\(?\d{1,4}\)?(?:[\s.-]?\d{2,4}){2,4}"
+    r"|(?:\(\d{3}\)\s?|\d{3}[-.\s])\d{3}[-.\s]\d{4}"
+    r")(?!\w|\.\d)"
+)
+
+_calls: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("llm_traffic_calls", default=None)
+_replay_entry: ContextVar[Optional[str]] = ContextVar("llm_replay_entry", default=None)
+
+
+class Anonymizer:
+    """Salted pseudonyms for identifying values, masking for contact details in text."""
+
+    def __init__(self, salt: Optional[str] = None) -> None:
+        # Without a configured salt, pseudonyms are stable only within one process.
+        self.salt = (salt or secrets.token_hex(16)).encode("utf-8")
+
+    def pseudonym(self, value: Any) -> Any:
+        digest = hashlib.sha256(self.salt + str(value).encode("utf-8")).hexdigest()
+        if isinstance(value, int) and not isinstance(value, bool):
+            return int(digest[:8], 16)
+        return f"anon-{digest[:12]}"
+
+    def text(self, value: str) -> str:
+        return PHONE_RE.sub("<phone>", EMAIL_RE.sub("<email>", value))
+
+    def __call__(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {
+                key: self.pseudonym(item)
+                if str(key).lower() in IDENTIFYING_KEYS and isinstance(item, (str, int)) and item != ""
+                else self(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self(item) for item in value]
+        if isinstance(value, str):
+            return self.text(value)
+        return value
+
+    def query(self, raw: str) -> str:
+        if not raw:
+            return ""
+        return urlencode([(key, str(self({key: item})[key])) for key, item in parse_qsl(raw, keep_blank_values=True)])
+
+
+@contextmanager
+def capture_llm_calls() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the LLM completions made in this context (and tasks started from it)."""
+    calls: List[Dict[str, Any]] = []
+    token = _calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _calls.reset(token)
+
+
+def record_llm_call(
+    prompt_type: str,
+    model: str,
+    temperature: float,
+    response: Any,
+    seconds: float,
+    *,
+    cached: bool,
+) -> None:
+    calls = _calls.get()
+    if calls is None:
+        return
+    calls.append(
+        {
+            "prompt_type": prompt_type,
+            "model": model,
+            "temperature": temperature,
+            "cached": cached,
+            "latency_ms": round(seconds * 1000, 1),
+            # Snapshot now: callers mutate payloads after the call returns.
+            "response": json.loads(json.dumps(response, default=str)),
+        }
+    )
+
+
+class TrafficRecorder:
+    """Appends anonymized request records to a JSONL file."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        paths: Sequence[str] = DEFAULT_RECORD_PATHS,
+        sample: float = 1.0,
+        anonymizer: Optional[Anonymizer] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.paths = tuple(paths)
+        self.sample = sample
+        self.anonymize = anonymizer or Anonymizer()
+        self.max_bytes = max_bytes
+        self.recorded = 0
+        self.rotations = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def should_record(self, method: str, path: str) -> bool:
+        if method not in RECORDED_METHODS or not path.startswith(self.paths):
+            return False
+        return self.sample >= 1.0 or random.random() < self.sample
+
+    def entry(
+        self,
+        method: str,
+        path: str,
+        query: str,
+        body: bytes,
+        status: Optional[int],
+        seconds: float,
+        calls: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return None  # not JSON; nothing the replay runner could resend
+        return {
+            "id": uuid.uuid4().hex,
+            "method": method,
+            "path": path,
+            "query": self.anonymize.query(query),
+            "body": self.anonymize(payload),
+            "status": status,
+            "elapsed_ms": round(seconds * 1000, 1),
+            "llm_calls": [dict(call, response=self.anonymize(call["response"])) for call in calls],
+        }
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Append one record, rotating first if it would push the file past ``max_bytes``."""
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self.max_bytes > 0:
+                try:
+                    size = os.path.getsize(self.path)
+                except OSError:
+                    size = 0
+                if size and size + len(line) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                    self.rotations += 1
+            with open(self.path, "ab") as handle:
+                handle.write(line)
+            self.recorded += 1
+
+    async def awrite(self, entry: Dict[str, Any]) -> None:
+        """:meth:`write` on a worker thread, keeping file I/O off the event loop."""
+        await asyncio.to_thread(self.write, entry)
+
+
+class TrafficRecorderMiddleware:
+    """ASGI middleware that records sampled requests with the LLM calls they made."""
+
+    def __init__(self, app: Any, recorder: TrafficRecorder) -> None:
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self.recorder.should_record(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        status: List[int] = []
+
+        async def receive_and_keep() -> Dict[str, Any]:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_and_watch(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        with capture_llm_calls() as calls:
+            try:
+                await self.app(scope, receive_and_keep, send_and_watch)
+            finally:
+                entry = self.recorder.entry(
+                    scope["method"],
+                    scope["path"],
+                    scope.get("query_string", b"").decode("latin-1"),
+                    bytes(body),
+                    status[0] if status else None,
+                    time.perf_counter() - started,
+                    calls,
+                )
+                if entry is not None:
+                    try:
+                        await self.recorder.awrite(entry)
+                    except OSError as exc:
+                        logger.warning("Could not write traffic record: %s", exc)
+
+
+def create_traffic_recorder() -> Optional[TrafficRecorder]:
+    """Recorder configured from LLM_TRAFFIC_* settings, or None when recording is off."""
+    path = os.getenv("LLM_TRAFFIC_RECORD_PATH", "").strip()
+    if not path:
+        return None
+    raw_paths = os.getenv("LLM_TRAFFIC_RECORD_PATHS", "")
+    paths = [item.strip() for item in raw_paths.split(",") if item.strip()] or list(DEFAULT_RECORD_PATHS)
+    try:
+        sample = float(os.getenv("LLM_TRAFFIC_SAMPLE", "1.0"))
+    except ValueError:
+        sample = 1.0
+    try:
+        max_bytes = int(os.getenv("LLM_TRAFFIC_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+    except ValueError:
+        max_bytes = DEFAULT_MAX_BYTES
+    logger.info("Recording LLM traffic to %s", path)
+    return TrafficRecorder(
+        path,
+        paths=paths,
+        sample=sample,
+        anonymizer=Anonymizer(os.getenv("LLM_TRAFFIC_SALT", "").strip() or None),
+        max_bytes=max_bytes,
+    )
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+class TrafficReplay:
+    """Serves recorded LLM responses to the requests that originally triggered them.
+
+    Each recorded request keeps a queue of its completions per prompt type.
+    When a replayed request asks for more completions of a type than were
+    recorded (for example after a change that lowers cache reuse), a
+    response of the same type from elsewhere in the recording is reused and
+    counted as ``unmatched``. A type that never occurs in the recording
+    raises ``LookupError``.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Dict[str, Any]],
+        *,
+        latency: str = "recorded",
+        latency_scale: float = 1.0,
+    ) -> None:
+        self.entries = list(entries)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.entries:
+            for call in entry.get("llm_calls", []):
+                by_type.setdefault(call["prompt_type"], []).append(call)
+        self._by_type = by_type
+        self._typical_ms = {
+            prompt_type: statistics.median(
+                [c["latency_ms"] for c in calls if not c.get("cached")] or [0.0]
+            )
+            for prompt_type, calls in by_type.items()
+        }
+        self.reset()
+
+    def reset(self) -> None:
+        self._queues: Dict[str, Dict[str, Deque[Dict[str, Any]]]] = {}
+        for entry in self.entries:
+            queues: Dict[str, Deque[Dict[str, Any]]] = {}
+            for call in entry.get("llm_calls", []):
+                queues.setdefault(call["prompt_type"], deque()).append(call)
+            self._queues[entry["id"]] = queues
+        self._fallback_index: Dict[str, int] = {}
+        self.served = 0
+        self.unmatched = 0
+        self.missing = 0
+
+    @contextmanager
+    def request(self, entry_id: str) -> Iterator[None]:
+        token = _replay_entry.set(entry_id)
+        try:
+            yield
+        finally:
+            _replay_entry.reset(token)
+
+    def next_call(self, prompt_type: str) -> Tuple[Dict[str, Any], bool]:
+        """The recorded call to serve next for ``prompt_type`` and whether it came from this request."""
+        queue = self._queues.get(_replay_entry.get() or "", {}).get(prompt_type)
+        if queue:
+            return queue.popleft(), True
+        calls = self._by_type.get(prompt_type)
+        if not calls:
+            self.missing += 1
+            raise LookupError(f"No recorded LLM response for prompt type {prompt_type!r}")
+        index = self._fallback_index.get(prompt_type, 0)
+        self._fallback_index[prompt_type] = index + 1
+        return calls[index % len(calls)], False
+
+    def delay(self, call: Dict[str, Any]) -> float:
+        if self.latency == "zero":
+            return 0.0
+        latency_ms = self._typical_ms.get(call["prompt_type"], 0.0) if call.get("cached") else call["latency_ms"]
+        return latency_ms * self.latency_scale / 1000
+
+    async def complete(self, prompt_type: str) -> Any:
+        call, matched = self.next_call(prompt_type)
+        if not matched:
+            self.unmatched += 1
+        self.served += 1
+        delay = self.delay(call)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Callers mutate payloads (e.g. answer_validated); never hand out the recorded object.
+        return json.loads(json.dumps(call["response"]))
+
+
+__all__ = [
+    "Anonymizer",
+    "TrafficRecorder",
+    "TrafficRecorderMiddleware",
+    "TrafficReplay",
+    "capture_llm_calls",
+    "create_traffic_recorder",
+    "load_recording",
+    "record_llm_call",
+]
@@ -0,0 +1,171 @@
+"""Offline replay comparison of adaptive difficulty policies.
+
+Each policy is replayed over logged session histories with the standard
+rejection method: at every logged session the policy picks a (grade,
+difficulty); the session only counts toward that policy, and is fed back to it,
+when the pick matches what was actually logged. For unbiased estimates the log
+should come from a randomized assignment, which is what ``--synthetic`` generates.
+
+Usage (from backend/LLM-Disability-Dashboard):
+
+    python -m benchmarks.adaptive_policy_replay --synthetic --students 500
+    python -m benchmarks.adaptive_policy_replay --histories logged_sessions.json
+
+``logged_sessions.json`` is a list of ``{"student_id", "grade_level",
+"sessions": [{"grade_level", "difficulty", "is_correct" | "consistency_score"}]}``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("OPENAI_API_KEY", "replay-benchmark")
+
+from app.services.adaptive_difficulty import AdaptiveDifficultyManager  # noqa: E402
+from app.services.difficulty_policy import (  # noqa: E402
+    DEFAULT_TARGET_SUCCESS,
+    BanditPolicy,
+    RuleBasedPolicy,
+    session_success,
+)
+from app.services.grade_registry import DIFFICULTY_LEVELS, GRADE_LEVELS  # noqa: E402
+
+GRADES = [value for value, _ in GRADE_LEVELS]
+DIFFICULTIES = [value for value, _ in DIFFICULTY_LEVELS]
+DIFFICULTY_OFFSETS = (-0.8, 0.0, 0.8)
+
+
+def synthetic_histories(students: int, sessions: int, seed: int) -> List[Dict[str, Any]]:
+    """Students with a latent ability, logged under uniformly random arms within one grade."""
+    rng = np.random.default_rng(seed)
+    logged = []
+    for index in range(students):
+        grade_idx = int(rng.integers(1, len(GRADES) - 1))
+        ability = float(rng.normal(0.0, 1.0))
+        history = []
+        for _ in range(sessions):
+            g = grade_idx + int(rng.integers(-1, 2))
+            d = int(rng.integers(0, len(DIFFICULTIES)))
+            level = (g - grade_idx) + DIFFICULTY_OFFSETS[d]
+            p_success = 1.0 / (1.0 + math.exp(-1.5 * (ability - level)))
+            success = bool(rng.random() < p_success)
+            history.append(
+                {
+                    "grade_level": GRADES[g],
+                    "difficulty": DIFFICULTIES[d],
+                    "is_correct": success,
+                    "consistency_score": round(float(np.clip(rng.normal(0.8 if success else 0.45, 0.1), 0, 1)), 3),
+                }
+            )
+        logged.append({"student_id": f"s{index}", "grade_level": GRADES[grade_idx], "sessions": history})
+    return logged
+
+
+def replay(manager: AdaptiveDifficultyManager, logged: List[Dict[str, Any]]) -> Dict[str, Any]:
+    accepted = 0
+    successes = 0.0
+    levels: List[int] = []
+    gaps: List[float] = []
+    decide_seconds = 0.0
+    decisions = 0
+    for student in logged:
+        student_id = student["student_id"]
+        grade_level = student["grade_level"]
+        prefix: List[Dict[str, Any]] = []
+        current = "medium"
+        student_wins = 0.0
+        student_accepted = 0
+        for session in student["sessions"]:
+            started = time.perf_counter()
+            plan = manager.recommend(prefix, current, grade_level=grade_level, student_id=student_id)
+            decide_seconds += time.perf_counter() - started
+            decisions += 1
+            chosen_grade = plan.get("recommended_grade_level", grade_level)
+            if chosen_grade != session["grade_level"] or plan["recommended_difficulty"] != session["difficulty"]:
+                continue
+            success = session_success(session)
+            manager.observe(student_id, grade_level=session["grade_level"], difficulty=session["difficulty"], success=success)
+            prefix.append(session)
+            current = session["difficulty"]
+            accepted += 1
+            successes += success
+            student_wins += success
+            student_accepted += 1
+            levels.append(GRADES.index(chosen_grade) - GRADES.index(grade_level) + DIFFICULTIES.index(current))
+        if student_accepted:
+            gaps.append(abs(student_wins / student_accepted - DEFAULT_TARGET_SUCCESS))
+
+    return {
+        "policy": manager.policy.name,
+        "accepted_sessions": accepted,
+        "success_rate": round(successes / accepted, 4) if accepted else None,
+        "mean_target_gap": round(float(np.mean(gaps)), 4) if gaps else None,
+        "mean_relative_level": round(float(np.mean(levels)), 4) if levels else None,
+        "us_per_decision": round(decide_seconds / max(decisions, 1) * 1e6, 2),
+    }
+
+
+def roster_timing(logged: List[Dict[str, Any]], seed: int) -> Dict[str, Any]:
+    """Compare one vectorized roster call with per-student calls on a warm bandit."""
+    policy = BanditPolicy("thompson", seed=seed)
+    roster = [
+        {"student_id": s["student_id"], "grade_level": s["grade_level"], "difficulty": "medium",
+         "student_history": s["sessions"]}
+        for s in logged
+    ]
+    policy.recommend_batch(roster)
+
+    started = time.perf_counter()
+    policy.recommend_batch(roster)
+    batch = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for student in roster:
+        policy.recommend([], "medium", grade_level=student["grade_level"], student_id=student["student_id"])
+    looped = time.perf_counter() - started
+    return {
+        "students": len(roster),
+        "batch_ms": round(batch * 1000, 3),
+        "per_student_ms": round(looped * 1000, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", type=Path, help="JSON file with logged sessions per student")
+    parser.add_argument("--synthetic", action="store_true", help="Generate randomized logged sessions (the default without --histories)")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if args.histories:
+        logged = json.loads(args.histories.read_text())
+    else:
+        logged = synthetic_histories(args.students, args.sessions, args.seed)
+
+    results = []
+    for build in (
+        lambda m: RuleBasedPolicy(m),
+        lambda m: BanditPolicy("thompson", seed=args.seed),
+        lambda m: BanditPolicy("ucb", seed=args.seed),
+    ):
+        manager = AdaptiveDifficultyManager()
+        manager.set_policy(build(manager))
+        results.append(replay(manager, logged))
+
+    print(json.dumps({"replay": results, "roster": roster_timing(logged, args.seed)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""Rows per second for save_feedback under concurrent writers, per write mode.
+
+Usage (from backend/LLM-Disability-Dashboard):
+
+    python -m benchmarks.database_write_behind --writers 30 --rows 50
+
+Each mode writes into a fresh SQLite file in a temporary directory.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("OPENAI_API_KEY", "write-benchmark")
+
+from app.services import database_service  # noqa: E402
+
+
+async def run_mode(mode: str, writers: int, rows: int, directory: str) -> Dict[str, Any]:
+    os.environ["DATABASE_WRITE_DURABILITY"] = mode
+    os.environ["DATABASE_PATH"] = os.path.join(directory, f"{mode}.sqlite")
+    await database_service.close_database()
+    await database_service.init_database()
+
+    async def writer(student_id: int) -> None:
+        for index in range(rows):
+            await database_service.save_feedback(
+                {
+                    "studentId": student_id,
+                    "responses": [str(index)],
+                    "teacherFeedback": "",
+                    "aiAnalysis": {"strengths": ["counting"], "suggestedApproaches": [{"area": "number lines"}]},
+                }
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(student) for student in range(writers)))
+    stats = database_service.get_write_queue_stats()
+    await database_service.close_database()
+    elapsed = time.perf_counter() - started
+    total = writers * rows
+    return {
+        "mode": mode,
+        "rows": total,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed),
+        "batches": stats.get("batches"),
+        "max_batch": stats.get("max_batch"),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in database_service.WRITE_DURABILITY_MODES:
+            results.append(await run_mode(mode, args.writers, args.rows, directory))
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
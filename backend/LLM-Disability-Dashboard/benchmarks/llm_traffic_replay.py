@@ -0,0 +1,199 @@
+"""Replay recorded API traffic against the app with the LLM served from the recording.
+
+Record traffic by running the API with ``LLM_TRAFFIC_RECORD_PATH=traffic.jsonl``
+(see :mod:`app.services.traffic_recorder`), then:
+
+    python -m benchmarks.llm_traffic_replay traffic.jsonl --passes 2
+    python -m benchmarks.llm_traffic_replay traffic.jsonl --output after.json --baseline before.json
+
+Requests are sent in-process through the ASGI app. Caches, checkpoints and
+the database start empty in a temporary directory. Every completion that
+reaches ``LLMClient._provider_call`` is answered from the recording after
+its recorded latency (``--latency zero`` skips the wait). Each pass reports:
+
+* end-to-end latency;
+* process CPU time per request;
+* LLM completions, how many the cache answered and how many reached the
+  stubbed provider;
+* the tiered cache hit rate.
+
+Later passes run with the caches warmed by earlier ones. Routes whose LLM
+calls do not go through ``LLMClient`` (the legacy ``/api/v1/openai`` routes)
+are not recorded and cannot be replayed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_WORKDIR = tempfile.mkdtemp(prefix="llm-replay-")
+atexit.register(shutil.rmtree, _WORKDIR, ignore_errors=True)
+for _name, _filename in (
+    ("CACHE_SQLITE_PATH", "cache.db"),
+    ("CHECKPOINT_DB_PATH", "checkpoints.db"),
+    ("STUDENT_AGGREGATES_DB_PATH", "student_aggregates.db"),
+    ("DATABASE_PATH", "dashboard.db"),
+):
+    os.environ[_name] = os.path.join(_WORKDIR, _filename)
+# Empty values (rather than unset) so main's load_dotenv cannot fill them back in.
+os.environ["REDIS_URL"] = ""
+os.environ["LLM_TRAFFIC_RECORD_PATH"] = ""
+os.environ.setdefault("OPENAI_API_KEY", "replay-benchmark")
+
+import httpx  # noqa: E402
+
+from app.limiter import limiter  # noqa: E402
+from app.services.cache_store import get_cache_store  # noqa: E402
+from app.services.llm_client import LLMClient  # noqa: E402
+from app.services.traffic_recorder import TrafficReplay, capture_llm_calls, load_recording  # noqa: E402
+
+COMPARED = (
+    ("latency_ms", "p50"),
+    ("latency_ms", "p95"),
+    ("cpu_ms_per_request",),
+    ("llm", "provider_calls"),
+    ("llm", "hit_rate"),
+    ("cache", "hit_rate"),
+)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _cache_totals(stats: Dict[str, Any]) -> Dict[str, int]:
+    hits = stats["l1_hits"] + stats["l2_hits"] + stats["l3_hits"]
+    return {"lookups": stats["l1_hits"] + stats["l1_misses"], "hits": hits}
+
+
+async def replay_pass(
+    client: httpx.AsyncClient,
+    replay: TrafficReplay,
+    concurrency: int,
+) -> Dict[str, Any]:
+    replay.reset()
+    cache = get_cache_store()
+    cache_before = _cache_totals(await cache.get_stats())
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    completions = cached = 0
+
+    async def one(entry: Dict[str, Any]) -> None:
+        nonlocal completions, cached
+        url = entry["path"] + (f"?{entry['query']}" if entry.get("query") else "")
+        async with semaphore:
+            with replay.request(entry["id"]), capture_llm_calls() as calls:
+                started = time.perf_counter()
+                response = await client.request(entry["method"], url, json=entry.get("body"))
+                latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] += 1
+        completions += len(calls)
+        cached += sum(1 for call in calls if call["cached"])
+
+    cpu_started = time.process_time()
+    await asyncio.gather(*(one(entry) for entry in replay.entries))
+    cpu_ms = (time.process_time() - cpu_started) * 1000
+
+    cache_after = _cache_totals(await cache.get_stats())
+    lookups = cache_after["lookups"] - cache_before["lookups"]
+    hits = cache_after["hits"] - cache_before["hits"]
+    count = len(replay.entries)
+    return {
+        "requests": count,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "latency_ms": {
+            "mean": round(sum(latencies) / count, 1) if count else 0.0,
+            "p50": round(percentile(latencies, 0.5), 1),
+            "p95": round(percentile(latencies, 0.95), 1),
+            "max": round(max(latencies, default=0.0), 1),
+        },
+        "cpu_ms_per_request": round(cpu_ms / count, 2) if count else 0.0,
+        "llm": {
+            "completions": completions,
+            "cache_hits": cached,
+            "provider_calls": replay.served,
+            "hit_rate": round(cached / completions, 3) if completions else 0.0,
+            "unmatched": replay.unmatched,
+            "missing": replay.missing,
+        },
+        "cache": {"lookups": lookups, "hits": hits, "hit_rate": round(hits / lookups, 3) if lookups else 0.0},
+    }
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-pass differences (current - baseline) for the headline metrics."""
+    deltas = []
+    for now, before in zip(current, baseline):
+        delta: Dict[str, Any] = {}
+        for path in COMPARED:
+            a, b = now, before
+            for part in path:
+                a, b = a.get(part, {}), b.get(part, {})
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                delta[".".join(path)] = round(a - b, 3)
+        deltas.append(delta)
+    return deltas
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    from main import app
+
+    replay = TrafficReplay(load_recording(args.recording), latency=args.latency, latency_scale=args.latency_scale)
+
+    async def provider_call(_client: LLMClient, prompt_type: str, _complete: Any, _hedge: Any) -> Any:
+        return await replay.complete(prompt_type)
+
+    LLMClient._provider_call = provider_call  # type: ignore[method-assign]
+    limiter.enabled = False
+
+    passes = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=None) as client:
+            for index in range(args.passes):
+                result = await replay_pass(client, replay, args.concurrency)
+                passes.append({"pass": index + 1, **result})
+    return {"recording": str(args.recording), "latency": args.latency, "passes": passes}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", type=Path, help="JSONL file written by the traffic recorder")
+    parser.add_argument(
+        "--passes", type=int, default=1, help="Replays of the whole recording (later ones hit warm caches)"
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", choices=("recorded", "zero"), default="recorded")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Earlier --output file to diff against")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(main_async(args))
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        results["delta_vs_baseline"] = compare(results["passes"], baseline.get("passes", []))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""pytest-benchmark suite for the pure-Python code run on every request.
+
+Run from backend/LLM-Disability-Dashboard:
+
+    python -m pytest benchmarks/micro --benchmark-only
+    # record a new baseline
+    python -m pytest benchmarks/micro --benchmark-only --benchmark-save=baseline
+    # fail when a median regresses more than 25% against the stored baseline
+    python -m pytest benchmarks/micro --benchmark-only --benchmark-compare --benchmark-compare-fail=median:25%
+
+Baselines are JSON files under ``benchmarks/micro/baselines/<cpu>/<machine>/``,
+the default ``--benchmark-storage`` for this directory. Timings only mean
+something on the hardware that produced them, so ``<cpu>`` (CPU model and
+core count) is part of the path: on a machine without a baseline of its own,
+``--benchmark-compare`` finds nothing to compare against, and the first run
+there has to save one before regressions can be checked. The suite never
+touches the network: sockets refuse to connect, and caches and databases
+live in a temporary directory.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import platform
+import re
+import shutil
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Coroutine, TypeVar
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+_WORKDIR = tempfile.mkdtemp(prefix="llm-microbench-")
+atexit.register(shutil.rmtree, _WORKDIR, ignore_errors=True)
+os.environ["CACHE_SQLITE_PATH"] = os.path.join(_WORKDIR, "cache.db")
+os.environ["REDIS_URL"] = ""
+os.environ.setdefault("OPENAI_API_KEY", "microbenchmark")
+
+T = TypeVar("T")
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+
+def cpu_key() -> str:
+    """CPU model and core count, e.g. ``Intel-R-Xeon-R-Processor-1cpu``."""
+    import cpuinfo  # installed with pytest-benchmark
+
+    brand = cpuinfo.get_cpu_info().get("brand_raw") or platform.machine() or "unknown"
+    return f"{re.sub(r'[^A-Za-z0-9]+', '-', brand).strip('-')}-{os.cpu_count() or 1}cpu"
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Drive a coroutine that never really suspends (in-memory/SQLite backends) without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("coroutine suspended; it is not a pure-CPU path")
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    def refuse(*_args, **_kwargs):
+        raise RuntimeError("network access is disabled in microbenchmarks")
+
+    monkeypatch.setattr(socket.socket, "connect", refuse)
+    monkeypatch.setattr(socket.socket, "connect_ex", refuse)
+    monkeypatch.setattr(socket, "create_connection", refuse)
+
+
+@pytest.fixture
+def workdir() -> str:
+    return _WORKDIR
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark opens its storage, so the default points at this CPU's baselines.
+    if getattr(config.option, "benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINES / cpu_key()}"
+
+
+def pytest_benchmark_update_machine_info(config, machine_info):
+    # Baselines are committed; keep the host name out of them.
+    machine_info.pop("node", None)
@@ -0,0 +1,95 @@
+"""Realistic request and LLM payloads, shaped like production traffic."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+PROBLEM_TEXT = (
+    "Maya has 3 boxes of crayons. Each box holds 24 crayons. She gives 17 crayons to her "
+    "friend and then buys a pack of 12 more. How many crayons does Maya have now?"
+)
+
+PROBLEM: Dict[str, Any] = {
+    "problem": PROBLEM_TEXT,
+    "answer": "67",
+    "solution": (
+        "Step 1: Find the total crayons in the boxes: 3 x 24 = 72.\n"
+        "Step 2: Subtract the crayons she gave away: 72 - 17 = 55.\n"
+        "Step 3: Add the new pack: 55 + 12 = 67.\n"
+        "Final answer: 67"
+    ),
+    "concepts": ["multiplication", "subtraction", "addition", "multi-step word problems"],
+    "grade_level": "3rd",
+    "difficulty": "medium",
+}
+
+# The answer field disagrees with the worked solution: the case that triggers a regeneration.
+PROBLEM_MISMATCH: Dict[str, Any] = dict(PROBLEM, answer="55")
+
+ATTEMPT: Dict[str, Any] = {
+    "studentAnswer": "76",
+    "thoughtprocess": (
+        "I read the problem slowly because the words kept moving around. I saw 3 boxes with 24 "
+        "crayons so I multiplied and got 72. Then I took away 17, but I think I read it as 71 at "
+        "first and had to go back. I got 55. Then I added 12 and wrote 67, but when I copied it "
+        "down I reversed the digits and wrote 76. I wasn't sure if the 6 was a 9."
+    ),
+    "steps_to_solve": [
+        "3 x 24 = 72 crayons in the boxes",
+        "I read 17 as 71 at first, then fixed it: 72 - 17 = 55",
+        "55 + 12 = 67",
+        "I wrote the digits in reverse: 76",
+    ],
+    "final_answer": "76",
+    "disability_impact": (
+        "Dyslexia made it hard to track the numbers in the word problem; digits were transposed "
+        "(67 became 76) and 17 was briefly misread as 71."
+    ),
+    "is_final_answer_intentionally_incorrect": True,
+    "error_pattern": "digit_reversal",
+}
+
+LLM_RESPONSE_CLEAN = json.dumps(ATTEMPT)
+LLM_RESPONSE_FENCED = "```json\n" + json.dumps(ATTEMPT, indent=2) + "\n```"
+LLM_RESPONSE_WITH_PREAMBLE = (
+    "Sure! Here is the simulated student attempt in the requested format:\n\n"
+    + json.dumps(ATTEMPT, indent=2)
+    + "\n\nLet me know if you would like a different error pattern."
+)
+
+HISTORY: List[Dict[str, Any]] = [
+    {
+        "session_id": f"s-{index}",
+        "grade_level": "3rd",
+        "difficulty": ("easy", "medium", "hard")[index % 3],
+        "consistency_score": 0.45 + (index % 7) * 0.07,
+        "is_correct": index % 3 == 0,
+        "error_pattern": ("digit_reversal", "skipped_step", "operation_confusion")[index % 3],
+    }
+    for index in range(30)
+]
+
+WORKFLOW_PAYLOAD: Dict[str, Any] = {
+    "grade_level": "Grade 3",
+    "difficulty": "Medium",
+    "disability": "dyslexia",
+    "problem": PROBLEM,
+    "student_attempt": ATTEMPT,
+    "student_response": "I think the answer is 76 because I added everything up.",
+    "student_history": HISTORY,
+}
+
+MESSAGES: List[Dict[str, str]] = [
+    {
+        "role": "system",
+        "content": (
+            "You are simulating a 3rd grade student with Dyslexia solving a math problem. Show "
+            "realistic, disability-consistent reasoning and errors. Respond with a JSON object "
+            "containing thoughtprocess, steps_to_solve, final_answer and disability_impact. "
+        )
+        * 6,
+    },
+    {"role": "user", "content": f"Problem: {PROBLEM_TEXT}\nExpected answer: 67\nError style: digit_reversal"},
+]
+
+CACHE_VALUE: Dict[str, Any] = {"problem": PROBLEM, "student_attempt": ATTEMPT}
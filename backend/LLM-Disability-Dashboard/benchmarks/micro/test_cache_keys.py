@@ -0,0 +1,45 @@
+import pytest
+
+from app.services.disability_registry import normalize_disability
+from app.services.grade_registry import normalize_grade_level
+from app.services.langgraph_service import _workflow_cache_key
+from app.services.llm_client import LLMClient
+
+from .payloads import MESSAGES, WORKFLOW_PAYLOAD
+
+
+async def generate_attempt(**_kwargs):
+    return {}
+
+
+@pytest.fixture(scope="module")
+def llm_client():
+    return LLMClient()
+
+
+def test_make_cache_key(benchmark, llm_client):
+    kwargs = {"problem": WORKFLOW_PAYLOAD["problem"], "disability": "Dyslexia", "temperature": 0.7}
+    assert len(benchmark(llm_client._make_cache_key, generate_attempt, (), kwargs)) == 64
+
+
+def test_make_messages_cache_key(benchmark, llm_client):
+    assert len(benchmark(llm_client._make_messages_cache_key, MESSAGES, "gpt-4o-mini", 0.7)) == 64
+
+
+def test_prepare_for_cache(benchmark, llm_client):
+    prepared = benchmark(llm_client._prepare_for_cache, WORKFLOW_PAYLOAD)
+    assert list(prepared) == sorted(WORKFLOW_PAYLOAD)
+
+
+def test_workflow_cache_key(benchmark):
+    assert benchmark(_workflow_cache_key, WORKFLOW_PAYLOAD, "full").startswith("wf:")
+
+
+@pytest.mark.parametrize("name", ["Dyslexia", "adhd", "non-verbal learning disorder", "Unknown condition"])
+def test_normalize_disability(benchmark, name):
+    assert benchmark(normalize_disability, name)
+
+
+@pytest.mark.parametrize("value", ["3rd", "Grade 3", "grade three", None])
+def test_normalize_grade_level(benchmark, value):
+    assert benchmark(normalize_grade_level, value)
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from app.services.cache_store import InMemoryBackend, SharedMemoryBackend, SQLiteBackend, TieredCacheStore
+
+from .conftest import run_sync
+from .payloads import CACHE_VALUE
+
+KEY = "llm:" + "ab" * 32
+
+
+@pytest.fixture
+def tiered(workdir):
+    store = TieredCacheStore(
+        l1=InMemoryBackend(max_entries=4096),
+        l3=SQLiteBackend(os.path.join(workdir, "tiered.db")),
+    )
+    run_sync(store.set(KEY, CACHE_VALUE))
+    return store
+
+
+def test_tiered_l1_hit(benchmark, tiered):
+    assert benchmark(lambda: run_sync(tiered.get(KEY))) == CACHE_VALUE
+
+
+def test_tiered_l3_hit(benchmark, tiered):
+    def evict_l1():
+        tiered.l1 = InMemoryBackend(max_entries=4096)
+        return (), {}
+
+    result = benchmark.pedantic(lambda: run_sync(tiered.get(KEY)), setup=evict_l1, rounds=200)
+    assert result == CACHE_VALUE
+
+
+def test_tiered_miss(benchmark, tiered):
+    assert benchmark(lambda: run_sync(tiered.get("llm:missing"))) is None
+
+
+def test_tiered_set(benchmark, tiered):
+    benchmark(lambda: run_sync(tiered.set(KEY, CACHE_VALUE)))
+
+
+def test_shared_memory_get(benchmark, workdir):
+    backend = SharedMemoryBackend(os.path.join(workdir, "l1.cache"), buckets=1024)
+    raw = '{"problem":"What is 36 + 35?","answer":"71"}'
+    run_sync(backend.set(KEY, raw, 300))
+    try:
+        assert benchmark(lambda: run_sync(backend.get(KEY))) == raw
+    finally:
+        backend.close()
@@ -0,0 +1,44 @@
+from app.services.attempt_normalizer import normalize_attempt
+from app.services.consistency_validator import validate_response_consistency
+from app.services.openai_service import clean_json_response
+from app.services.problem_validator import validate_problem_consistency
+
+from .payloads import (
+    ATTEMPT,
+    LLM_RESPONSE_CLEAN,
+    LLM_RESPONSE_FENCED,
+    LLM_RESPONSE_WITH_PREAMBLE,
+    PROBLEM,
+    PROBLEM_MISMATCH,
+    PROBLEM_TEXT,
+)
+
+
+def test_validate_response_consistency(benchmark):
+    attempt = normalize_attempt(ATTEMPT, "67")
+    report = benchmark(validate_response_consistency, PROBLEM_TEXT, "Dyslexia", attempt, "67")
+    assert report["overall_consistency_score"] > 0
+
+
+def test_validate_problem_consistency(benchmark):
+    assert benchmark(validate_problem_consistency, PROBLEM)["valid"]
+
+
+def test_validate_problem_consistency_mismatch(benchmark):
+    assert not benchmark(validate_problem_consistency, PROBLEM_MISMATCH)["valid"]
+
+
+def test_normalize_attempt(benchmark):
+    assert benchmark(normalize_attempt, ATTEMPT, "67")["final_answer"] == "76"
+
+
+def test_clean_json_response_plain(benchmark):
+    assert benchmark(clean_json_response, LLM_RESPONSE_CLEAN)["final_answer"] == "76"
+
+
+def test_clean_json_response_fenced(benchmark):
+    assert benchmark(clean_json_response, LLM_RESPONSE_FENCED)["final_answer"] == "76"
+
+
+def test_clean_json_response_with_preamble(benchmark):
+    assert benchmark(clean_json_response, LLM_RESPONSE_WITH_PREAMBLE)["final_answer"] == "76"
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -7,8 +8,13 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 import uvicorn
 
-from app.Routes import langgraph_router, openai_router
+from app.Routes import export_router, langgraph_router, openai_router
 from app.limiter import limiter
+from app.services.database_service import close_database, init_database
+from app.services.disability_assessment_service import close_screening_bank, warm_screening_bank
+from app.services.langgraph_service import shutdown_workflows
+from app.services.nvidia_chat_client import close_nvidia_chat_client
+from app.services.traffic_recorder import TrafficRecorderMiddleware, create_traffic_recorder
 
 load_dotenv()
 
@@ -19,10 +25,23 @@ if REQUIRE_API_KEYS and not os.getenv("OPENAI_API_KEY", "").strip():
 allowed_origins_raw = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000")
 ALLOWED_ORIGINS = [origin.strip() for origin in allowed_origins_raw.split(",") if origin.strip()]
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await init_database()
+    warm_screening_bank()
+    yield
+    await close_screening_bank()
+    await shutdown_workflows()
+    await close_nvidia_chat_client()
+    await close_database()
+
+
 app = FastAPI(
     title="Educational Dashboard API",
     description="API for an educational dashboard using AI to generate and analyze math questions",
     version="1.0.0",
+    lifespan=lifespan,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -35,6 +54,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+traffic_recorder = create_traffic_recorder()
+if traffic_recorder is not None:
+    app.add_middleware(TrafficRecorderMiddleware, recorder=traffic_recorder)
+
 
 @app.get("/health")
 async def healthcheck():
@@ -48,6 +71,7 @@ async def healthcheck():
 app.include_router(openai_router, prefix="/api/v1/openai", tags=["OpenAI"])
 app.include_router(langgraph_router, prefix="/api/v1/langgraph", tags=["LangGraph"])
 app.include_router(langgraph_router, prefix="/api/v2/langgraph", tags=["LangGraph"])
+app.include_router(export_router, prefix="/api/v2/export", tags=["Export"])
 
 if __name__ == "__main__":
     reload = os.getenv("UVICORN_RELOAD", "false").strip().lower() in {"1", "true", "yes"}
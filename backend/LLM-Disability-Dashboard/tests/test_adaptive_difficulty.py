@@ -0,0 +1,40 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.orchestrator import LangGraphOrchestrator
+
+HISTORY = [{"consistency_score": 0.9, "is_correct": True} for _ in range(6)]
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    instance = LangGraphOrchestrator()
+    instance.llm_client.invoke_with_prompt = AsyncMock(return_value={"recommended_difficulty": "hard"})
+    return instance
+
+
+@pytest.mark.asyncio
+async def test_adaptive_node_uses_local_plan_when_confident(orchestrator):
+    state = orchestrator.build_initial_state({"difficulty": "medium", "student_history": HISTORY})
+    result = await orchestrator._adaptive_difficulty_node(state)
+    plan = result["adaptive_plan"]
+    assert plan["source"] == "deterministic"
+    assert plan["recommended_difficulty"] == "hard"
+    orchestrator.llm_client.invoke_with_prompt.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_node_calls_llm_for_low_confidence_or_narrative(orchestrator):
+    sparse = orchestrator.build_initial_state({"difficulty": "medium", "student_history": HISTORY[:1]})
+    result = await orchestrator._adaptive_difficulty_node(sparse)
+    assert result["adaptive_plan"]["source"] == "hybrid"
+    assert result["adaptive_plan"]["narrative"] == {"recommended_difficulty": "hard"}
+
+    narrative = orchestrator.build_initial_state(
+        {"difficulty": "medium", "student_history": HISTORY, "metadata": {"adaptive_narrative": True}}
+    )
+    result = await orchestrator._adaptive_difficulty_node(narrative)
+    assert result["adaptive_plan"]["source"] == "hybrid"
+    assert orchestrator.llm_client.invoke_with_prompt.await_count == 2
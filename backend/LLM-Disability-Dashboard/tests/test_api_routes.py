@@ -92,6 +92,24 @@ def test_adaptive_difficulty_endpoint_empty_history():
     assert plan["current_performance"]["trend"] == "insufficient_data"
 
 
+def test_adaptive_roster_endpoint():
+    response = client.post(
+        "/api/v2/langgraph/adaptive-roster",
+        json={
+            "students": [
+                {"student_id": "r1", "grade_level": "3rd", "difficulty": "easy"},
+                {"grade_level": "5th", "difficulty": "medium", "student_history": [{"consistency_score": 0.4}]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["metadata"]["student_count"] == 2
+    plans = body["results"]["plans"]
+    assert [plan["student_id"] for plan in plans] == ["r1", None]
+    assert all(plan["adaptive_plan"]["recommended_difficulty"] in {"easy", "medium", "hard"} for plan in plans)
+
+
 def test_disability_assessment_start_endpoint():
     mock_problem = {
         "problem": "What is 12 divided by 3?",
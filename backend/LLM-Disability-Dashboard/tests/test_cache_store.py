@@ -1,9 +1,10 @@
 import asyncio
+import os
 import time
 
 import pytest
 
-from app.services.cache_store import InMemoryBackend, TieredCacheStore
+from app.services.cache_store import InMemoryBackend, SharedMemoryBackend, TieredCacheStore
 
 
 @pytest.mark.asyncio
@@ -33,3 +34,37 @@ async def test_delete_pattern():
     assert deleted == 2
     assert await cache.get("wf:one") is None
     assert await cache.get("llm:three") == {"c": 3}
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend_is_visible_across_handles(tmp_path):
+    path = str(tmp_path / "l1.cache")
+    writer = SharedMemoryBackend(path, buckets=64, slot_size=1024, ttl_seconds=300)
+    reader = SharedMemoryBackend(path, buckets=64, slot_size=1024, ttl_seconds=300)
+    await writer.set("llm:abc", '{"ok": true}', 60)
+    assert await reader.get("llm:abc") == '{"ok": true}'
+    assert await reader.get("llm:missing") is None
+    writer.close()
+    reader.close()
+
+
+def test_shared_memory_backend_refuses_a_different_layout(tmp_path):
+    path = str(tmp_path / "l1.cache")
+    first = SharedMemoryBackend(path, buckets=64, slot_size=1024, ttl_seconds=300)
+    with pytest.raises(OSError):
+        SharedMemoryBackend(path, buckets=128, slot_size=1024, ttl_seconds=300)
+    assert os.path.getsize(path) == first._size
+    first.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend_delete_pattern_and_oversize(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "l1.cache"), buckets=64, slot_size=256, ttl_seconds=300)
+    await backend.set("wf:one", "1", 60)
+    await backend.set("llm:two", "2", 60)
+    await backend.set("wf:big", "x" * 1024, 60)
+    assert await backend.get("wf:big") is None
+    assert await backend.delete_pattern("wf:") == 1
+    assert await backend.get("wf:one") is None
+    assert await backend.get("llm:two") == "2"
+    backend.close()
@@ -0,0 +1,32 @@
+import pytest
+
+from app.services.checkpoint_store import CheckpointStore
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_save_and_latest(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"), nodes=["generate_problem_step"])
+    assert store.should_checkpoint("generate_problem_step")
+    assert not store.should_checkpoint("tutor_step")
+
+    await store.save("thread-1", "generate_problem_step", {"problem": {"problem": "2 + 2"}})
+    latest = await store.latest("thread-1")
+    assert latest["node"] == "generate_problem_step"
+    assert latest["state"]["problem"] == {"problem": "2 + 2"}
+    assert await store.latest("thread-2") is None
+    assert store.get_stats()["writes"] == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_prunes_per_thread(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"), max_per_thread=2)
+    for idx in range(5):
+        await store.save("thread-1", f"node-{idx}", {"idx": idx})
+    await store.save("thread-2", "node-0", {"idx": 0})
+
+    history = await store.history("thread-1")
+    assert [item["node"] for item in history] == ["node-3", "node-4"]
+    assert len(await store.history("thread-2")) == 1
+    assert store.get_stats()["pruned"] == 3
+    await store.close()
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+
+from app.services import database_service
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "dashboard.sqlite"))
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "2")
+    await database_service.close_database()
+    await database_service.init_database()
+    yield database_service
+    await database_service.close_database()
+
+
+async def test_migrations_are_recorded_once(database):
+    await database.init_database()
+    async with database._connection() as db:
+        cursor = await db.execute("SELECT version, name FROM schema_migrations ORDER BY version")
+        rows = [tuple(row) for row in await cursor.fetchall()]
+    assert rows == [(version, name) for version, name, _ in database.MIGRATIONS]
+
+
+async def test_writes_and_history_share_pooled_connections(database):
+    student = await database.create_student({"name": "Ada", "grade": "5th", "age": 10})
+    for index in range(3):
+        await database.save_user_data(
+            {"studentInfo": {"studentId": student["id"]}, "generatedQuestions": {"q": index}, "sessionType": "practice"}
+        )
+    await database.save_feedback(
+        {
+            "studentId": student["id"],
+            "responses": ["4"],
+            "aiAnalysis": {"strengths": ["counting"], "suggestedApproaches": [{"area": "fractions"}]},
+        }
+    )
+
+    history = await database.get_student_history(student["id"])
+    assert history["studentInfo"]["name"] == "Ada"
+    assert history["sessions"] == 3
+    assert history["learningProgress"][0]["approaches"] == ["fractions"]
+    assert len(database._get_pool()._connections) <= 2
+
+
+async def test_history_pages_with_keyset_cursor_and_summary(database):
+    for index in range(7):
+        await database.save_feedback(
+            {
+                "studentId": 9,
+                "responses": [str(index)],
+                "aiAnalysis": {
+                    "strengths": ["counting"] if index % 2 else ["place value"],
+                    "weaknesses": ["borrowing"],
+                    "suggestedApproaches": [{"area": "number lines"}],
+                },
+            }
+        )
+
+    first = await database.get_student_history("9", limit=3)
+    assert first["responses"] == 7
+    assert [r["responses"] for r in first["recentResponses"]] == [["6"], ["5"], ["4"]]
+    assert len(first["learningProgress"]) == 3
+
+    second = await database.get_student_history("9", limit=3, responses_cursor=first["nextCursor"]["responses"])
+    third = await database.get_student_history("9", limit=3, responses_cursor=second["nextCursor"]["responses"])
+    assert [r["responses"] for r in second["recentResponses"]] == [["3"], ["2"], ["1"]]
+    assert [r["responses"] for r in third["recentResponses"]] == [["0"]]
+    assert third["nextCursor"]["responses"] is None
+
+    summary = first["progressSummary"]
+    assert summary["topStrengths"] == [{"tag": "place value", "count": 4}, {"tag": "counting", "count": 3}]
+    assert summary["topWeaknesses"] == [{"tag": "borrowing", "count": 7}]
+    assert summary["topApproaches"] == [{"tag": "number lines", "count": 7}]
+
+    light = await database.get_student_history("9", limit=2, include_payloads=False)
+    assert light["recentResponses"][0]["answer_count"] == 1
+    assert "ai_analysis" not in light["recentResponses"][0]
+    assert light["learningProgress"][0]["strengths"] == ["place value"]
+    assert light["learningProgress"][1]["approaches"] == ["number lines"]
+
+
+async def test_progress_summary_backfills_existing_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "legacy.sqlite"))
+    monkeypatch.setattr(database_service, "MIGRATIONS", database_service.MIGRATIONS[:1])
+    await database_service.close_database()
+    try:
+        await database_service.save_feedback({"studentId": 4, "aiAnalysis": {"strengths": ["estimation"]}})
+        await database_service.save_user_data({"studentInfo": {"studentId": 4, "disability": "Dyslexia"}})
+        await database_service.close_database()
+
+        monkeypatch.undo()
+        monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "legacy.sqlite"))
+        history = await database_service.get_student_history("4")
+        assert history["responses"] == 1
+        assert history["progressSummary"]["topStrengths"] == [{"tag": "estimation", "count": 1}]
+        assert history["learningProgress"][0]["strengths"] == ["estimation"]
+
+        async with database_service._connection() as db:
+            cursor = await db.execute("SELECT student_id FROM sessions WHERE disability = 'Dyslexia'")
+            assert [row[0] for row in await cursor.fetchall()] == [4]
+            cursor = await db.execute("EXPLAIN QUERY PLAN SELECT id FROM sessions WHERE disability = 'Dyslexia'")
+            assert "idx_sessions_disability" in " ".join(row[3] for row in await cursor.fetchall())
+    finally:
+        await database_service.close_database()
+
+
+async def test_concurrent_writes_are_grouped_into_batches(database, monkeypatch):
+    monkeypatch.setenv("DATABASE_WRITE_DURABILITY", "commit")
+    results = await asyncio.gather(
+        *(database.save_feedback({"studentId": 11, "responses": [str(i)], "aiAnalysis": {}}) for i in range(40))
+    )
+    ids = [result["id"] for result in results]
+    assert len(set(ids)) == 40
+
+    stats = database.get_write_queue_stats()
+    assert stats["rows"] == 40
+    assert stats["batches"] < 40
+
+    async with database._connection() as db:
+        cursor = await db.execute("SELECT id, responses FROM responses WHERE id IN (%s)" % ",".join("?" * 40), ids)
+        stored = {row[0]: row[1] for row in await cursor.fetchall()}
+    assert [stored[result["id"]] for result in results] == [f'["{i}"]' for i in range(40)]
+
+
+async def test_enqueue_mode_flushes_on_close(database, monkeypatch):
+    monkeypatch.setenv("DATABASE_WRITE_DURABILITY", "enqueue")
+    result = await database.save_user_data({"studentInfo": {"studentId": 12}, "generatedQuestions": {}})
+    assert result == {"id": None, "queued": True}
+    await database.close_database()
+
+    history = await database.get_student_history("12")
+    assert history["sessions"] == 1
+
+
+async def test_full_write_queue_pushes_back(database):
+    pool = database._get_pool()
+    writer = database.WriteBehindQueue(pool, max_queue=1, put_timeout=0.05)
+    async with pool.acquire(), pool.acquire():
+        await writer.submit(database.INSERT_STUDENT_SQL, ("a", "1st", 6), wait=False)
+        await asyncio.sleep(0.01)
+        await writer.submit(database.INSERT_STUDENT_SQL, ("b", "1st", 6), wait=False)
+        with pytest.raises(Exception, match="queue is full"):
+            await writer.submit(database.INSERT_STUDENT_SQL, ("c", "1st", 6), wait=False)
+    await writer.close()
+    assert writer.stats["rows"] == 2 and writer.stats["rejected"] == 1
+
+
+async def test_batch_fails_without_killing_the_writer_when_the_pool_errors(database):
+    pool = database._get_pool()
+    writer = database.WriteBehindQueue(pool)
+    acquire = pool.acquire
+
+    def broken_acquire():
+        raise OSError("disk unavailable")
+
+    pool.acquire = broken_acquire
+    with pytest.raises(OSError, match="disk unavailable"):
+        await asyncio.wait_for(writer.submit(database.INSERT_STUDENT_SQL, ("a", "1st", 6)), 2)
+    assert not writer._worker.done()
+
+    pool.acquire = acquire
+    assert await asyncio.wait_for(writer.submit(database.INSERT_STUDENT_SQL, ("b", "1st", 6)), 2)
+    await writer.close()
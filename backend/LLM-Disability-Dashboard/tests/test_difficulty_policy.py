@@ -0,0 +1,77 @@
+import numpy as np
+
+from app.services.adaptive_difficulty import AdaptiveDifficultyManager
+from app.services.difficulty_policy import BanditPolicy, RuleBasedPolicy
+from app.services.grade_registry import GRADE_LEVELS
+from app.services.student_aggregates import StudentAggregate
+
+HISTORY = [{"consistency_score": 0.9, "is_correct": True} for _ in range(6)]
+
+
+def test_rule_policy_matches_manager_rules():
+    manager = AdaptiveDifficultyManager()
+    manager.set_policy(RuleBasedPolicy(manager))
+    plan = manager.recommend(HISTORY, "medium")
+    expected = manager.calculate_next_difficulty(HISTORY, "medium")
+    assert plan["policy"] == "rule"
+    assert plan["recommended_difficulty"] == expected["recommended_difficulty"] == "hard"
+
+
+def test_bandit_observe_matches_fit_from_history():
+    observed = BanditPolicy("ucb", seed=0)
+    fitted = BanditPolicy("ucb", seed=0)
+    sessions = [
+        {"grade_level": "5th", "difficulty": "medium", "is_correct": True},
+        {"grade_level": "6th", "difficulty": "hard", "is_correct": False},
+        {"grade_level": "5th", "difficulty": "easy", "is_correct": True},
+    ]
+    observed.recommend([], "medium", grade_level="5th", student_id="a")
+    for session in sessions:
+        observed.observe("a", grade_level=session["grade_level"], difficulty=session["difficulty"],
+                         success=float(session["is_correct"]))
+    fitted.recommend(sessions, "medium", grade_level="5th", student_id="a")
+    assert np.allclose(observed.posterior("a"), fitted.posterior("a"))
+
+
+def test_roster_scoring_is_vectorized_and_respects_grade_window():
+    policy = BanditPolicy("thompson", seed=3, grade_window=1)
+    grades = [value for value, _ in GRADE_LEVELS]
+    roster = [
+        {"student_id": f"s{i}", "grade_level": grades[i % len(grades)], "difficulty": "medium",
+         "student_history": [{"difficulty": "medium", "is_correct": i % 2 == 0}] * 4}
+        for i in range(50)
+    ]
+    plans = policy.recommend_batch(roster)
+    assert len(plans) == 50
+    for student, plan in zip(roster, plans):
+        offset = grades.index(plan["recommended_grade_level"]) - grades.index(student["grade_level"])
+        assert abs(offset) <= 1
+        assert plan["policy"] == "thompson"
+    assert policy.posterior("s0") is not None
+
+
+def test_bandit_table_is_bounded_least_recently_used_first():
+    policy = BanditPolicy("ucb", seed=0, max_students=2)
+    for student_id in ("a", "b"):
+        policy.recommend(HISTORY, "medium", grade_level="5th", student_id=student_id)
+    policy.recommend([], "medium", grade_level="5th", student_id="a")
+    policy.recommend(HISTORY, "medium", grade_level="5th", student_id="c")
+    assert policy.posterior("b") is None
+    assert policy.posterior("a") is not None and policy.posterior("c") is not None
+    assert policy._posteriors.shape[0] == 2
+
+
+def test_bandit_seeds_and_catches_up_from_the_stored_aggregate():
+    aggregate = StudentAggregate("a", sessions=2, recent=[{"consistency_score": 0.9, "is_correct": True}] * 2)
+    policy = BanditPolicy("ucb", seed=0)
+    reference = BanditPolicy("ucb", seed=0)
+    policy.recommend([], "medium", grade_level="5th", student_id="a", aggregate=aggregate)
+
+    # Two more sessions recorded elsewhere (another worker) reach this one only through the aggregate.
+    aggregate.sessions = 4
+    aggregate.recent = aggregate.recent + [{"consistency_score": 0.2, "is_correct": False}] * 2
+    policy.recommend([], "medium", grade_level="5th", student_id="a", aggregate=aggregate)
+    reference.recommend(
+        [{"difficulty": "medium", **entry} for entry in aggregate.recent], "medium", grade_level="5th", student_id="a"
+    )
+    assert np.allclose(policy.posterior("a"), reference.posterior("a"))
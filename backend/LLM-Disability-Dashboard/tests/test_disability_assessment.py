@@ -0,0 +1,74 @@
+import asyncio
+import re
+
+import pytest
+
+from app.services import disability_assessment_service as assessment
+
+ROUNDS = [{"question": "Sam has 34 apples...", "answer": "43", "focus_area": "place value"}]
+
+
+class FakeLLM:
+    """Screening prompts answer with a question for their focus; evaluations with ``evaluation``."""
+
+    def __init__(self, evaluation, delay=0.01):
+        self.evaluation = evaluation
+        self.delay = delay
+        self.screening_foci = []
+
+    async def invoke_with_prompt(self, prompt, **kwargs):
+        await asyncio.sleep(self.delay)
+        if "diagnostic math screening questions" in prompt:
+            match = re.search(r"Target this specific focus area: (.+?)\.\n", prompt)
+            focus = match.group(1) if match else None
+            self.screening_foci.append(focus)
+            return {"problem": f"Question about {focus}", "focus_area": focus}
+        return self.evaluation
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    def install(evaluation):
+        fake = FakeLLM(evaluation)
+        monkeypatch.setattr(assessment, "_llm_client", fake)
+        monkeypatch.setattr(assessment, "PREFETCH_ENABLED", True)
+        monkeypatch.setattr(assessment, "_prefetch_stats", dict.fromkeys(assessment._prefetch_stats, 0))
+        return fake
+
+    return install
+
+
+async def test_follow_up_uses_question_prefetched_during_evaluation(fake_llm):
+    fake = fake_llm({"status": "needs_follow_up", "confidence": 0.5, "next_question_focus": "Place value errors"})
+
+    result = await assessment.evaluate_assessment("5th", "medium", ROUNDS, 1)
+
+    assert result["status"] == "needs_follow_up"
+    assert result["next_question"]["problem"] == "Question about place value"
+    # Served by the speculative question; nothing was generated for the evaluator's wording afterwards.
+    assert "Place value errors" not in fake.screening_foci
+    stats = assessment.get_prefetch_stats()
+    assert (stats["started"], stats["used"], stats["discarded"]) == (2, 1, 1)
+
+
+async def test_unmatched_focus_regenerates_and_verdict_discards(fake_llm):
+    fake = fake_llm({"status": "needs_follow_up", "confidence": 0.4, "next_question_focus": "Visual-spatial reasoning"})
+    result = await assessment.evaluate_assessment("5th", "medium", ROUNDS, 1)
+    assert result["next_question"]["problem"] == "Question about Visual-spatial reasoning"
+    assert fake.screening_foci[-1] == "Visual-spatial reasoning"
+
+    fake.evaluation = {"status": "verdict", "confidence": 0.9, "verdict": {"primary_disability": "Dyscalculia"}}
+    result = await assessment.evaluate_assessment("5th", "medium", ROUNDS, 2)
+    assert result["status"] == "verdict"
+    await asyncio.sleep(0.02)
+    stats = assessment.get_prefetch_stats()
+    assert stats["used"] == 0
+    assert stats["discarded"] == stats["started"] == 4
+
+
+async def test_prefetched_questions_are_discarded_when_the_evaluation_is_unusable(fake_llm):
+    fake_llm({"status": "verdict", "confidence": "very high"})
+    with pytest.raises(ValueError):
+        await assessment.evaluate_assessment("5th", "medium", ROUNDS, 1)
+    stats = assessment.get_prefetch_stats()
+    assert stats["discarded"] == stats["started"] == 2
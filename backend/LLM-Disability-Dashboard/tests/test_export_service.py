@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import database_service
+from app.services.checkpoint_store import CheckpointStore
+from app.services.export_service import ExportError, ExportFilters, export_stream, iter_chunks, parse_timestamp
+from main import app
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "dashboard.sqlite"))
+    monkeypatch.setenv("CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setenv("DATABASE_WRITE_DURABILITY", "off")
+    await database_service.close_database()
+    await database_service.init_database()
+    yield database_service
+    await database_service.close_database()
+
+
+async def _collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+async def test_sessions_stream_in_chunks_with_filters(database):
+    student = await database.create_student({"name": "Ada", "grade": "5th", "age": 10})
+    for index in range(5):
+        await database.save_user_data(
+            {
+                "studentInfo": {"studentId": student["id"], "disability": "dyslexia" if index % 2 else "ADHD"},
+                "generatedQuestions": {"q": index},
+                "sessionType": "practice",
+            }
+        )
+
+    chunks = [chunk async for chunk in iter_chunks("sessions", chunk_size=2)]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[0][0]["generated_questions"] == {"q": 0}
+
+    body = await _collect(export_stream("sessions", "ndjson", ExportFilters(disability="Dyslexia")))
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row["generated_questions"]["q"] for row in rows] == [1, 3]
+
+    future = ExportFilters(start=parse_timestamp("2999-01-01"))
+    assert await _collect(export_stream("sessions", "ndjson", future)) == b""
+
+
+async def test_workflow_runs_export_completed_checkpoints(database, tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    try:
+        state = {"disability": "Dyslexia", "difficulty": "easy", "consistency_report": {"overall_consistency_score": 0.8}}
+        await store.save("t1", "consistency", state)
+        await store.save("t1", "__end__", state, status="completed")
+        await store.save("t2", "__end__", {**state, "disability": "ADHD"}, status="completed")
+    finally:
+        await store.close()
+
+    body = await _collect(export_stream("workflow_runs", "ndjson", ExportFilters(disability="dyslexia")))
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row["thread_id"] for row in rows] == ["t1"]
+    assert rows[0]["consistency_report"] == {"overall_consistency_score": 0.8}
+    assert rows[0]["consistency_score"] == 0.8
+
+
+def test_invalid_requests_raise_export_error():
+    with pytest.raises(ExportError):
+        export_stream("responses", "ndjson", ExportFilters(disability="ADHD"))
+    with pytest.raises(ExportError):
+        export_stream("students", "ndjson")
+    with pytest.raises(ExportError):
+        parse_timestamp("yesterday")
+
+
+def test_export_route_requires_token(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "missing.sqlite"))
+    client = TestClient(app)
+
+    monkeypatch.delenv("EXPORT_API_TOKEN", raising=False)
+    assert client.get("/api/v2/export/sessions").status_code == 403
+
+    monkeypatch.setenv("EXPORT_API_TOKEN", "secret")
+    assert client.get("/api/v2/export/sessions", headers={"X-Export-Token": "wrong"}).status_code == 401
+
+    response = client.get("/api/v2/export/sessions", headers={"X-Export-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.content == b""
+
+    bad = client.get("/api/v2/export/responses?disability=ADHD", headers={"X-Export-Token": "secret"})
+    assert bad.status_code == 400
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.services import llm_dispatcher
+from app.services.llm_dispatcher import LLMDispatcher, Priority, llm_priority
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+async def test_waiters_are_admitted_by_priority():
+    dispatcher = LLMDispatcher(initial_limit=1, max_limit=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def call(name):
+        order.append(name)
+        await gate.wait()
+
+    async def submit(name, priority):
+        with llm_priority(priority):
+            await dispatcher.run(lambda: call(name))
+
+    tasks = [asyncio.create_task(submit("first", Priority.WORKFLOW))]
+    await asyncio.sleep(0)
+    tasks += [
+        asyncio.create_task(submit("batch", Priority.BACKGROUND)),
+        asyncio.create_task(submit("workflow", Priority.WORKFLOW)),
+        asyncio.create_task(submit("chat", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert dispatcher.stats()["classes"]["background"]["queued"] == 1
+
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert order == ["first", "chat", "workflow", "batch"]
+    assert dispatcher.in_flight == 0
+
+
+async def test_background_share_leaves_room_for_interactive():
+    dispatcher = LLMDispatcher(initial_limit=4, max_limit=4, background_share=0.5)
+    gate = asyncio.Event()
+
+    async def hold():
+        await gate.wait()
+
+    batch = [asyncio.create_task(dispatcher.run(hold, priority=Priority.BACKGROUND)) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert dispatcher.stats()["classes"]["background"] == pytest.approx(
+        {"admitted": 2, "queued": 2, "max_queued": 2, "in_flight": 2, "avg_wait_ms": 0.0, "failures": 0}
+    )
+
+    async def reply():
+        return "ok"
+
+    assert await dispatcher.run(reply, priority=Priority.INTERACTIVE) == "ok"
+    gate.set()
+    await asyncio.gather(*batch)
+
+
+async def test_limit_grows_additively_and_halves_on_rate_limit(monkeypatch):
+    dispatcher = LLMDispatcher(initial_limit=4, max_limit=8)
+
+    async def ok():
+        return None
+
+    # One call at a time never hits the limit, so it must not grow.
+    for _ in range(4):
+        await dispatcher.run(ok)
+    assert dispatcher.limit == 4
+
+    gate = asyncio.Event()
+
+    async def held():
+        await gate.wait()
+
+    # 7 calls at limit 4: the 4th admitted and the 3 queued ones were limited by it.
+    tasks = [asyncio.create_task(dispatcher.run(held)) for _ in range(7)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert 4.9 < dispatcher.limit < 5.0
+
+    async def throttled():
+        raise RateLimitError("slow down")
+
+    for _ in range(3):
+        with pytest.raises(RateLimitError):
+            await dispatcher.run(throttled)
+    # Repeated 429s inside one cooldown window count as a single decrease.
+    assert 2.4 < dispatcher.limit < 2.5
+    assert dispatcher.rate_limited == 3
+
+    monkeypatch.setattr(llm_dispatcher, "DECREASE_COOLDOWN", 0.0)
+    with pytest.raises(RateLimitError):
+        await dispatcher.run(throttled)
+    assert dispatcher.limit == pytest.approx(1.24, abs=0.01)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_dispatcher import LLMDispatcher
+from app.services.llm_hedging import HedgePolicy, _parse_deadlines
+
+
+def warmed_policy(**kwargs):
+    policy = HedgePolicy(min_samples=3, min_delay=0.01, **kwargs)
+    for _ in range(3):
+        policy.record("thought", 0.02)
+    return policy
+
+
+async def test_slow_primary_is_hedged_and_cancelled():
+    policy = warmed_policy()
+    cancelled = asyncio.Event()
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "primary"
+
+    async def fast_hedge():
+        return "hedge"
+
+    started = time.perf_counter()
+    assert await policy.run("thought", slow_primary, fast_hedge) == "hedge"
+    assert time.perf_counter() - started < 1
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    stats = policy.stats()["types"]["thought"]
+    assert (stats["requests"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+
+
+async def test_no_hedge_without_samples_budget_or_capacity():
+    calls = []
+
+    async def primary():
+        calls.append("call")
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    cold = HedgePolicy(min_samples=3, min_delay=0.01)
+    assert await cold.run("thought", primary) == "ok"
+    assert await warmed_policy().run("thought", primary, can_hedge=lambda: False) == "ok"
+    assert calls == ["call", "call"]
+
+    assert await warmed_policy(budget=0.0).run("thought", primary) == "ok"
+    assert calls == ["call", "call", "call"]
+
+
+async def test_deadline_fails_the_call():
+    policy = HedgePolicy(deadlines={"assessment": 0.05}, hedge_enabled=False)
+
+    async def hang():
+        await asyncio.sleep(5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await policy.run("assessment", hang)
+    assert policy.stats()["types"]["assessment"]["timeouts"] == 1
+    assert _parse_deadlines("chat=8, bad, thought=x")["chat"] == 8.0
+
+
+async def test_deadline_and_latency_start_when_the_dispatcher_admits_the_call():
+    dispatcher = LLMDispatcher(initial_limit=1, max_limit=1)
+    policy = HedgePolicy(deadlines={"assessment": 0.2}, hedge_enabled=False)
+    gate = asyncio.Event()
+
+    async def occupy():
+        await gate.wait()
+
+    async def reply():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    holder = asyncio.create_task(dispatcher.run(occupy))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(policy.run("assessment", lambda: dispatcher.run(reply), from_admission=True))
+    # Queued behind the held slot for longer than the whole deadline.
+    await asyncio.sleep(0.3)
+    gate.set()
+    assert await queued == "ok"
+    await holder
+    assert policy._latencies["assessment"][0] < 0.2
@@ -0,0 +1,104 @@
+import asyncio
+import uuid
+
+from app.services import model_router
+from app.services.llm_client import LLMClient
+from app.services.llm_dispatcher import LLMDispatcher
+from app.services.model_router import FAST, STANDARD, Backend, ModelRouter
+
+
+def make_router(**kwargs):
+    return ModelRouter(
+        [
+            Backend("openai", "openai", "gpt-4o-mini", STANDARD),
+            Backend("openai-fast", "openai", "gpt-4.1-nano", FAST),
+            Backend("nvidia", "nvidia", "qwen", STANDARD),
+        ],
+        **kwargs,
+    )
+
+
+def test_nodes_route_by_quality_latency_and_override():
+    router = make_router(routes={"tutor": "nvidia"})
+    assert router.rank("thought")[0].name == "openai-fast"
+    assert router.rank("identify")[0].name == "openai"
+    assert router.rank("tutor")[0].name == "nvidia"
+
+    # The fast model has been missing the thought node's 8 s target; the standard tier takes over.
+    router.record(router.backends["openai-fast"], 12.0)
+    router.record(router.backends["openai"], 2.0)
+    assert router.rank("thought")[0].name == "openai"
+
+
+def test_failing_backend_is_demoted_and_override_ignored():
+    router = make_router(routes={"problem": "openai"})
+    for _ in range(4):
+        router.record(router.backends["openai"], 1.0, failed=True)
+    assert router.backends["openai"].error_rate() >= model_router.UNHEALTHY_ERROR_RATE
+    assert [b.name for b in router.rank("problem")] == ["nvidia", "openai"]
+
+
+async def test_llm_client_fails_over_to_runner_up(monkeypatch):
+    router = make_router()
+    monkeypatch.setattr(model_router, "_router", router)
+    llm = LLMClient()
+    calls = []
+
+    async def complete(backend, messages, temperature, **kwargs):
+        calls.append(backend.name)
+        if backend.name == "openai":
+            raise ConnectionError("provider down")
+        return {"node": "identify"}
+
+    monkeypatch.setattr(llm, "_complete_with_backend", complete)
+    result = await llm.invoke_with_prompt(f"Identify {uuid.uuid4()}", prompt_type="identify")
+
+    assert result == {"node": "identify"}
+    assert calls == ["openai", "nvidia"]
+    stats = router.stats()
+    assert stats["backends"]["openai"]["failures"] == 1
+    assert stats["chosen"]["identify"] == {"openai": 1}
+
+
+async def test_routed_answers_are_cached_per_prompt_type_not_backend(monkeypatch):
+    router = make_router()
+    monkeypatch.setattr(model_router, "_router", router)
+    llm = LLMClient()
+    calls = []
+
+    async def complete(backend, messages, temperature, **kwargs):
+        calls.append(backend.name)
+        if backend.name == "openai" and len(calls) == 1:
+            raise ConnectionError("provider down")
+        return {"answered_by": backend.name}
+
+    monkeypatch.setattr(llm, "_complete_with_backend", complete)
+    prompt = f"Identify {uuid.uuid4()}"
+    first = await llm.invoke_with_prompt(prompt, prompt_type="identify")
+    # The failover answer is a hit whether or not the ranking has flipped since.
+    for _ in range(4):
+        router.record(router.backends["openai"], 1.0, failed=True)
+    assert await llm.invoke_with_prompt(prompt, prompt_type="identify") == first == {"answered_by": "nvidia"}
+    assert await llm.cached_prompt(prompt, prompt_type="identify") == first
+    assert calls == ["openai", "nvidia"]
+
+
+async def test_backend_latency_excludes_dispatcher_queue_wait(monkeypatch):
+    router = make_router()
+    monkeypatch.setattr(model_router, "_router", router)
+    llm = LLMClient()
+    llm._dispatcher = LLMDispatcher(initial_limit=1, max_limit=1)
+    gate = asyncio.Event()
+
+    async def complete(backend, messages, temperature, **kwargs):
+        return {"ok": True}
+
+    monkeypatch.setattr(llm, "_complete_with_backend", complete)
+    holder = asyncio.create_task(llm._dispatcher.run(gate.wait))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(llm.invoke_with_prompt(f"Identify {uuid.uuid4()}", prompt_type="identify"))
+    await asyncio.sleep(0.2)
+    gate.set()
+    assert await queued == {"ok": True}
+    await holder
+    assert router.backends["openai"].latency_ewma < 0.1
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services import nvidia_chat_client as nvidia
+from app.services.llm_client import LLMClient
+from app.services.nvidia_chat_client import CircuitOpenError, NvidiaChatClient, RetryBudget
+
+
+def status_error(code):
+    response = httpx.Response(code, request=httpx.Request("POST", "https://nvidia.test/v1/chat/completions"))
+    return openai.APIStatusError(f"HTTP {code}", response=response, body=None)
+
+
+def reply(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeCompletions:
+    """Pops a scripted outcome per model; a scripted exception is raised."""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, model, **kwargs):
+        self.calls.append(model)
+        outcome = self.script[model].pop(0) if self.script.get(model) else reply('{"ok": true}')
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(script, **kwargs):
+    fake = FakeCompletions(script)
+    kwargs.setdefault("breaker_options", {"min_calls": 2, "cooldown": 60})
+    client = NvidiaChatClient(fake, primary_model="primary", fallback_model="fallback", backoff=0, **kwargs)
+    return client, fake
+
+
+async def test_client_errors_are_not_retried_or_rerouted():
+    client, fake = make_client({"primary": [status_error(400)]})
+    with pytest.raises(openai.APIStatusError):
+        await client.chat_completion([{"role": "user", "content": "hi"}])
+    assert fake.calls == ["primary"]
+    assert client.breaker("primary").error_rate() == 0.0
+
+
+async def test_transient_errors_retry_within_budget_then_fall_back():
+    client, fake = make_client(
+        {"primary": [status_error(503), status_error(503)]},
+        retry_budget=RetryBudget(ratio=0.0, burst=1.0),
+    )
+    await client.chat_completion([{"role": "user", "content": "hi"}])
+    # One retry was affordable; the second failure tripped the breaker and moved to the fallback.
+    assert fake.calls == ["primary", "primary", "fallback"]
+    assert client.retry_budget.spent == 1 and client.fallbacks == 1
+
+    await client.chat_completion([{"role": "user", "content": "hi"}])
+    assert fake.calls[-1] == "fallback"
+    assert client.stats()["models"]["primary"]["state"] == "open"
+
+
+async def test_half_open_probe_closes_the_breaker():
+    client, fake = make_client(
+        {"primary": [status_error(502), status_error(502)]},
+        breaker_options={"min_calls": 2, "cooldown": 0},
+        max_attempts=1,
+    )
+    await client.chat_completion([{"role": "user", "content": "a"}])
+    await client.chat_completion([{"role": "user", "content": "b"}])
+    assert client.breaker("primary").trips == 1
+
+    await client.chat_completion([{"role": "user", "content": "c"}])
+    assert fake.calls[-1] == "primary"
+    assert client.breaker("primary").state == "closed"
+
+
+async def test_llm_client_caches_nvidia_completions(monkeypatch):
+    client, fake = make_client({})
+    monkeypatch.setattr(nvidia, "_nvidia_client", client)
+    llm = LLMClient()
+    # Unique content so the persistent L2 cache cannot answer from an earlier run.
+    messages = [{"role": "user", "content": f"Return JSON. {uuid.uuid4()}"}]
+
+    assert await llm.invoke_nvidia_chat(messages, prompt_type="chat") == {"ok": True}
+    assert await llm.invoke_nvidia_chat(messages, prompt_type="chat") == {"ok": True}
+    assert llm.last_cache_hit
+    assert fake.calls == ["primary"]
+
+
+async def test_cancelled_probe_frees_the_half_open_slot():
+    client, fake = make_client(
+        {"primary": [status_error(502), status_error(502)]},
+        breaker_options={"min_calls": 2, "cooldown": 0},
+        max_attempts=1,
+    )
+    await client.chat_completion([{"role": "user", "content": "a"}])
+    await client.chat_completion([{"role": "user", "content": "b"}])
+
+    started = asyncio.Event()
+
+    async def hang(model, **kwargs):
+        fake.calls.append(model)
+        started.set()
+        await asyncio.sleep(5)
+
+    create = fake.create
+    fake.create = hang
+    probe = asyncio.create_task(client.chat_completion([{"role": "user", "content": "c"}]))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    fake.create = create
+    await client.chat_completion([{"role": "user", "content": "d"}])
+    assert fake.calls[-1] == "primary"
+    assert client.breaker("primary").state == "closed"
+
+
+async def test_open_breaker_without_fallback_fails_fast():
+    fake = FakeCompletions({"primary": [status_error(503), status_error(503)]})
+    client = NvidiaChatClient(
+        fake,
+        primary_model="primary",
+        fallback_model="",
+        backoff=0,
+        max_attempts=1,
+        breaker_options={"min_calls": 2, "cooldown": 60},
+    )
+    for content in ("a", "b"):
+        with pytest.raises(openai.APIStatusError):
+            await client.chat_completion([{"role": "user", "content": content}])
+    opened_at = client.breaker("primary").opened_at
+
+    with pytest.raises(CircuitOpenError):
+        await client.chat_completion([{"role": "user", "content": "c"}])
+    assert fake.calls == ["primary", "primary"]
+    assert client.breaker("primary").opened_at == opened_at
+    assert client.stats()["rejected"] == 1
@@ -0,0 +1,90 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_client import LLMClient
+from app.services.output_schemas import OUTPUT_SCHEMAS, SchemaViolation, StreamingSchemaCheck
+
+GOOD_ATTEMPT = json.dumps(
+    {
+        "thoughtprocess": "I added 36 and 53 but read 36 as 63.",
+        "steps_to_solve": ["Read 63", "Add 53", "Get 116", "Answer 116"],
+        "final_answer": "116",
+    }
+)
+BAD_ATTEMPT = '{"thoughtprocess": "I added.", "steps_to_solve": "Read 63, add 53, ' + "more words " * 200 + '"}'
+
+
+def chunks(text, size=8):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_stream_check_aborts_at_first_wrong_value_type():
+    check = StreamingSchemaCheck(OUTPUT_SCHEMAS["attempt"])
+    with pytest.raises(SchemaViolation) as info:
+        for piece in chunks(BAD_ATTEMPT):
+            check.feed(piece)
+    assert info.value.early
+    assert "steps_to_solve" in str(info.value)
+    assert info.value.received_chars < 80 < len(BAD_ATTEMPT)
+
+    with pytest.raises(SchemaViolation):
+        StreamingSchemaCheck(OUTPUT_SCHEMAS["attempt"]).feed("Sure! Here is the JSON")
+
+
+def test_stream_check_validates_complete_reply():
+    check = StreamingSchemaCheck(OUTPUT_SCHEMAS["attempt"])
+    for piece in chunks(GOOD_ATTEMPT):
+        check.feed(piece)
+    assert check.finish(GOOD_ATTEMPT)["final_answer"] == "116"
+
+    missing = '{"thoughtprocess": "x", "steps_to_solve": ["a {", "b ]"]}'
+    check = StreamingSchemaCheck(OUTPUT_SCHEMAS["attempt"])
+    check.feed(missing)
+    with pytest.raises(SchemaViolation, match="final_answer: required"):
+        check.finish(missing)
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.pieces = chunks(text)
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= len(self.pieces):
+            raise StopAsyncIteration
+        piece = self.pieces[self.sent]
+        self.sent += 1
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_broken_stream_is_closed_early_and_retried():
+    streams = [FakeStream(BAD_ATTEMPT), FakeStream(GOOD_ATTEMPT)]
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return streams[len(requests) - 1]
+
+    llm = LLMClient()
+    llm._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    result = await llm.invoke_chat(
+        [{"role": "user", "content": f"Simulate {uuid.uuid4()}"}],
+        model="gpt-4o-mini",
+        prompt_type="attempt",
+        schema=OUTPUT_SCHEMAS["attempt"],
+    )
+
+    assert result["final_answer"] == "116"
+    assert streams[0].closed and streams[0].sent < len(streams[0].pieces) / 4
+    assert requests[0]["stream"] is True
+    assert requests[0]["response_format"]["type"] == "json_schema"
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.services.orchestrator import LangGraphOrchestrator
+from app.services.prompt_budget import (
+    PromptTokenStats,
+    compact_attempt,
+    count_tokens,
+    summarize_history,
+)
+
+ATTEMPT = {
+    "thoughtprocess": "I read 36 as 63 and then added. " * 80,
+    "steps_to_solve": ["Read the numbers", "Add them", "Check", "Answer"],
+    "final_answer": "71",
+    "is_final_answer_intentionally_incorrect": True,
+    "metadata": {"raw": "x" * 2000},
+}
+
+
+def test_attempt_is_trimmed_to_used_fields_and_budget():
+    compacted = compact_attempt(ATTEMPT, budget=150)
+    assert set(compacted) == {"thoughtprocess", "steps_to_solve", "final_answer"}
+    assert compacted["final_answer"] == "71"
+    assert count_tokens(str(compacted)) < count_tokens(str(ATTEMPT)) / 4
+
+
+def test_history_becomes_summary_statistics():
+    history = [
+        {"consistency_score": score, "is_correct": score > 0.5, "difficulty": "medium", "error_pattern": "reversal"}
+        for score in (0.2, 0.3, 0.7, 0.8, 0.9, 0.9)
+    ]
+    summary = summarize_history(history)
+    assert summary["sessions"] == 6
+    assert summary["accuracy"] == round(4 / 6, 3)
+    assert summary["trend"] == "improving"
+    assert summary["recent_consistency"] == [0.3, 0.7, 0.8, 0.9, 0.9]
+    assert summary["common_error_patterns"] == ["reversal"]
+    assert summarize_history({"sessions": 3}) == {"sessions": 3}
+
+
+async def test_thought_node_sends_a_byte_identical_system_prefix(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    orchestrator = LangGraphOrchestrator()
+    orchestrator.llm_client.invoke_with_prompt = AsyncMock(return_value={"cognitive_patterns": "ok"})
+
+    for disability, answer in (("Dyslexia", "71"), ("Dyscalculia", "12")):
+        state = orchestrator.build_initial_state({"disability": disability})
+        state["problem"] = {"problem": f"What is 36 + 35? ({disability})"}
+        state["student_attempt"] = dict(ATTEMPT, final_answer=answer)
+        await orchestrator._analyze_attempt_node(state)
+
+    first, second = (call.kwargs for call in orchestrator.llm_client.invoke_with_prompt.await_args_list)
+    assert first["system"] == second["system"]
+    assert "Dyslexia" in first["prompt"] and "Dyscalculia" in second["prompt"]
+    assert "metadata" not in first["prompt"]
+
+
+def test_token_stats_report_cached_prefix_share():
+    stats = PromptTokenStats()
+    stats.record_estimate("thought", 900)
+    usage = SimpleNamespace(prompt_tokens=1000, prompt_tokens_details=SimpleNamespace(cached_tokens=600))
+    stats.record_usage("thought", usage)
+    node = stats.stats()["nodes"]["thought"]
+    assert (node["avg_estimated"], node["avg_prompt_tokens"], node["cached_ratio"]) == (900, 1000, 0.6)
@@ -0,0 +1,66 @@
+import asyncio
+import itertools
+import random
+
+from app.services import disability_assessment_service as assessment
+from app.services.question_bank import QuestionBank
+
+
+def make_bank(**kwargs):
+    counter = itertools.count()
+    calls = []
+
+    async def generate(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return {"problem": f"{key} question {next(counter)}", "answer": "4", "solution": "2 + 2 = 4"}
+
+    bank = QuestionBank(generate, rng=random.Random(0), **kwargs)
+    return bank, calls
+
+
+async def test_users_never_see_a_question_twice():
+    bank, _ = make_bank(target_size=4, low_water=0)
+    await bank.fill("5th")
+    served = [bank.take("5th", user_id="u1")["problem"] for _ in range(4)]
+    assert len(set(served)) == 4
+    assert bank.take("5th", user_id="u1") is None
+    assert bank.take("5th", user_id="u2") is not None
+    await bank.close()
+
+
+async def test_low_pool_refills_in_background_and_retires_used_items():
+    bank, calls = make_bank(target_size=3, low_water=1, max_uses=1)
+    assert bank.take("k") is None
+    await asyncio.sleep(0.01)
+    assert bank.size("k") == 3 and len(calls) == 3
+
+    assert bank.take("k") is not None and bank.take("k") is not None
+    assert bank.stats.retired == 2 and bank.size("k") == 1
+    await asyncio.sleep(0.01)
+    assert bank.size("k") == 3
+    await bank.close()
+
+
+async def test_invalid_and_duplicate_items_are_not_pooled():
+    bank = QuestionBank(lambda key: None, validate=lambda item: item.get("answer") == "4")
+    assert not bank.add("k", {"problem": "x", "answer": "5"})
+    assert bank.add("k", {"problem": "What is 2 + 2?", "answer": "4"})
+    assert not bank.add("k", {"problem": "what is  2 + 2?", "answer": "4"}, seen_by="u1")
+    assert bank.take("k", user_id="u1") is None
+    assert (bank.stats.rejected, bank.stats.duplicates) == (1, 1)
+    await bank.close()
+
+
+async def test_start_assessment_serves_banked_question(monkeypatch):
+    bank, calls = make_bank(target_size=2, low_water=0)
+    monkeypatch.setattr(assessment, "screening_bank", bank)
+    monkeypatch.setattr(assessment, "BANK_ENABLED", True)
+    await bank.fill(("5th", "medium"))
+    calls.clear()
+
+    first = await assessment.start_assessment("5th", "medium", user_id="u1")
+    second = await assessment.start_assessment("5th", "medium", user_id="u1")
+    assert first["question"]["problem"] != second["question"]["problem"]
+    assert calls == []
+    await bank.close()
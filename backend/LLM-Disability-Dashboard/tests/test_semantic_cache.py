@@ -0,0 +1,53 @@
+import uuid
+
+from app.services.llm_client import LLMClient
+from app.services.semantic_cache import SemanticCache, SemanticKey, normalize_free_text
+
+
+def test_normalize_free_text_canonicalizes_case_spacing_and_numbers():
+    assert normalize_free_text("i got 42 because 6x7") == normalize_free_text("I got 42, because 6 x 7")
+    assert normalize_free_text("It costs 1,000.50!") == "it costs 1000.5"
+
+
+def test_semantic_lookup_hits_near_duplicate_in_same_context():
+    cache = SemanticCache(thresholds={"identify": 0.85})
+    cache.register(SemanticKey("identify", "What is 6 x 7?", "i got 42 because 6x7"), "llm:first")
+
+    assert cache.lookup(SemanticKey("identify", "What is 6 x 7?", "I got 42, because 6 x 7")) == "llm:first"
+    assert cache.lookup(SemanticKey("identify", "What is 6 x 8?", "I got 42, because 6 x 7")) is None
+    assert cache.lookup(SemanticKey("identify", "What is 6 x 7?", "I carried the one and wrote 13")) is None
+
+
+def test_semantic_lookup_misses_when_the_numbers_differ():
+    cache = SemanticCache(thresholds={"identify": 0.5})
+    cache.register(SemanticKey("identify", "What is 6 x 4?", "The answer is 24 because 6 x 4"), "llm:24")
+
+    assert cache.lookup(SemanticKey("identify", "What is 6 x 4?", "the answer is 24, because 6x4")) == "llm:24"
+    assert cache.lookup(SemanticKey("identify", "What is 6 x 4?", "The answer is 42 because 6 x 4")) is None
+
+
+def test_semantic_cache_evicts_oldest_entry():
+    cache = SemanticCache(max_entries=1)
+    cache.register(SemanticKey("thought", "ctx", "first answer text"), "llm:1")
+    cache.register(SemanticKey("thought", "ctx", "second answer text"), "llm:2")
+    assert cache.lookup(SemanticKey("thought", "ctx", "first answer text")) is None
+    assert cache.stats()["entries"] == 1
+
+
+async def test_opted_out_calls_skip_the_semantic_cache():
+    llm = LLMClient()
+    llm._semantic_cache = SemanticCache()
+    calls = []
+
+    async def provider_call(prompt_type, complete, hedge):
+        calls.append(prompt_type)
+        return {"verdict": len(calls)}
+
+    llm._provider_call = provider_call
+    key = SemanticKey("assessment", f"student {uuid.uuid4()}", "I read the numbers backwards")
+    messages = [{"role": "user", "content": "Evaluate"}]
+    for _ in range(2):
+        await llm.invoke_chat(messages, model="gpt-4o-mini", use_cache=False, semantic=key, prompt_type="assessment")
+
+    assert calls == ["assessment", "assessment"]
+    assert llm._semantic_cache.stats()["entries"] == 0
@@ -0,0 +1,148 @@
+import asyncio
+
+from app.services import speculative
+from app.services.orchestrator import LangGraphOrchestrator
+from app.services.speculative import SpeculationStats, race
+
+PROBLEM = {"problem": "What is 36 + 35?", "answer": "71"}
+
+
+def attempt(final_answer, delay):
+    return {
+        "thoughtprocess": "The 6 looked like a 9 and I reversed the digits, so I transposed them.",
+        "steps_to_solve": ["I read 36 as 39", "39 + 35 = 74", f"I wrote {final_answer}"],
+        "final_answer": final_answer,
+        "disability_impact": "Number reversals and slow reading confused the digits.",
+        "delay": delay,
+    }
+
+
+async def test_first_accepted_candidate_wins_and_losers_are_cancelled(monkeypatch):
+    monkeypatch.setattr(speculative, "speculation_stats", SpeculationStats())
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def rejected():
+        return 1
+
+    async def accepted():
+        await asyncio.sleep(0.01)
+        return 2
+
+    async def broken():
+        raise ValueError("bad reply")
+
+    result = await race("attempt", [slow, rejected, broken, accepted], lambda value: value == 2)
+    assert (result.winner.index, result.winner.value) == (3, 2)
+    assert [c.index for c in result.finished] == [1, 2, 3]
+    assert isinstance(result.finished[1].error, ValueError)
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    stats = speculative.get_speculation_stats()["attempt"]
+    assert (stats["candidates"], stats["accepted"], stats["cancelled"]) == (4, 1, 1)
+    assert stats["wins_by_index"] == {3: 1}
+
+
+async def test_attempt_node_races_candidates(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    orchestrator = LangGraphOrchestrator()
+    orchestrator.attempt_candidates = 3
+    replies = {0.7: attempt("71", 0.0), 0.5: attempt("47", 0.02), 0.3: attempt("61", 5)}
+    temperatures = []
+
+    async def invoke_chat(messages, temperature, **kwargs):
+        temperatures.append(temperature)
+        reply = dict(replies[temperature])
+        await asyncio.sleep(reply.pop("delay"))
+        return reply
+
+    monkeypatch.setattr(orchestrator.llm_client, "invoke_chat", invoke_chat)
+    state = orchestrator.build_initial_state({"disability": "Dyslexia"})
+    state["problem"] = dict(PROBLEM)
+
+    result = await asyncio.wait_for(orchestrator._simulate_attempt_node(state), 1)
+    # The fastest reply is correct, so it is rejected; the next consistent one wins.
+    assert result["student_attempt"]["final_answer"] == "47"
+    assert sorted(temperatures) == [0.3, 0.5, 0.7]
+    assert "consistency_report" in result
+
+
+def problem(a, b, answer, delay):
+    return {
+        "problem": f"What is {a} + {b}?",
+        "answer": str(answer),
+        "solution": f"1. Add {a} and {b}.\nFinal answer: {a + b}",
+        "delay": delay,
+    }
+
+
+async def test_problem_race_returns_first_valid_and_pools_the_rest(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    orchestrator = LangGraphOrchestrator()
+    orchestrator.problem_candidates = 3
+    replies = {0.5: problem(2, 2, 5, 0.0), 0.3: problem(3, 4, 7, 0.01), 0.2: problem(5, 6, 11, 0.05)}
+    calls = []
+
+    async def invoke_with_prompt(prompt, temperature, **kwargs):
+        calls.append(temperature)
+        reply = dict(replies[temperature])
+        await asyncio.sleep(reply.pop("delay"))
+        return reply
+
+    monkeypatch.setattr(orchestrator.llm_client, "invoke_with_prompt", invoke_with_prompt)
+
+    first = await orchestrator.generate_problem("Grade 3", "Easy")
+    # Candidate 0 has a wrong answer; candidate 1 is the first valid one.
+    assert first["problem"] == "What is 3 + 4?" and first["answer_validated"]
+
+    await asyncio.sleep(0.1)
+    key = ("Grade 3", "Easy")
+    assert orchestrator.problem_pool.size(key) == 1
+
+    # An uncached request is served from the pool without another LLM call.
+    pooled = await orchestrator.generate_problem("Grade 3", "Easy", use_cache=False)
+    assert pooled["problem"] == "What is 5 + 6?"
+    assert len(calls) == 3
+    assert orchestrator.problem_pool.size(key) == 0
+    await orchestrator.aclose()
+
+
+async def test_cached_results_skip_the_race(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    orchestrator = LangGraphOrchestrator()
+    orchestrator.problem_candidates = 3
+    orchestrator.attempt_candidates = 3
+    generated = []
+
+    async def cached_prompt(prompt, temperature, **kwargs):
+        reply = problem(3, 4, 7, 0.0)
+        reply.pop("delay")
+        return reply
+
+    async def cached_chat(messages, temperature, **kwargs):
+        reply = attempt("47", 0.0)
+        reply.pop("delay")
+        return reply
+
+    async def generate(*args, **kwargs):
+        generated.append(kwargs.get("temperature"))
+        raise AssertionError("a cached result must not start candidates")
+
+    monkeypatch.setattr(orchestrator.llm_client, "cached_prompt", cached_prompt)
+    monkeypatch.setattr(orchestrator.llm_client, "cached_chat", cached_chat)
+    monkeypatch.setattr(orchestrator.llm_client, "invoke_with_prompt", generate)
+    monkeypatch.setattr(orchestrator.llm_client, "invoke_chat", generate)
+
+    assert (await orchestrator.generate_problem("Grade 3", "Easy"))["answer_validated"]
+    state = orchestrator.build_initial_state({"disability": "Dyslexia"})
+    state["problem"] = dict(PROBLEM)
+    result = await orchestrator._simulate_attempt_node(state)
+    assert result["student_attempt"]["final_answer"] == "47"
+    assert generated == []
+    await orchestrator.aclose()
@@ -0,0 +1,90 @@
+import pytest
+
+from app.services.adaptive_difficulty import adaptive_manager
+from app.services.orchestrator import LangGraphOrchestrator
+from app.services.student_aggregates import StudentAggregateStore
+
+HISTORY = [
+    {"consistency_score": 0.3, "is_correct": False},
+    {"consistency_score": 0.5, "is_correct": False},
+    {"consistency_score": 0.6, "is_correct": True},
+    {"consistency_score": 0.8, "is_correct": True},
+    {"consistency_score": 0.9, "is_correct": True},
+    {"consistency_score": 0.95, "is_correct": True},
+    {"consistency_score": 0.9, "is_correct": True},
+]
+
+
+@pytest.fixture
+async def store(tmp_path):
+    instance = StudentAggregateStore(str(tmp_path / "aggregates.db"), ewma_alpha=0.5)
+    yield instance
+    await instance.close()
+
+
+async def test_aggregate_plan_matches_full_history(store):
+    for index, session in enumerate(HISTORY):
+        await store.record_session(
+            "s1",
+            disability="Dyslexia",
+            difficulty="medium",
+            consistency_score=session["consistency_score"],
+            is_correct=session["is_correct"],
+            event_key=f"run-{index}",
+        )
+
+    aggregate = await store.get("s1")
+    assert aggregate.sessions == len(HISTORY)
+    assert len(aggregate.recent) == 5
+    assert aggregate.correct_count == 5
+    assert aggregate.mean_consistency == pytest.approx(sum(s["consistency_score"] for s in HISTORY) / len(HISTORY))
+
+    expected = adaptive_manager.calculate_next_difficulty(HISTORY, "medium")
+    plan = adaptive_manager.calculate_from_aggregate(aggregate, "medium")
+    for key in ("recommended_difficulty", "reasoning", "confidence", "recommendations"):
+        assert plan[key] == expected[key]
+    assert plan["current_performance"]["session_count"] == len(HISTORY)
+
+
+async def test_repeated_event_is_not_double_counted(store):
+    assert await store.record_session("s2", disability="ADHD", difficulty="easy", consistency_score=0.7, event_key="a")
+    assert not await store.record_session("s2", disability="ADHD", difficulty="easy", consistency_score=0.7, event_key="a")
+    assert await store.record_session("s2", disability="Dyscalculia", difficulty="hard", consistency_score=0.4)
+
+    rows = await store.breakdown("s2")
+    assert [(row.disability, row.difficulty, row.sessions) for row in rows] == [
+        ("*", "*", 2),
+        ("ADHD", "easy", 1),
+        ("Dyscalculia", "hard", 1),
+    ]
+    assert rows[0].consistency_ewma == pytest.approx(0.55)
+
+
+async def test_workflow_records_and_uses_aggregate_without_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "false")
+    monkeypatch.setenv("STUDENT_AGGREGATES_DB_PATH", str(tmp_path / "aggregates.db"))
+    orchestrator = LangGraphOrchestrator()
+    try:
+        state = orchestrator.build_initial_state(
+            {
+                "difficulty": "medium",
+                "disability": "Dyslexia",
+                "problem": {"problem": "What is 3 + 4?", "answer": "7"},
+                "student_attempt": {"final_answer": "8", "steps_to_solve": ["3 + 4 = 8", "Final answer: 8"]},
+                "metadata": {"student_id": "s3", "stop_after": "adaptive", "adaptive_mode": "local"},
+            }
+        )
+        state["metadata"]["thread_id"] = "t1"
+        update = await orchestrator._consistency_node(state)
+        state.update(update)
+        await orchestrator._consistency_node(state)
+
+        aggregate = await orchestrator.student_aggregate("s3")
+        assert aggregate.sessions == 1
+        assert aggregate.correct_count == 0
+
+        result = await orchestrator._adaptive_difficulty_node(state)
+        assert result["adaptive_plan"]["source"] == "aggregate"
+        assert result["adaptive_plan"]["current_performance"]["session_count"] == 1
+    finally:
+        await orchestrator.aclose()
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.traffic_recorder import (
+    Anonymizer,
+    TrafficRecorder,
+    TrafficRecorderMiddleware,
+    TrafficReplay,
+    load_recording,
+    record_llm_call,
+)
+
+
+def test_anonymizer_pseudonymizes_ids_and_masks_contact_details():
+    anonymize = Anonymizer("salt")
+    body = {
+        "student_id": "S-1042",
+        "metadata": {"studentId": 1042, "session_id": "abc"},
+        "student_response": "Email me at kid@example.com or call 555-123-4567",
+        "difficulty": "Easy",
+    }
+    first, second = anonymize(body), anonymize(body)
+    assert first == second
+    assert first["student_id"].startswith("anon-") and first["student_id"] != "S-1042"
+    assert isinstance(first["metadata"]["studentId"], int) and first["metadata"]["studentId"] != 1042
+    assert first["student_response"] == "Email me at <email> or call <phone>"
+    assert first["difficulty"] == "Easy"
+    assert "S-1042" not in anonymize.query("student_id=S-1042&grade=3")
+
+
+def test_anonymizer_leaves_arithmetic_alone():
+    anonymize = Anonymizer("salt")
+    problem = {
+        "problem": "What is 3456 - 1289?",
+        "steps": ["Compute 12.5 - 3.75 - 1.25", "100 + 250 = 350"],
+        "final_answer": "1234567890",
+    }
+    assert anonymize(problem) == problem
+    assert anonymize.text("Call (555) 123-4567 or +44 20 7946 0958.") == "Call <phone> or <phone>."
+
+
+def test_middleware_records_request_and_llm_calls(tmp_path):
+    app = FastAPI()
+
+    @app.post("/api/v2/langgraph/thought")
+    async def thought(payload: dict):
+        record_llm_call("thought", "m", 0.3, {"cognitive_patterns": "ok"}, 0.25, cached=False)
+        record_llm_call("strategies", "m", 0.3, {"primary_strategies": []}, 0.0, cached=True)
+        return {"ok": True}
+
+    @app.get("/api/v2/langgraph/llm-stats")
+    async def stats():
+        return {}
+
+    path = tmp_path / "traffic.jsonl"
+    app.add_middleware(TrafficRecorderMiddleware, recorder=TrafficRecorder(str(path), anonymizer=Anonymizer("s")))
+    client = TestClient(app)
+    assert client.post("/api/v2/langgraph/thought", json={"student_id": "S-1"}).status_code == 200
+    assert client.get("/api/v2/langgraph/llm-stats").status_code == 200
+
+    (entry,) = load_recording(str(path))
+    assert (entry["method"], entry["path"], entry["status"]) == ("POST", "/api/v2/langgraph/thought", 200)
+    assert entry["body"]["student_id"].startswith("anon-")
+    assert [(c["prompt_type"], c["cached"], c["latency_ms"]) for c in entry["llm_calls"]] == [
+        ("thought", False, 250.0),
+        ("strategies", True, 0.0),
+    ]
+
+
+async def test_replay_serves_each_request_its_own_calls_then_falls_back():
+    entries = [
+        {"id": "a", "llm_calls": [{"prompt_type": "problem", "cached": False, "latency_ms": 1, "response": {"n": 1}}]},
+        {"id": "b", "llm_calls": [{"prompt_type": "problem", "cached": True, "latency_ms": 0, "response": {"n": 2}}]},
+    ]
+    replay = TrafficReplay(json.loads(json.dumps(entries)), latency="zero")
+
+    with replay.request("b"):
+        assert await replay.complete("problem") == {"n": 2}
+        # The request's own recording is used up; another recorded reply stands in.
+        assert await replay.complete("problem") == {"n": 1}
+        with pytest.raises(LookupError):
+            await replay.complete("tutor")
+    assert (replay.served, replay.unmatched, replay.missing) == (2, 1, 1)
+
+
+async def test_writes_run_off_the_loop_and_rotate_past_the_cap(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), anonymizer=Anonymizer("s"), max_bytes=200)
+    for index in range(5):
+        await recorder.awrite({"id": str(index), "body": "x" * 60})
+
+    assert (recorder.recorded, recorder.rotations) == (5, 2)
+    assert [entry["id"] for entry in load_recording(str(path) + ".1")] == ["2", "3"]
+    assert [entry["id"] for entry in load_recording(str(path))] == ["4"]
@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.orchestrator import LangGraphOrchestrator
+
+PAYLOAD = {
+    "grade_level": "5th",
+    "difficulty": "medium",
+    "disability": "Dyslexia",
+    "problem": {"problem": "What is 3 + 4?", "answer": "7", "solution": "3 + 4 = 7"},
+    "student_attempt": {"final_answer": "8", "steps_to_solve": ["3 + 4 = 8", "Final answer: 8"]},
+    "workflow_type": "full",
+    "metadata": {"session_id": "resume-test"},
+}
+
+
+@pytest.fixture
+async def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setenv("CHECKPOINT_NODES", "simulate_attempt_step,analyze_attempt_step,strategies_step")
+    instance = LangGraphOrchestrator()
+    yield instance
+    await instance.aclose()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_workflow_resumes_after_last_checkpoint(orchestrator):
+    calls = []
+    fail_tutor = {"value": True}
+
+    async def fake_invoke(prompt, model="gpt-4o-mini", temperature=0.5, **kwargs):
+        calls.append(temperature)
+        if temperature == 0.7 and fail_tutor["value"]:
+            raise ValueError("Error calling OpenAI: timeout")
+        return {"ok": True}
+
+    orchestrator.llm_client.invoke_with_prompt = AsyncMock(side_effect=fake_invoke)
+
+    with pytest.raises(ValueError):
+        await orchestrator.run_graph(orchestrator.build_initial_state(PAYLOAD))
+    progress = await orchestrator.workflow_progress("resume-test")
+    assert progress["status"] == "interrupted"
+    assert progress["completed_nodes"][-1] == "strategies_step"
+
+    fail_tutor["value"] = False
+    calls.clear()
+    final_state = await orchestrator.run_graph(orchestrator.build_initial_state(PAYLOAD))
+    assert calls == [0.7]
+    assert final_state["metadata"]["resumed_from"] == "strategies_step"
+    assert final_state["tutor_session"] == {"ok": True}
+    assert (await orchestrator.workflow_progress("resume-test"))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_incremental_rerun_only_executes_nodes_with_changed_inputs(orchestrator):
+    calls = []
+
+    async def fake_invoke(prompt, model="gpt-4o-mini", temperature=0.5, **kwargs):
+        calls.append(temperature)
+        return {"ok": True, "temperature": temperature}
+
+    orchestrator.llm_client.invoke_with_prompt = AsyncMock(side_effect=fake_invoke)
+    payload = {
+        **PAYLOAD,
+        "student_response": "I got 8 because 3 + 4 is 8",
+        "metadata": {"session_id": "incremental-test", "incremental": True},
+    }
+    await orchestrator.run_graph(orchestrator.build_initial_state(payload))
+    assert sorted(calls) == [0.2, 0.3, 0.4, 0.7]
+
+    calls.clear()
+    edited = {**payload, "student_response": "I wrote 7 then changed it to 8"}
+    final_state = await orchestrator.run_graph(orchestrator.build_initial_state(edited))
+    assert calls == [0.2]
+    assert "identify_step" not in final_state["metadata"]["reused_nodes"]
+    assert "tutor_step" in final_state["metadata"]["reused_nodes"]
+    assert final_state["tutor_session"] == {"ok": True, "temperature": 0.7}
+
+
+@pytest.mark.asyncio
+async def test_incremental_rerun_never_reuses_a_bandit_plan(orchestrator, monkeypatch):
+    from app.services.adaptive_difficulty import adaptive_manager
+    from app.services.difficulty_policy import BanditPolicy, RuleBasedPolicy
+
+    async def fake_invoke(prompt, model="gpt-4o-mini", temperature=0.5, **kwargs):
+        return {"ok": True}
+
+    orchestrator.llm_client.invoke_with_prompt = AsyncMock(side_effect=fake_invoke)
+    payload = {
+        **PAYLOAD,
+        "student_history": [{"difficulty": "medium", "consistency_score": 0.9}] * 4,
+        "metadata": {"session_id": "adaptive-rerun", "incremental": True, "adaptive_mode": "local"},
+    }
+    monkeypatch.setattr(adaptive_manager, "policy", RuleBasedPolicy(adaptive_manager))
+    await orchestrator.run_graph(orchestrator.build_initial_state(payload))
+    rerun = await orchestrator.run_graph(orchestrator.build_initial_state(payload))
+    assert "adaptive_step" in rerun["metadata"]["reused_nodes"]
+
+    monkeypatch.setattr(adaptive_manager, "policy", BanditPolicy("thompson", seed=1))
+    rerun = await orchestrator.run_graph(orchestrator.build_initial_state(payload))
+    assert "adaptive_step" not in rerun["metadata"]["reused_nodes"]
+    assert rerun["adaptive_plan"]["policy"] == "thompson"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_of_one_session_keep_their_own_outputs(orchestrator):
+    async def fake_invoke(prompt, model="gpt-4o-mini", temperature=0.5, **kwargs):
+        await asyncio.sleep(0.01 if "changed" in prompt else 0.03)
+        return {"ok": True, "temperature": temperature}
+
+    orchestrator.llm_client.invoke_with_prompt = AsyncMock(side_effect=fake_invoke)
+    payload = {**PAYLOAD, "metadata": {"session_id": "concurrent-test", "incremental": True}}
+    runs = [
+        {**payload, "student_response": "I got 8 because 3 + 4 is 8"},
+        {**payload, "student_response": "I wrote 7 then changed it to 8"},
+    ]
+    await asyncio.gather(*(orchestrator.run_graph(orchestrator.build_initial_state(run)) for run in runs))
+
+    # The faster run finished first; the slower one must still record every node it ran.
+    latest = await orchestrator._checkpoints.latest("concurrent-test", status="completed")
+    assert latest["state"]["student_response"] == runs[0]["student_response"]
+    assert "tutor_step" in latest["state"]["node_outputs"]
+    assert (await orchestrator.workflow_progress("concurrent-test"))["status"] == "completed"
+    assert not orchestrator._run_outputs and not orchestrator._active_threads
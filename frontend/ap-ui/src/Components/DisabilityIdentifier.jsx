@@ -76,7 +76,11 @@ export default function DisabilityIdentifier() {
 
         const rounds = [
             ...history,
-            { question: currentQuestion.problem, answer: currentAnswer.trim() },
+            {
+                question: currentQuestion.problem,
+                answer: currentAnswer.trim(),
+                focus_area: currentQuestion.focus_area,
+            },
         ];
 
         try {